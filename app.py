@@ -1,102 +1,512 @@
 # backend/app.py
 
 import sqlite3
-import hashlib # REMINDER: Use bcrypt or Argon2 in production for passwords!
+import hashlib
+import hmac
+import zlib
 import os
+import base64 # For opaque pagination cursors
+import html
+import re
 import json # For handling financial history serialization/deserialization
+import csv
 import datetime # Potentially needed if calculating years from a date
-from flask import Flask, request, jsonify, g, session
+from flask import Flask, request, jsonify, g, session, stream_with_context, has_app_context, has_request_context
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import logging # Import Flask's logger
+import logging.handlers
+import click # Flask CLI commands
+import contextvars
+import time
+import threading
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from db_pool import ConnectionPool, PoolTimeout
+from password_hasher import PasswordHasher, HasherBusy, is_legacy_sha256, parse_scrypt_hash
+from response_cache import ResponseCache
+from request_metrics import RequestMetrics
+from financial_pack import pack_financials, unpack_financials
+from response_encoding import FastJSONProvider, EncodedBody, negotiate_encoding, compress
+from event_broker import EventBroker, BrokerFull
+from read_snapshot import SnapshotStore
+from rate_limiter import TokenBucketLimiter, AdmissionController, retry_after_header
+from log_queue import JsonFormatter, QueueingHandler, SampleFilter
 
 # --- Configuration ---
 DATABASE = 'database.db'
-SECRET_KEY = os.urandom(24) # Strong secret key for sessions
+SECRET_KEY = os.urandom(24) # Development fallback: every process gets its own, see create_app()
 
 # --- App Setup ---
 app = Flask(__name__)
+app.json = FastJSONProvider(app) # orjson when installed, the standard library otherwise
 app.config['SECRET_KEY'] = SECRET_KEY
-logging.basicConfig(level=logging.INFO)
-CORS(app, origins=["http://localhost:8080", "http://127.0.0.1:5500", "null"], supports_credentials=True) # Added null origin for local file testing
+app.config['DATABASE'] = DATABASE
+app.config['SQL_TRACE_CALLBACK'] = None # Optional callable receiving every executed SQL statement
+app.config['DB_POOL_SIZE'] = 8 # Max open connections per database file, per process
+app.config['DB_POOL_TIMEOUT'] = 5.0 # Seconds a request waits for a free connection
+app.config['DB_STATEMENT_CACHE'] = 512 # Prepared statements kept per connection
+app.config['DB_PRAGMAS'] = [
+    'journal_mode = WAL', # Readers no longer block on the writer (and vice versa)
+    'synchronous = NORMAL', # Durable across app crashes; WAL makes this safe against corruption
+    'busy_timeout = 5000', # Wait for a competing writer instead of failing with "database is locked"
+    'cache_size = -20000', # ~20MB page cache per connection
+    'mmap_size = 268435456', # Read pages through a 256MB memory map
+    'temp_store = MEMORY',
+]
+app.config['RESPONSE_CACHE_SIZE'] = 1024 # Cached GET bodies per process
+app.config['RESPONSE_CACHE_TTL'] = 30.0 # Seconds; also the staleness bound across processes, which don't share invalidations
+app.config['PASSWORD_HASH_WORKERS'] = 2 # scrypt worker processes per app process; 0 hashes inline
+app.config['PASSWORD_HASH_MAX_PENDING'] = 32 # Queued + running hashes before login/register answer 503
+app.config['PASSWORD_HASH_TIMEOUT'] = 10.0 # Seconds a request waits for its hash
+app.config['SCRYPT_N'] = 2 ** 14 # CPU/memory cost; memory used is 128 * N * R bytes (16MB here)
+app.config['SCRYPT_R'] = 8 # Block size
+app.config['SCRYPT_P'] = 1 # Parallelization
+app.config['EXPORT_API_TOKEN'] = os.environ.get('EXPORT_API_TOKEN') # Bearer token for /api/export/*; unset disables them
+app.config['METRICS_API_TOKEN'] = os.environ.get('METRICS_API_TOKEN') # Bearer token for /metrics and /api/health/* (except /api/health/live); unset disables them
+app.config['EXPORT_BATCH_SIZE'] = 500 # Rows fetched, encoded and flushed per chunk
+app.config['SLOW_REQUEST_MS'] = None # Requests slower than this are logged with their SQL, minus literal values; None disables
+app.config['COMPRESS_MIN_BYTES'] = 1024 # Smaller JSON/text bodies are sent uncompressed
+app.config['COMPRESS_LEVEL'] = 6 # zlib level for gzip/deflate responses
+app.config['EVENTS_MAX_SUBSCRIBERS'] = 100 # Open event streams per process (each holds a server thread)
+app.config['EVENTS_QUEUE_SIZE'] = 64 # Undelivered events per stream before it falls back to the event log
+app.config['EVENTS_HEARTBEAT_SECONDS'] = 15.0 # Idle streams send a comment this often, and re-read the event log
+app.config['EVENTS_MAX_STREAM_SECONDS'] = 300.0 # Streams end after this long; EventSource reconnects and resumes
+app.config['EVENTS_RETRY_MS'] = 3000 # Reconnect delay suggested to EventSource
+app.config['RECOMMENDATIONS_AUTO_UPDATE'] = True # Profile changes update the neighbour table in a background thread
+app.config['ANALYTICS_REFRESH_SECONDS'] = 300.0 # Full rebuild of the industry analytics; picks up other processes' writes
+app.config['READ_SNAPSHOT_ENABLED'] = False # Serve anonymous listing/detail GETs from an in-memory copy of the database
+app.config['READ_SNAPSHOT_REFRESH_SECONDS'] = 5.0 # The copy is refreshed this often...
+app.config['READ_SNAPSHOT_REFRESH_COMMITS'] = 100 # ...or after this many committed startup writes in this process
+app.config['READ_SNAPSHOT_MIN_INTERVAL_SECONDS'] = 1.0 # Commit-triggered refreshes are at least this far apart
+app.config['READ_SNAPSHOT_MAX_AGE_SECONDS'] = 30.0 # Older copies aren't served; reads go to the database instead
+app.config['RATE_LIMIT_ENABLED'] = True # Token buckets on login, register and interest changes (RATE_LIMITED_ENDPOINTS)
+app.config['RATE_LIMITS'] = { # Bucket -> (tokens per second, burst); per process, so N workers allow N times this
+    'auth_ip': (0.5, 20), # Logins + registrations per client IP
+    'login_account': (0.2, 10), # Logins per email, from any IP (credential stuffing spreads over IPs)
+    'interest_ip': (10.0, 60), # Interest changes per client IP
+    'interest_account': (5.0, 30), # Interest changes per investor
+}
+app.config['RATE_LIMIT_MAX_KEYS'] = 10000 # Buckets kept per limiter; the least recently used are dropped beyond this
+app.config['PROXY_FIX_X_FOR'] = 0 # Proxies in front of the app to trust X-Forwarded-For from; 0 uses the peer address
+app.config['MAX_CONCURRENT_REQUESTS'] = 32 # Requests in flight per process before new ones are shed with 503
+app.config['LOW_PRIORITY_SHARE'] = 0.5 # Low-priority routes (REQUEST_PRIORITIES) only get this share of the cap
+app.config['WORKER_WARM_CONNECTIONS'] = 2 # Pooled connections init_worker() opens before the first request
+app.config['WORKER_WARM_PATHS'] = ['/api/startups', '/api/startups/facets'] # GETs init_worker() caches up front
+app.config['LOG_LEVEL'] = 'INFO'
+app.config['LOG_FORMAT'] = 'json' # One JSON object per line (log_queue.JsonFormatter); 'text' for LEVEL:logger:message lines
+app.config['LOG_QUEUE_SIZE'] = 10000 # Records waiting for the log writer thread before new ones are dropped; 0 writes inline
+app.config['LOG_SAMPLE_SECONDS'] = 60.0 # Warnings logged with a sample_key repeat at most LOG_SAMPLE_BURST times per key...
+app.config['LOG_SAMPLE_BURST'] = 1 # ...in this many seconds; LOG_SAMPLE_SECONDS = 0 keeps them all
+
+# --- Logging ---
+# The root logger writes through one handler installed by configure_logging(): by default a
+# QueueingHandler whose writer thread formats and writes records, so requests never wait on
+# log I/O. Pass arguments lazily (app.logger.warning("... %s", value)); hot-path warnings
+# about one startup or client add extra={'sample_key': ...} so a bad row can't flood the log.
+_log_handler = None
+_log_listener = None
+_log_sample_filter = None
+_log_pid = None
+_log_lock = threading.Lock()
+
+def add_request_fields(record):
+    """Log filter: tags records emitted while handling a request with its method, path and endpoint."""
+    if has_request_context():
+        record.method = request.method
+        record.path = request.path
+        record.endpoint = request.endpoint
+    return True
+
+def configure_logging(stream=None):
+    """
+    (Re)installs the root log handler from the LOG_* settings, writing to stream (stderr by
+    default). Records still queued for a previous handler of this process are written first.
+    """
+    global _log_handler, _log_listener, _log_sample_filter, _log_pid
+    with _log_lock:
+        _stop_logging()
+        target = logging.StreamHandler(stream)
+        target.setFormatter(JsonFormatter() if app.config['LOG_FORMAT'] == 'json' else logging.Formatter(logging.BASIC_FORMAT))
+        if app.config['LOG_QUEUE_SIZE']:
+            handler = QueueingHandler(app.config['LOG_QUEUE_SIZE'])
+            _log_listener = logging.handlers.QueueListener(handler.queue, target)
+            _log_listener.start()
+        else:
+            handler = target
+        _log_sample_filter = None
+        if app.config['LOG_SAMPLE_SECONDS']:
+            _log_sample_filter = SampleFilter(app.config['LOG_SAMPLE_SECONDS'], app.config['LOG_SAMPLE_BURST'])
+            handler.addFilter(_log_sample_filter) # Handler filters run in the logging thread, before anything is queued
+        handler.addFilter(add_request_fields)
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(app.config['LOG_LEVEL'])
+        _log_handler, _log_pid = handler, os.getpid()
+
+def _stop_logging():
+    """Removes the installed handler, after its writer thread has written what was queued."""
+    global _log_handler, _log_listener
+    if _log_handler is None:
+        return
+    logging.getLogger().removeHandler(_log_handler)
+    if _log_listener is not None and _log_pid == os.getpid(): # A forked child has the queue but not the thread
+        _log_listener.stop()
+    _log_handler = _log_listener = None
+
+def logging_stats():
+    stats = {'format': app.config['LOG_FORMAT'], 'level': app.config['LOG_LEVEL'], 'queued_writer': _log_listener is not None}
+    handler, sample_filter = _log_handler, _log_sample_filter
+    if isinstance(handler, QueueingHandler):
+        stats.update(handler.stats())
+    if sample_filter is not None:
+        stats.update(sample_filter.stats())
+    return stats
+
+def flush_logging():
+    """Writes out queued records and detaches the handler; configure_logging() installs a new one."""
+    with _log_lock:
+        _stop_logging()
+
+configure_logging()
+atexit.register(flush_logging)
+CORS(app, origins=["http://localhost:8080", "http://127.0.0.1:5500", "null"], supports_credentials=True,
+     expose_headers=['ETag', 'X-Snapshot-Age']) # Added null origin for local file testing; ETag is read by apiCall
 
 # --- Database Helper Functions ---
+_db_pools = {} # Database path -> ConnectionPool, created lazily
+_db_pools_lock = threading.Lock()
+
+def get_db_pool(database=None):
+    """Returns the connection pool for a database path (default: the configured DATABASE)."""
+    database = database or app.config['DATABASE']
+    pool = _db_pools.get(database)
+    if pool is None:
+        with _db_pools_lock:
+            pool = _db_pools.get(database)
+            if pool is None:
+                pool = _db_pools[database] = ConnectionPool(
+                    database,
+                    max_size=app.config['DB_POOL_SIZE'],
+                    timeout=app.config['DB_POOL_TIMEOUT'],
+                    cached_statements=app.config['DB_STATEMENT_CACHE'],
+                    pragmas=app.config['DB_PRAGMAS'],
+                )
+    return pool
+
+def close_db_pool(database=None):
+    """Closes and forgets the pool for a database path."""
+    with _db_pools_lock:
+        pool = _db_pools.pop(database or app.config['DATABASE'], None)
+    if pool is not None:
+        pool.close_all()
+
 def get_db():
-    """Connects to the specific database."""
+    """Borrows a pooled connection for the rest of the app context."""
     db = getattr(g, '_database', None)
     if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
-        db.row_factory = sqlite3.Row
+        pool = get_db_pool()
+        db = g._database = pool.acquire()
+        g._database_pool = pool
+        db.set_trace_callback(sql_trace_callback()) # None clears a previous owner's callback
+    return db
+
+def release_db():
+    """
+    Returns the borrowed connection to its pool before the request ends, so slow work that
+    doesn't touch the database (password hashing) doesn't hold a pool slot. Anything
+    uncommitted is rolled back; a later get_db() borrows a connection again.
+    """
+    db = g.pop('_database', None)
+    if db is not None:
+        g.pop('_database_pool').release(db)
+
+# --- Read Snapshot ---
+# With READ_SNAPSHOT_ENABLED, anonymous listing and detail GETs read an in-memory copy of the
+# database (read_snapshot.py) that is refreshed in the background, so they never wait on a
+# writer. The data they see is at most READ_SNAPSHOT_MAX_AGE_SECONDS old, normally about
+# READ_SNAPSHOT_REFRESH_SECONDS; responses say how old in X-Snapshot-Age.
+# Signed-in users always read the database, so they see their own writes immediately.
+# Response cache entries built for anonymous requests are kept apart from the signed-in ones
+# (read_scoped_cache_key) and dropped whenever a new snapshot is swapped in.
+READ_SNAPSHOT_CACHE_TAG = 'read-snapshot'
+_read_snapshot_stores = {} # database -> SnapshotStore
+_read_snapshot_stores_lock = threading.Lock()
+
+def get_read_snapshot_store(database=None):
+    """Returns the snapshot store for a database path, starting its refresh thread on first use."""
+    database = database or app.config['DATABASE']
+    store = _read_snapshot_stores.get(database)
+    if store is None:
+        with _read_snapshot_stores_lock:
+            store = _read_snapshot_stores.get(database)
+            if store is None:
+                store = _read_snapshot_stores[database] = SnapshotStore(
+                    database,
+                    refresh_seconds=app.config['READ_SNAPSHOT_REFRESH_SECONDS'],
+                    refresh_commits=app.config['READ_SNAPSHOT_REFRESH_COMMITS'],
+                    min_interval_seconds=app.config['READ_SNAPSHOT_MIN_INTERVAL_SECONDS'],
+                    max_age_seconds=app.config['READ_SNAPSHOT_MAX_AGE_SECONDS'],
+                    max_readers=app.config['DB_POOL_SIZE'],
+                    cached_statements=app.config['DB_STATEMENT_CACHE'],
+                    on_error=lambda e: app.logger.error("Read snapshot refresh of %s failed: %s", database, e, exc_info=e),
+                    on_refresh=lambda snapshot: response_cache.invalidate([READ_SNAPSHOT_CACHE_TAG]),
+                )
+                store.start()
+                atexit.register(store.close)
+    return store
+
+def close_read_snapshot_store(database=None):
+    """Stops refreshing and forgets the snapshot store for a database path."""
+    with _read_snapshot_stores_lock:
+        store = _read_snapshot_stores.pop(database or app.config['DATABASE'], None)
+    if store is not None:
+        store.close()
+
+def reads_snapshot():
+    """Whether this request reads a snapshot when one is young enough: snapshots enabled and no signed-in session."""
+    return app.config['READ_SNAPSHOT_ENABLED'] and 'user_id' not in session
+
+def read_snapshot():
+    """
+    The snapshot this request reads, held until the request ends; None to read the database
+    (signed-in session, snapshots disabled, or no snapshot young enough yet).
+    """
+    if '_read_snapshot' not in g:
+        g._read_snapshot = None
+        if reads_snapshot():
+            store = get_read_snapshot_store()
+            g._read_snapshot = store.acquire()
+            g._read_snapshot_store = store
+    return g._read_snapshot
+
+def get_read_db():
+    """get_db() for read-only queries, which come from the request's snapshot when it has one."""
+    snapshot = read_snapshot()
+    if snapshot is None:
+        return get_db()
+    db = getattr(g, '_read_database', None)
+    if db is None:
+        db = g._read_database = snapshot.pool.acquire()
+        db.set_trace_callback(sql_trace_callback())
     return db
 
+def read_scoped_cache_key(key, tags):
+    """
+    The response cache key and tags for a route that reads through get_read_db(). Snapshot
+    readers get their own entries, so signed-in users are never served a body from an older
+    snapshot, tagged READ_SNAPSHOT_CACHE_TAG so a snapshot swap drops them all at once. Doesn't
+    acquire the snapshot: cached_json_response() takes its cache snapshot before build() does,
+    so a body built from a copy that was swapped out meanwhile is not stored.
+    """
+    if reads_snapshot():
+        g._read_snapshot_scoped = True # add_snapshot_age reports the snapshot's age on cache hits too
+        return key + ('snapshot',), tags + [READ_SNAPSHOT_CACHE_TAG]
+    return key + ('database',), tags
+
+def release_read_snapshot():
+    db = g.pop('_read_database', None)
+    snapshot = g.pop('_read_snapshot', None)
+    if db is not None:
+        snapshot.pool.release(db)
+    if snapshot is not None:
+        g.pop('_read_snapshot_store').release(snapshot)
+
+@app.after_request
+def add_snapshot_age(response):
+    """
+    X-Snapshot-Age: seconds since the data was copied, from the snapshot the request read, or
+    for a body served from the response cache, the current one (a swap drops bodies built
+    from older copies).
+    """
+    snapshot = g.get('_read_snapshot')
+    if snapshot is not None:
+        age = snapshot.age()
+    elif g.get('_read_snapshot_scoped') and '_read_snapshot' not in g: # Not a miss that fell back to the database
+        age = get_read_snapshot_store().current_age()
+    else:
+        return response
+    if age is not None:
+        response.headers['X-Snapshot-Age'] = f"{age:.3f}"
+    return response
+
 @app.teardown_appcontext
 def close_connection(exception):
-    """Closes the database again at the end of the request."""
-    db = getattr(g, '_database', None)
-    if db is not None:
-        db.close()
+    """Returns the connection to its pool (and any snapshot to its store) at the end of the request."""
+    release_db()
+    release_read_snapshot()
+
+@app.errorhandler(PoolTimeout)
+def handle_pool_timeout(error):
+    app.logger.error("Database pool exhausted: %s", error)
+    return jsonify({"error": "Server is busy, please retry shortly"}), 503
+
+# --- Request Metrics ---
+# Per-route latency, SQL counts/time and named stage timings, exported at /metrics
+request_metrics = RequestMetrics(
+    slow_request_seconds=app.config['SLOW_REQUEST_MS'] / 1000 if app.config['SLOW_REQUEST_MS'] is not None else None,
+    on_slow_request=lambda record: app.logger.warning("Slow request: %s %s took %.3fs", record['method'], record['endpoint'],
+                                                      record['seconds'], extra={'slow_request': record}))
+
+@app.before_request
+def start_request_trace():
+    g.request_trace = request_metrics.start()
+
+@app.after_request
+def record_response_status(response):
+    trace = g.get('request_trace')
+    if trace is not None:
+        trace.status = response.status_code
+    return response
+
+@app.teardown_request
+def finish_request_trace(exception):
+    """Records the request once it is done (for streamed responses, after the last chunk)."""
+    trace = g.pop('request_trace', None)
+    if trace is not None:
+        request_metrics.finish(trace, request.endpoint or 'unmatched', request.method, trace.status or 500)
+
+def sql_trace_callback():
+    """The trace callback for a connection borrowed now: the request trace plus SQL_TRACE_CALLBACK."""
+    configured = app.config.get('SQL_TRACE_CALLBACK')
+    trace = g.get('request_trace')
+    if trace is None:
+        return configured
+    if configured is None:
+        return trace.on_sql
+    def trace_both(statement):
+        trace.on_sql(statement)
+        configured(statement)
+    return trace_both
+
+def request_span(name):
+    """Times a stage of the current request under name; a no-op outside a traced request."""
+    trace = g.get('request_trace') if has_app_context() else None
+    return trace.span(name) if trace is not None else nullcontext()
+
+# --- Admission Control ---
+# Every request first passes a global concurrency cap that turns low-priority work away first,
+# then, on the routes in RATE_LIMITED_ENDPOINTS, per-client token buckets. Both answer with a
+# Retry-After header: 503 when the process is saturated, 429 when one client is over its rate.
+REQUEST_PRIORITIES = { # endpoint -> priority for AdmissionController; None is not counted; others are 'normal'
+    'login': 'low', # scrypt: the most expensive request per call
+    'register': 'low',
+    'search_startups': 'low',
+    'export_ndjson': 'low',
+    'get_my_startup_events': None, # Held open for minutes; EVENTS_MAX_SUBSCRIBERS bounds them instead
+    'static': None,
+    'get_metrics': 'critical', # Monitoring must keep working while the app sheds load
+    'get_liveness': 'critical',
+    'get_db_pool_stats': 'critical',
+    'get_response_cache_stats': 'critical',
+    'get_read_snapshot_stats': 'critical',
+    'get_admission_stats': 'critical',
+    'get_logging_stats': 'critical',
+    'get_password_hasher_stats': 'critical',
+    'get_slow_requests': 'critical',
+}
+
+def client_ip():
+    return request.remote_addr # The X-Forwarded-For client when PROXY_FIX_X_FOR trusts the proxies
+
+def login_email():
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+def session_user():
+    return session.get('user_id')
+
+RATE_LIMITED_ENDPOINTS = { # endpoint -> (bucket, key function) pairs, all checked; a None key skips that bucket
+    'login': [('auth_ip', client_ip), ('login_account', login_email)],
+    'register': [('auth_ip', client_ip)],
+    'manage_investor_interest': [('interest_ip', client_ip), ('interest_account', session_user)],
+}
+
+_rate_limiters = {} # bucket -> TokenBucketLimiter, created from RATE_LIMITS on first use
+_admission_controller = None
+_admission_lock = threading.Lock()
+
+def get_rate_limiter(bucket):
+    limiter = _rate_limiters.get(bucket)
+    if limiter is None:
+        with _admission_lock:
+            limiter = _rate_limiters.get(bucket)
+            if limiter is None:
+                rate, burst = app.config['RATE_LIMITS'][bucket]
+                limiter = _rate_limiters[bucket] = TokenBucketLimiter(rate, burst, max_keys=app.config['RATE_LIMIT_MAX_KEYS'])
+    return limiter
+
+def get_admission_controller():
+    global _admission_controller
+    if _admission_controller is None:
+        with _admission_lock:
+            if _admission_controller is None:
+                _admission_controller = AdmissionController(app.config['MAX_CONCURRENT_REQUESTS'],
+                                                            app.config['LOW_PRIORITY_SHARE'])
+    return _admission_controller
+
+@app.before_request
+def admit_request():
+    priority = REQUEST_PRIORITIES.get(request.endpoint, 'normal')
+    if priority is not None:
+        controller = get_admission_controller()
+        if not controller.try_enter(priority):
+            app.logger.warning("Shed %s-priority request to %s: %s in flight", priority, request.endpoint, controller.max_concurrent,
+                               extra={'sample_key': request.endpoint})
+            response = jsonify({"error": "Server is busy, please retry shortly"})
+            response.status_code = 503
+            response.headers['Retry-After'] = '1'
+            return response
+        g.admitted = controller
+
+    if app.config['RATE_LIMIT_ENABLED'] and request.endpoint in RATE_LIMITED_ENDPOINTS:
+        for bucket, key_function in RATE_LIMITED_ENDPOINTS[request.endpoint]:
+            key = key_function()
+            if key is None:
+                continue
+            retry_after = get_rate_limiter(bucket).acquire(key)
+            if retry_after:
+                app.logger.warning("Rate limited %s (%s) for %s: retry in %.1fs", request.endpoint, bucket, key, retry_after,
+                                   extra={'sample_key': (bucket, key)})
+                response = jsonify({"error": "Too many requests, please retry later"})
+                response.status_code = 429
+                response.headers['Retry-After'] = retry_after_header(retry_after)
+                return response
+
+@app.teardown_request
+def release_admission(exception):
+    """Frees the request's slot once it is done (for streamed responses, after the last chunk)."""
+    controller = g.pop('admitted', None)
+    if controller is not None:
+        controller.leave()
 
 def init_db():
-    """Initializes the database schema."""
+    """Drops all application tables and rebuilds the schema by running every migration."""
     try:
         with app.app_context():
             db = get_db()
             cursor = db.cursor()
             app.logger.info("Dropping existing tables (if they exist)...")
+            # Tables added by migrations first; they would otherwise survive and be reused as-is
+            cursor.execute("DROP TABLE IF EXISTS recommendation_model")
+            cursor.execute("DROP TABLE IF EXISTS startup_neighbors")
+            cursor.execute("DROP TABLE IF EXISTS startup_vectors")
+            cursor.execute("DROP TABLE IF EXISTS interest_events")
+            cursor.execute("DROP TABLE IF EXISTS startup_facets")
+            cursor.execute("DROP TABLE IF EXISTS startups_fts")
+            cursor.execute("DROP TABLE IF EXISTS financial_records")
             cursor.execute("DROP TABLE IF EXISTS investor_interest")
             cursor.execute("DROP TABLE IF EXISTS startups")
             cursor.execute("DROP TABLE IF EXISTS users")
-
-            app.logger.info("Creating users table...")
-            cursor.execute('''
-                CREATE TABLE users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    user_type TEXT NOT NULL CHECK(user_type IN ('startup', 'investor')),
-                    name TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            app.logger.info("Creating startups table...")
-            # Removed estimated_valuation as it's now calculated
-            cursor.execute('''
-                CREATE TABLE startups (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    company_name TEXT NOT NULL,
-                    description TEXT,
-                    industry TEXT,
-                    funding_goal REAL DEFAULT 0,
-                    funding_acquired REAL DEFAULT 0,
-                    years_operating INTEGER DEFAULT 0,
-                    website TEXT,
-                    logo_url TEXT, -- Added in registration form
-                    financial_history TEXT, -- Stored as JSON
-                    contact_phone TEXT,
-                    equity_offered REAL DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-                )
-            ''')
-
-            app.logger.info("Creating investor_interest table...")
-            cursor.execute('''
-                CREATE TABLE investor_interest (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    investor_user_id INTEGER NOT NULL,
-                    startup_id INTEGER NOT NULL,
-                    expressed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(investor_user_id, startup_id),
-                    FOREIGN KEY (investor_user_id) REFERENCES users (id) ON DELETE CASCADE,
-                    FOREIGN KEY (startup_id) REFERENCES startups (id) ON DELETE CASCADE
-                )
-            ''')
-
+            cursor.execute(f"DROP TABLE IF EXISTS {SCHEMA_VERSION_TABLE}")
             db.commit()
+
+            migrate(db)
             app.logger.info("Database initialized successfully.")
     except Exception as e:
-        app.logger.error(f"Error initializing database: {e}", exc_info=True)
+        app.logger.error("Error initializing database: %s", e, exc_info=True)
         if 'db' in locals() and db:
              db.rollback()
 
@@ -105,14 +515,432 @@ def init_db_command():
     """Clear existing data and create new tables via Flask CLI."""
     init_db()
 
+# --- Schema Migrations ---
+# Each migration runs once, in its own transaction, and is recorded in SCHEMA_VERSION_TABLE.
+# Migrations must be written so they also apply cleanly to databases created by the
+# old drop-and-recreate init_db (use IF NOT EXISTS / column checks), and must never lose data.
+SCHEMA_VERSION_TABLE = 'schema_version'
+
+# Full recount of startup_facets from startups (migration 7 and `flask rebuild-facets`);
+# it must aggregate exactly what the startup_facets_* triggers add and subtract.
+FACETS_RECOUNT_SQL = """
+    SELECT 'all', '', COUNT(*), TOTAL(COALESCE(funding_goal, 0)), TOTAL(COALESCE(funding_acquired, 0))
+    FROM startups GROUP BY 1, 2
+    UNION ALL
+    SELECT 'risk_category', COALESCE(risk_category, ''), COUNT(*), TOTAL(COALESCE(funding_goal, 0)), TOTAL(COALESCE(funding_acquired, 0))
+    FROM startups GROUP BY 1, 2
+    UNION ALL
+    SELECT 'industry', COALESCE(industry, ''), COUNT(*), TOTAL(COALESCE(funding_goal, 0)), TOTAL(COALESCE(funding_acquired, 0))
+    FROM startups GROUP BY 1, 2
+"""
+FACETS_REBUILD_SQL = f"""
+    INSERT INTO startup_facets (facet, value, startup_count, funding_goal_total, funding_acquired_total)
+    {FACETS_RECOUNT_SQL}
+"""
+# Rewrites every startup's interest_count from investor_interest (migration backfill; bulk loads)
+INTEREST_RECOUNT_SQL = """
+    UPDATE startups SET interest_count = (SELECT COUNT(*) FROM investor_interest WHERE startup_id = startups.id)
+"""
+
+def _table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+def _migration_baseline_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            user_type TEXT NOT NULL CHECK(user_type IN ('startup', 'investor')),
+            name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Removed estimated_valuation as it's now calculated
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS startups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            company_name TEXT NOT NULL,
+            description TEXT,
+            industry TEXT,
+            funding_goal REAL DEFAULT 0,
+            funding_acquired REAL DEFAULT 0,
+            years_operating INTEGER DEFAULT 0,
+            website TEXT,
+            logo_url TEXT, -- Added in registration form
+            financial_history TEXT, -- Legacy JSON, superseded by financial_records (migration 5)
+            contact_phone TEXT,
+            equity_offered REAL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS investor_interest (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            investor_user_id INTEGER NOT NULL,
+            startup_id INTEGER NOT NULL,
+            expressed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(investor_user_id, startup_id),
+            FOREIGN KEY (investor_user_id) REFERENCES users (id) ON DELETE CASCADE,
+            FOREIGN KEY (startup_id) REFERENCES startups (id) ON DELETE CASCADE
+        )
+    ''')
+
+def _migration_derived_risk_columns(cursor):
+    existing = _table_columns(cursor, 'startups')
+    for column, column_type in [('risk_score', 'REAL'), ('risk_category', 'TEXT'),
+                                ('risk_reasons', 'TEXT'), ('calculated_valuation', 'INTEGER')]:
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE startups ADD COLUMN {column} {column_type}")
+    # Backfill rows written before risk was precomputed (financials were still JSON at this version)
+    cursor.execute("""
+        SELECT id, funding_goal, funding_acquired, years_operating, equity_offered, financial_history
+        FROM startups WHERE risk_category IS NULL
+    """)
+    for row in cursor.fetchall():
+        startup_dict = dict(row)
+        try:
+            startup_dict['financial_history'] = load_financial_history(startup_dict['financial_history'])
+        except json.JSONDecodeError:
+            startup_dict['financial_history'] = []
+        store_startup_derived_fields(cursor, startup_dict)
+
+def _migration_listing_indexes(cursor):
+    # Keyset pagination order for /api/startups, with and without the risk filter
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_startups_created_at ON startups (created_at DESC, id DESC)")
+    cursor.execute("DROP INDEX IF EXISTS idx_startups_risk_category") # May exist with an older column list
+    cursor.execute("CREATE INDEX idx_startups_risk_category ON startups (risk_category, created_at DESC, id DESC)")
+
+def _migration_lookup_indexes(cursor):
+    # Every /api/my-startup* route resolves the session user's startup; (user_id) also covers id via rowid
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_startups_user_id ON startups (user_id)")
+    # Covering index for the analytics join: filter by startup, ordered by time, yields the investor id
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_investor_interest_startup
+        ON investor_interest (startup_id, expressed_at DESC, investor_user_id)
+    """)
+
+def _migration_financial_records(cursor):
+    # One row per startup and year; the PK keeps each series sorted by year on disk
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS financial_records (
+            startup_id INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            revenue REAL,
+            profit REAL,
+            PRIMARY KEY (startup_id, year),
+            FOREIGN KEY (startup_id) REFERENCES startups (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """)
+    # Backfill from the JSON blobs; startups.financial_history is no longer read or written after this
+    cursor.execute("""
+        SELECT id, funding_goal, funding_acquired, years_operating, equity_offered, financial_history
+        FROM startups WHERE financial_history IS NOT NULL
+    """)
+    for row in cursor.fetchall():
+        startup_dict = dict(row)
+        try:
+            financials_list = load_financial_history(startup_dict['financial_history'])
+        except json.JSONDecodeError:
+            app.logger.warning("Migration: could not decode financial_history for startup %s; skipping.", row['id'])
+            continue
+        startup_dict['financial_history'] = validate_financial_records(financials_list, f"startup {row['id']}")
+        cursor.executemany(
+            "INSERT OR REPLACE INTO financial_records (startup_id, year, revenue, profit) VALUES (?, ?, ?, ?)",
+            [(row['id'], item['year'], item['revenue'], item['profit']) for item in startup_dict['financial_history']]
+        )
+        store_startup_derived_fields(cursor, startup_dict) # Risk now follows the validated, year-sorted records
+
+def _migration_startup_search_index(cursor):
+    # External-content FTS5 index: the text lives only in startups, the index holds the tokens
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS startups_fts USING fts5(
+            company_name, description, industry,
+            content='startups', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    # Keep the index in step with startups; the update trigger ignores columns that aren't indexed
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS startups_fts_after_insert AFTER INSERT ON startups BEGIN
+            INSERT INTO startups_fts (rowid, company_name, description, industry)
+            VALUES (new.id, new.company_name, new.description, new.industry);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS startups_fts_after_delete AFTER DELETE ON startups BEGIN
+            INSERT INTO startups_fts (startups_fts, rowid, company_name, description, industry)
+            VALUES ('delete', old.id, old.company_name, old.description, old.industry);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS startups_fts_after_update
+        AFTER UPDATE OF company_name, description, industry ON startups BEGIN
+            INSERT INTO startups_fts (startups_fts, rowid, company_name, description, industry)
+            VALUES ('delete', old.id, old.company_name, old.description, old.industry);
+            INSERT INTO startups_fts (rowid, company_name, description, industry)
+            VALUES (new.id, new.company_name, new.description, new.industry);
+        END
+    """)
+    cursor.execute("INSERT INTO startups_fts (startups_fts) VALUES ('rebuild')") # Index existing rows
+
+def _migration_startup_facets(cursor):
+    # Per-value counts and funding totals for the listing facets, one row per (facet, value);
+    # facet 'all' (value '') holds the catalog totals. NULL values are stored as ''.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS startup_facets (
+            facet TEXT NOT NULL,
+            value TEXT NOT NULL,
+            startup_count INTEGER NOT NULL DEFAULT 0,
+            funding_goal_total REAL NOT NULL DEFAULT 0,
+            funding_acquired_total REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (facet, value)
+        ) WITHOUT ROWID
+    """)
+
+    def apply_delta(row, sign):
+        # Adds (sign 1) or removes (sign -1) one startup row's contribution to its three facet rows
+        return f"""
+            INSERT INTO startup_facets (facet, value, startup_count, funding_goal_total, funding_acquired_total)
+            VALUES ('all', '', {sign}, {sign} * COALESCE({row}.funding_goal, 0), {sign} * COALESCE({row}.funding_acquired, 0)),
+                   ('risk_category', COALESCE({row}.risk_category, ''), {sign},
+                    {sign} * COALESCE({row}.funding_goal, 0), {sign} * COALESCE({row}.funding_acquired, 0)),
+                   ('industry', COALESCE({row}.industry, ''), {sign},
+                    {sign} * COALESCE({row}.funding_goal, 0), {sign} * COALESCE({row}.funding_acquired, 0))
+            ON CONFLICT (facet, value) DO UPDATE SET
+                startup_count = startup_count + excluded.startup_count,
+                funding_goal_total = funding_goal_total + excluded.funding_goal_total,
+                funding_acquired_total = funding_acquired_total + excluded.funding_acquired_total;
+        """
+    # Values nobody holds any more are removed by key, so industries typed once don't pile up
+    prune_old = """
+        DELETE FROM startup_facets
+        WHERE startup_count <= 0
+          AND ((facet = 'risk_category' AND value = COALESCE(old.risk_category, ''))
+               OR (facet = 'industry' AND value = COALESCE(old.industry, '')));
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS startup_facets_after_insert AFTER INSERT ON startups BEGIN
+            {apply_delta('new', 1)}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS startup_facets_after_delete AFTER DELETE ON startups BEGIN
+            {apply_delta('old', -1)}
+            {prune_old}
+        END
+    """)
+    # Risk recomputation (routes and rescore-all) writes risk_category, so it fires this trigger too
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS startup_facets_after_update
+        AFTER UPDATE OF risk_category, industry, funding_goal, funding_acquired ON startups BEGIN
+            {apply_delta('old', -1)}
+            {apply_delta('new', 1)}
+            {prune_old}
+        END
+    """)
+    cursor.execute("DELETE FROM startup_facets")
+    cursor.execute(FACETS_REBUILD_SQL)
+
+def _migration_interest_counts(cursor):
+    # Denormalized investor_interest count per startup, kept by triggers so no route has to COUNT
+    if 'interest_count' not in _table_columns(cursor, 'startups'):
+        cursor.execute("ALTER TABLE startups ADD COLUMN interest_count INTEGER NOT NULL DEFAULT 0")
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS interest_count_after_insert AFTER INSERT ON investor_interest BEGIN
+            UPDATE startups SET interest_count = interest_count + 1 WHERE id = new.startup_id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS interest_count_after_delete AFTER DELETE ON investor_interest BEGIN
+            UPDATE startups SET interest_count = interest_count - 1 WHERE id = old.startup_id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS interest_count_after_update AFTER UPDATE OF startup_id ON investor_interest BEGIN
+            UPDATE startups SET interest_count = interest_count - 1 WHERE id = old.startup_id;
+            UPDATE startups SET interest_count = interest_count + 1 WHERE id = new.startup_id;
+        END
+    """)
+    cursor.execute(INTEREST_RECOUNT_SQL)
+    # Keyset order of ?sort=popular, with and without the risk filter
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_startups_popular ON startups (interest_count DESC, created_at DESC, id DESC)")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_startups_risk_popular
+        ON startups (risk_category, interest_count DESC, created_at DESC, id DESC)
+    """)
+
+def _migration_packed_financials(cursor):
+    # Year-sorted (year, revenue, profit) records packed into one BLOB per startup (financial_pack.py),
+    # derived from financial_records like the risk columns; detail views read it instead of the records
+    if 'financial_packed' not in _table_columns(cursor, 'startups'):
+        cursor.execute("ALTER TABLE startups ADD COLUMN financial_packed BLOB")
+    # Backfill in id ranges; financial_records already holds the legacy JSON histories (migration 5)
+    last_id = 0
+    while True:
+        ids = [row[0] for row in cursor.execute("SELECT id FROM startups WHERE id > ? ORDER BY id LIMIT 5000", (last_id,)).fetchall()]
+        if not ids:
+            break
+        histories = {startup_id: [] for startup_id in ids}
+        cursor.execute("""
+            SELECT startup_id, year, revenue, profit FROM financial_records
+            WHERE startup_id BETWEEN ? AND ? ORDER BY startup_id, year
+        """, (ids[0], ids[-1]))
+        for record in cursor.fetchall():
+            histories[record['startup_id']].append(dict(record))
+        cursor.executemany("UPDATE startups SET financial_packed = ? WHERE id = ?",
+                           [(pack_financials(history), startup_id) for startup_id, history in histories.items()])
+        last_id = ids[-1]
+
+def _migration_interest_events(cursor):
+    # Append-only log of interest changes, the replay source for /api/my-startup/events. AUTOINCREMENT
+    # keeps ids from being reused, so a client's Last-Event-ID always means the same position
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interest_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            startup_id INTEGER NOT NULL,
+            investor_user_id INTEGER NOT NULL,
+            action TEXT NOT NULL CHECK (action IN ('added', 'removed')),
+            interest_count INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_interest_events_startup ON interest_events (startup_id, id)")
+
+def _migration_recommendations(cursor):
+    # Similarity index behind /api/recommendations (recommender.py). Empty until the first
+    # `flask rebuild-recommendations`; the route falls back to popular startups meanwhile
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS startup_vectors (
+            startup_id INTEGER PRIMARY KEY,
+            vector BLOB NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS startup_neighbors (
+            startup_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            neighbor_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (startup_id, rank)
+        ) WITHOUT ROWID
+    """)
+    # Whose neighbour lists a changed startup is on (incremental updates)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_startup_neighbors_neighbor ON startup_neighbors (neighbor_id)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS recommendation_model (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            model TEXT NOT NULL,
+            revision INTEGER NOT NULL,
+            built_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+MIGRATIONS = [
+    (1, 'baseline schema', _migration_baseline_schema),
+    (2, 'derived risk and valuation columns', _migration_derived_risk_columns),
+    (3, 'listing indexes', _migration_listing_indexes),
+    (4, 'user and interest lookup indexes', _migration_lookup_indexes),
+    (5, 'financial_records table', _migration_financial_records),
+    (6, 'startup full-text search index', _migration_startup_search_index),
+    (7, 'startup facet aggregates', _migration_startup_facets),
+    (8, 'startup interest counts', _migration_interest_counts),
+    (9, 'packed financial histories', _migration_packed_financials),
+    (10, 'interest event log', _migration_interest_events),
+    (11, 'recommendation index', _migration_recommendations),
+]
+
+def applied_migrations(db):
+    """Returns {version: applied_at} for migrations already recorded in the database."""
+    db.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    rows = db.execute(f"SELECT version, applied_at FROM {SCHEMA_VERSION_TABLE}").fetchall()
+    return {row[0]: row[1] for row in rows}
+
+def migrate(db):
+    """Applies all pending migrations in order. Returns the list of versions applied."""
+    applied = applied_migrations(db)
+    newly_applied = []
+    for version, name, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        cursor = db.cursor()
+        try:
+            cursor.execute("BEGIN") # DDL is not implicitly transactional in sqlite3; make each step atomic
+            migration(cursor)
+            cursor.execute(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name) VALUES (?, ?)", (version, name))
+            db.commit()
+        except Exception:
+            db.rollback()
+            app.logger.error("Migration %s (%s) failed; database left at the previous version.", version, name)
+            raise
+        app.logger.info("Applied migration %s: %s", version, name)
+        newly_applied.append(version)
+    return newly_applied
+
+@app.cli.command('migrate')
+@click.option('--status', is_flag=True, help='List applied and pending migrations without applying anything.')
+def migrate_command(status):
+    """Apply pending schema migrations without touching existing data."""
+    with app.app_context():
+        db = get_db()
+        if status:
+            applied = applied_migrations(db)
+            for version, name, _ in MIGRATIONS:
+                state = f"applied {applied[version]}" if version in applied else "pending"
+                click.echo(f"{version:>4}  {name:<40} {state}")
+            return
+        newly_applied = migrate(db)
+        click.echo(f"Applied {len(newly_applied)} migration(s)." if newly_applied else "Database is up to date.")
+
 # --- Password Hashing ---
+# scrypt runs on a process pool owned by this app process (created on first use, so each
+# server worker process gets its own). Changing the SCRYPT_* settings only affects new
+# hashes; older ones are upgraded on the next successful login, like legacy SHA-256 hashes.
+_password_hasher = None
+_password_hasher_lock = threading.Lock()
+
+def get_password_hasher():
+    global _password_hasher
+    if _password_hasher is None:
+        with _password_hasher_lock:
+            if _password_hasher is None:
+                _password_hasher = PasswordHasher(
+                    workers=app.config['PASSWORD_HASH_WORKERS'],
+                    max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+                    timeout=app.config['PASSWORD_HASH_TIMEOUT'],
+                    n=app.config['SCRYPT_N'], r=app.config['SCRYPT_R'], p=app.config['SCRYPT_P'],
+                )
+                atexit.register(_password_hasher.shutdown)
+    return _password_hasher
+
 def hash_password(password):
-    """Hashes the password. IMPORTANT: Use bcrypt or Argon2 in production!"""
-    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+    """Hashes the password with scrypt on the hashing pool. Raises HasherBusy when it is saturated."""
+    with request_span('password_hash'):
+        return get_password_hasher().hash(password)
 
 def verify_password(stored_hash, provided_password):
-    """Verifies a provided password against the stored hash."""
-    return stored_hash == hash_password(provided_password)
+    """Verifies a provided password against the stored scrypt or legacy SHA-256 hash."""
+    with request_span('password_hash'):
+        return get_password_hasher().verify(stored_hash, provided_password)
+
+def password_needs_rehash(stored_hash):
+    """True for legacy SHA-256 hashes and scrypt hashes made with other cost settings."""
+    return get_password_hasher().needs_rehash(stored_hash)
+
+@app.errorhandler(HasherBusy)
+def handle_hasher_busy(error):
+    app.logger.warning("Password hashing saturated: %s", error)
+    response = jsonify({"error": "Server is busy, please retry shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 # --- Risk Analysis Helper ---
 def calculate_risk(startup_data):
@@ -122,6 +950,8 @@ def calculate_risk(startup_data):
     """
     risk_score = 0
     reasons = []
+    startup_id = startup_data.get('id', 'N/A')
+    sampled = {'sample_key': startup_data.get('id')} # Logged on every read of a bad row: once a minute per startup is enough
 
     # Use .get() with defaults to handle potentially missing keys safely
     goal = startup_data.get('funding_goal', 0) or 0
@@ -130,7 +960,7 @@ def calculate_risk(startup_data):
     # Ensure financial_history is treated as a list, default to empty if not present/valid
     financials = startup_data.get('financial_history', [])
     if not isinstance(financials, list):
-        app.logger.warning(f"Financial history data was not a list during risk calculation for startup ID {startup_data.get('id', 'N/A')}.")
+        app.logger.warning("Financial history data was not a list during risk calculation for startup ID %s.", startup_id, extra=sampled)
         financials = [] # Default to empty list
 
     # Factor 1: Funding Gap
@@ -161,10 +991,10 @@ def calculate_risk(startup_data):
 
             if revenue_str is not None:
                 try: revenue = float(revenue_str)
-                except (ValueError, TypeError): app.logger.warning(f"Could not convert revenue '{revenue_str}' to float.")
+                except (ValueError, TypeError): app.logger.warning("Could not convert revenue '%s' to float for startup %s.", revenue_str, startup_id, extra=sampled)
             if profit_str is not None:
                 try: profit = float(profit_str)
-                except (ValueError, TypeError): app.logger.warning(f"Could not convert profit '{profit_str}' to float.")
+                except (ValueError, TypeError): app.logger.warning("Could not convert profit '%s' to float for startup %s.", profit_str, startup_id, extra=sampled)
 
             if profit is not None and profit <= 0:
                 risk_score += 1
@@ -176,11 +1006,11 @@ def calculate_risk(startup_data):
                  risk_score -= 0.5 # Reduce risk slightly for profit
 
         except (IndexError):
-             app.logger.warning(f"Financial history list was empty when trying to access last element.")
+             app.logger.warning("Financial history list was empty when trying to access last element.", extra=sampled)
         except (TypeError, ValueError) as e:
-            app.logger.warning(f"Could not process financial data for risk: {e}")
+            app.logger.warning("Could not process financial data for risk for startup %s: %s", startup_id, e, extra=sampled)
         except Exception as e:
-             app.logger.error(f"Unexpected error processing financial data for risk: {e}", exc_info=True)
+             app.logger.error("Unexpected error processing financial data for risk for startup %s: %s", startup_id, e, exc_info=True)
     else:
          risk_score += 1 # No financial data provided adds some risk uncertainty
          reasons.append("No detailed financial history provided.")
@@ -217,9 +1047,283 @@ def calculate_valuation(startup_data):
         else:
             return None # Cannot calculate
     except (ValueError, TypeError, ZeroDivisionError) as e:
-        app.logger.warning(f"Could not calculate valuation for startup {startup_data.get('id', 'N/A')}: {e}")
+        app.logger.warning("Could not calculate valuation for startup %s: %s", startup_data.get('id', 'N/A'), e,
+                           extra={'sample_key': startup_data.get('id')})
         return None
 
+# --- Response Cache ---
+# Serialized bodies of the public startup GET routes, invalidated by the write routes after they commit
+response_cache = ResponseCache(max_entries=app.config['RESPONSE_CACHE_SIZE'], ttl=app.config['RESPONSE_CACHE_TTL'])
+LIST_CACHE_TAG = 'startups:list'
+POPULAR_CACHE_TAG = 'startups:popular' # Listing pages ranked by interest_count, which interest writes change
+
+def startup_cache_tag(startup_id):
+    return f'startup:{startup_id}'
+
+def cached_json_response(key, tags, build):
+    """
+    Serves a GET from response_cache, calling build() -> (payload, status) on a miss.
+    Only 200 responses are stored. Every response carries a strong ETag of its body,
+    and a matching If-None-Match is answered with 304.
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        snapshot = response_cache.snapshot(tags) # Taken before reading, so a racing write can't leave a stale entry
+        payload, status = build()
+        with request_span('jsonify'):
+            response = jsonify(payload)
+            if status != 200:
+                response.status_code = status
+                return response
+            body = response.get_data()
+            entry = EncodedBody(body, hashlib.sha256(body).hexdigest())
+        response_cache.set(key, entry, tags, snapshot)
+
+    encoding = response_encoding(len(entry.body))
+    if encoding is None:
+        response = app.response_class(entry.body, mimetype='application/json')
+        response.set_etag(entry.etag)
+    else:
+        with request_span('compress'):
+            response = app.response_class(entry.encoded(encoding, app.config['COMPRESS_LEVEL']), mimetype='application/json')
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(f"{entry.etag}-{encoding}") # Each encoding is its own representation
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'private, no-cache' # Clients may keep it but must revalidate
+    return response.make_conditional(request)
+
+def response_encoding(size):
+    """The Content-Encoding to compress a body of size bytes with for this request, or None to send it as is."""
+    if size < app.config['COMPRESS_MIN_BYTES']:
+        return None
+    return negotiate_encoding(request.accept_encodings)
+
+@app.after_request
+def compress_response(response):
+    """
+    Compresses other large JSON and text responses. Streamed responses (exports), responses
+    that already carry a Content-Encoding (cached bodies, gzipped exports) and file
+    responses are left alone.
+    """
+    if (response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    body = response.get_data()
+    encoding = response_encoding(len(body))
+    if len(body) >= app.config['COMPRESS_MIN_BYTES']:
+        response.vary.add('Accept-Encoding')
+    if encoding is not None:
+        with request_span('compress'):
+            response.set_data(compress(body, encoding, app.config['COMPRESS_LEVEL']))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html'}
+
+def invalidate_startup_caches(startup_id=None, listing=True, popularity=False):
+    """
+    Drops cached responses affected by a committed write to a startup (and/or the listing).
+    popularity=True for interest changes, which only reorder the sort=popular pages.
+    """
+    tags = [LIST_CACHE_TAG] if listing else []
+    if popularity:
+        tags.append(POPULAR_CACHE_TAG)
+    if startup_id is not None:
+        tags.append(startup_cache_tag(startup_id))
+    response_cache.invalidate(tags)
+    if app.config['READ_SNAPSHOT_ENABLED']:
+        get_read_snapshot_store().note_commit() # Enough of these refresh the snapshot early
+
+# --- Derived Fields (Risk & Valuation) ---
+RISK_FILTERS = {'low': 'Low Risk', 'average': 'Average Risk', 'high': 'High Risk'}
+
+# --- Listing Pagination ---
+CARD_FIELDS = ['id', 'company_name', 'description', 'industry', 'funding_goal',
+               'funding_acquired', 'logo_url', 'risk_category'] # Columns a list card may request
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+LISTING_SORTS = { # ?sort= value -> keyset columns, all descending; each order has an index (migrations 3 and 8)
+    'newest': ('created_at', 'id'),
+    'popular': ('interest_count', 'created_at', 'id'),
+}
+
+def encode_cursor(*position):
+    """Encodes the keyset position of the last row on a page: (created_at, id) or (interest_count, created_at, id)."""
+    raw = json.dumps(list(position)).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor_value):
+    """Decodes a cursor from encode_cursor into a tuple. Raises ValueError if it is malformed."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor_value.encode('ascii')))
+    except Exception as e:
+        raise ValueError(f"Malformed cursor: {e}")
+    if not isinstance(position, list) or len(position) not in (2, 3):
+        raise ValueError("Malformed cursor: unexpected length")
+    *counts, created_at, startup_id = position
+    if not isinstance(created_at, str) or not isinstance(startup_id, int) or not all(isinstance(c, int) for c in counts):
+        raise ValueError("Malformed cursor: unexpected value types")
+    return tuple(position)
+
+def fetch_financial_history(cursor, startup_id):
+    """Returns a startup's financial records as a list of dicts, oldest year first (primary key order)."""
+    cursor.execute("SELECT year, revenue, profit FROM financial_records WHERE startup_id = ? ORDER BY year", (startup_id,))
+    return [dict(row) for row in cursor.fetchall()]
+
+def validate_financial_records(financials_list, log_context):
+    """
+    Normalizes submitted financial records to [{'year', 'revenue', 'profit'}] sorted by year.
+    Entries without an integer year, with unparseable numbers or with a duplicate year are skipped.
+    """
+    validated_financials = []
+    seen_years = set()
+    for item in financials_list:
+        if isinstance(item, dict) and 'year' in item:
+            try:
+                year = int(item['year'])
+                if year in seen_years:
+                     app.logger.warning("Duplicate year %s found in financial records for %s. Skipping.", year, log_context)
+                     continue
+
+                revenue = item.get('revenue')
+                profit = item.get('profit')
+                # Store as float or None
+                item_revenue = float(revenue) if revenue is not None else None
+                item_profit = float(profit) if profit is not None else None
+
+                seen_years.add(year)
+                validated_financials.append({'year': year, 'revenue': item_revenue, 'profit': item_profit})
+            except (ValueError, TypeError) as e:
+                 app.logger.warning("Skipping invalid financial entry for %s: %s - Error: %s", log_context, item, e)
+        else:
+            app.logger.warning("Skipping invalid financial entry format for %s: %s", log_context, item)
+    validated_financials.sort(key=lambda x: x['year'])
+    return validated_financials
+
+def apply_financial_records_diff(cursor, startup_id, validated_financials):
+    """
+    Makes financial_records for a startup match validated_financials, touching only the years
+    that were added, changed or removed. Runs on the caller's transaction; returns change counts.
+    """
+    existing = {row['year']: (row['revenue'], row['profit']) for row in fetch_financial_history(cursor, startup_id)}
+    wanted = {item['year']: (item['revenue'], item['profit']) for item in validated_financials}
+
+    inserts = [(startup_id, year, *values) for year, values in wanted.items() if year not in existing]
+    updates = [(*values, startup_id, year) for year, values in wanted.items() if year in existing and existing[year] != values]
+    deletes = [(startup_id, year) for year in existing if year not in wanted]
+
+    if inserts:
+        cursor.executemany("INSERT INTO financial_records (startup_id, year, revenue, profit) VALUES (?, ?, ?, ?)", inserts)
+    if updates:
+        cursor.executemany("UPDATE financial_records SET revenue = ?, profit = ? WHERE startup_id = ? AND year = ?", updates)
+    if deletes:
+        cursor.executemany("DELETE FROM financial_records WHERE startup_id = ? AND year = ?", deletes)
+    return {"inserted": len(inserts), "updated": len(updates), "deleted": len(deletes)}
+
+def load_financial_history(financial_history_json):
+    """Decodes a legacy financial_history JSON value, defaulting to an empty list."""
+    if not financial_history_json or not financial_history_json.strip():
+        return []
+    loaded = json.loads(financial_history_json)
+    return loaded if isinstance(loaded, list) else []
+
+def store_startup_derived_fields(cursor, startup_dict):
+    """Computes risk and valuation for a startup dict (with a decoded financial_history list) and stores them."""
+    risk_info = calculate_risk(startup_dict)
+    calculated_val = calculate_valuation(startup_dict)
+    cursor.execute("""
+        UPDATE startups
+        SET risk_score = ?, risk_category = ?, risk_reasons = ?, calculated_valuation = ?
+        WHERE id = ?
+    """, (risk_info['score'], risk_info['category'], json.dumps(risk_info['reasons']), calculated_val, startup_dict['id']))
+    return risk_info
+
+def refresh_startup_derived_fields(cursor, startup_id):
+    """
+    Recomputes the stored risk analysis, valuation and packed financial history for one startup.
+    Must be called by every write path that changes inputs to calculate_risk or
+    calculate_valuation, inside the same transaction as the change itself.
+    """
+    cursor.execute("""
+        SELECT id, funding_goal, funding_acquired, years_operating, equity_offered
+        FROM startups WHERE id = ?
+    """, (startup_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    startup_dict = dict(row)
+    startup_dict['financial_history'] = fetch_financial_history(cursor, startup_id)
+    cursor.execute("UPDATE startups SET financial_packed = ? WHERE id = ?",
+                   (pack_financials(startup_dict['financial_history']), startup_id))
+    return store_startup_derived_fields(cursor, startup_dict)
+
+def stored_risk_analysis(startup_dict):
+    """Builds the risk_analysis payload from the stored derived columns."""
+    try:
+        reasons = json.loads(startup_dict.get('risk_reasons') or '[]')
+    except json.JSONDecodeError:
+        reasons = []
+    return {"score": startup_dict.get('risk_score'), "category": startup_dict.get('risk_category'), "reasons": reasons}
+
+# --- Submitted Data Validation ---
+# Shared by the routes and `flask import`, so bulk-loaded rows obey the same rules as the forms.
+USER_REQUIRED_FIELDS = ['email', 'password', 'name', 'user_type']
+STARTUP_PROFILE_FIELDS = ['company_name', 'description', 'industry', 'funding_goal',
+                          'funding_acquired', 'years_operating', 'website', 'logo_url',
+                          'contact_phone', 'equity_offered'] # Excludes financials & valuation
+STARTUP_OPTIONAL_TEXT_FIELDS = ['website', 'logo_url', 'description', 'industry', 'contact_phone']
+
+def registration_error(data, required_fields=USER_REQUIRED_FIELDS):
+    """Returns the error message for an unacceptable registration payload, or None."""
+    if not data or not all(field in data for field in required_fields):
+        return "Missing required fields"
+    if data['user_type'] not in ['startup', 'investor']:
+        return "Invalid user type"
+    return None
+
+def coerce_startup_field(field, value):
+    """Converts one submitted profile field to its stored form. Raises ValueError with a user-facing message."""
+    # Type conversions/validations
+    if field in ['funding_goal', 'funding_acquired', 'equity_offered'] and value is not None:
+        try: value = float(value)
+        except (ValueError, TypeError): raise ValueError(f"Invalid numeric value for {field}")
+    elif field == 'years_operating' and value is not None:
+        try: value = int(value)
+        except (ValueError, TypeError): raise ValueError(f"Invalid integer value for {field}")
+    elif field == 'contact_phone' and value is not None:
+        value = str(value).strip()
+    # Handle optional text fields possibly being null/empty
+    if value == '' and field in STARTUP_OPTIONAL_TEXT_FIELDS:
+        value = None # Store as NULL if empty string is sent for optional text fields
+    return value
+
+def coerce_submitted_financials(financials_list, log_context):
+    """
+    Financial records as sent by the registration form: entries need a year and a revenue or
+    profit; unparseable numbers become None. Returns the validate_financial_records result.
+    """
+    if not isinstance(financials_list, list):
+        app.logger.warning("Received non-list financial data for %s. Type: %s", log_context, type(financials_list))
+        return []
+    validated_financials = []
+    for item in financials_list:
+        if isinstance(item, dict) and 'year' in item and ('revenue' in item or 'profit' in item):
+            item = dict(item)
+            try:
+                # Attempt conversion, default to None on failure
+                item['revenue'] = float(item.get('revenue')) if item.get('revenue') is not None else None
+            except (ValueError, TypeError): item['revenue'] = None
+            try:
+                item['profit'] = float(item.get('profit')) if item.get('profit') is not None else None
+            except (ValueError, TypeError): item['profit'] = None
+            validated_financials.append(item)
+        else:
+            app.logger.warning("Skipping invalid financial entry for %s: %s", log_context, item)
+    # Normalizes years to integers, drops duplicates and sorts
+    return validate_financial_records(validated_financials, log_context)
+
 
 # --- API Routes ---
 
@@ -227,13 +1331,14 @@ def calculate_valuation(startup_data):
 @app.route('/api/register', methods=['POST'])
 def register():
     data = request.get_json()
-    required_fields = ['email', 'password', 'name', 'user_type']
-    if not data or not all(field in data for field in required_fields):
-        app.logger.warning("Registration attempt with missing fields.")
-        return jsonify({"error": "Missing required fields"}), 400
-    if data['user_type'] not in ['startup', 'investor']:
-         app.logger.warning(f"Registration attempt with invalid user type: {data.get('user_type')}")
-         return jsonify({"error": "Invalid user type"}), 400
+    error = registration_error(data)
+    if error:
+        app.logger.warning("Registration attempt rejected: %s (user type: %s)", error, (data or {}).get('user_type'))
+        return jsonify({"error": error}), 400
+
+    # Hash before borrowing a database connection, so no connection sits idle waiting on the pool;
+    # HasherBusy propagates to its 503 handler
+    hashed_pw = hash_password(data['password'])
 
     db = get_db()
     cursor = db.cursor()
@@ -241,17 +1346,15 @@ def register():
     try:
         cursor.execute("SELECT id FROM users WHERE email = ?", (data['email'],))
         if cursor.fetchone():
-            app.logger.info(f"Registration failed: Email '{data.get('email')}' already exists.")
+            app.logger.info("Registration failed: Email '%s' already exists.", data.get('email'))
             return jsonify({"error": "Email already registered"}), 409
 
-        hashed_pw = hash_password(data['password'])
-
         cursor.execute(
             "INSERT INTO users (email, password_hash, user_type, name) VALUES (?, ?, ?, ?)",
             (data['email'], hashed_pw, data['user_type'], data['name'])
         )
         user_id = cursor.lastrowid
-        app.logger.info(f"User '{data.get('email')}' registered successfully with ID: {user_id}")
+        app.logger.info("User '%s' registered successfully with ID: %s", data.get('email'), user_id)
 
         # If it's a startup, create the startup profile
         if data['user_type'] == 'startup':
@@ -267,56 +1370,38 @@ def register():
             except ValueError: equity_offered = 0
 
             # Financial history processing (ensure this is robust)
-            financials_list = data.get('financials', [])
-            financial_history_json = None
-            validated_financials = []
-            if isinstance(financials_list, list):
-                 for item in financials_list:
-                     if isinstance(item, dict) and 'year' in item and ('revenue' in item or 'profit' in item):
-                         try:
-                             # Attempt conversion, default to None on failure
-                             item['revenue'] = float(item.get('revenue')) if item.get('revenue') is not None else None
-                         except (ValueError, TypeError): item['revenue'] = None
-                         try:
-                             item['profit'] = float(item.get('profit')) if item.get('profit') is not None else None
-                         except (ValueError, TypeError): item['profit'] = None
-                         validated_financials.append(item)
-                     else:
-                        app.logger.warning(f"Skipping invalid financial entry during registration for user {user_id}: {item}")
-
-                 if validated_financials:
-                    try:
-                        validated_financials.sort(key=lambda x: x.get('year', 0)) # Sort by year index
-                        financial_history_json = json.dumps(validated_financials)
-                    except TypeError as e:
-                        app.logger.error(f"Could not serialize financial history for user {user_id}: {e}")
-            else:
-                app.logger.warning(f"Received non-list financial data for user {user_id}. Type: {type(financials_list)}")
+            validated_financials = coerce_submitted_financials(data.get('financials', []), f"registration of user {user_id}")
 
             # Insert startup data (Removed estimated_valuation)
             cursor.execute(
                 """
                 INSERT INTO startups
                 (user_id, company_name, description, industry, funding_goal,
-                 funding_acquired, years_operating, website, logo_url, financial_history,
+                 funding_acquired, years_operating, website, logo_url,
                  contact_phone, equity_offered)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (user_id, company_name, data.get('description', ''), data.get('industry', ''),
                  funding_goal, funding_acquired, years_operating,
                  data.get('website', ''), logo_url, # Use collected logo_url
-                 financial_history_json,
                  contact_phone,
                  equity_offered)
              )
-            app.logger.info(f"Startup profile created for user ID: {user_id}, company: '{company_name}'")
+            startup_id = cursor.lastrowid
+            apply_financial_records_diff(cursor, startup_id, validated_financials)
+            refresh_startup_derived_fields(cursor, startup_id)
+            app.logger.info("Startup profile created for user ID: %s, company: '%s'", user_id, company_name)
 
         db.commit()
+        if data['user_type'] == 'startup':
+            update_financial_analytics(db, [startup_id])
+            invalidate_startup_caches() # A new card appears in the listing
+            queue_recommendation_update(startup_id)
         return jsonify({"message": "User registered successfully", "userId": user_id}), 201
 
     except sqlite3.IntegrityError as e:
         db.rollback()
-        app.logger.error(f"Database Integrity Error during registration: {e}", exc_info=True)
+        app.logger.error("Database Integrity Error during registration: %s", e, exc_info=True)
         # Check if it's the email constraint
         if "UNIQUE constraint failed: users.email" in str(e):
              return jsonify({"error": "Email already registered"}), 409
@@ -324,7 +1409,7 @@ def register():
              return jsonify({"error": "Database integrity error during registration"}), 400
     except Exception as e:
         db.rollback()
-        app.logger.error(f"Unexpected Error during registration: {e}", exc_info=True)
+        app.logger.error("Unexpected Error during registration: %s", e, exc_info=True)
         return jsonify({"error": "An internal server error occurred during registration"}), 500
 
 
@@ -342,21 +1427,34 @@ def login():
     try:
         cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
         user = cursor.fetchone()
+        release_db() # Not needed while the hashing pool verifies the password
 
         if user and verify_password(user['password_hash'], password):
+            if password_needs_rehash(user['password_hash']):
+                # Upgrade legacy SHA-256 (or outdated scrypt settings) now that we hold the plaintext
+                try:
+                    new_hash = hash_password(password)
+                    db = get_db()
+                    db.execute("UPDATE users SET password_hash = ? WHERE id = ?", (new_hash, user['id']))
+                    db.commit()
+                    app.logger.info("Rehashed password for user %s.", user['id'])
+                except HasherBusy:
+                    app.logger.warning("Hashing pool busy; password for user %s will be rehashed on a later login.", user['id'])
             session.clear()
             session['user_id'] = user['id']
             session['user_type'] = user['user_type']
             session['name'] = user['name']
             session['email'] = user['email']
-            app.logger.info(f"User '{email}' logged in successfully.")
+            app.logger.info("User '%s' logged in successfully.", email)
             user_info = {"id": user['id'], "email": user['email'], "name": user['name'], "user_type": user['user_type']}
             return jsonify({"message": "Login successful", "user": user_info}), 200
         else:
-            app.logger.warning(f"Failed login attempt for email: '{email}'")
+            app.logger.warning("Failed login attempt for email: '%s'", email)
             return jsonify({"error": "Invalid email or password"}), 401
+    except (HasherBusy, PoolTimeout):
+        raise # Answered with 503 by their error handlers
     except Exception as e:
-        app.logger.error(f"Database error during login for email '{email}': {e}", exc_info=True)
+        app.logger.error("Database error during login for email '%s': %s", email, e, exc_info=True)
         return jsonify({"error": "An error occurred during login"}), 500
 
 
@@ -364,7 +1462,7 @@ def login():
 def logout():
     user_email = session.get('email', 'Unknown User')
     session.clear()
-    app.logger.info(f"User '{user_email}' logged out.")
+    app.logger.info("User '%s' logged out.", user_email)
     return jsonify({"message": "Logout successful"}), 200
 
 
@@ -385,120 +1483,421 @@ def auth_status():
 # --- Startups ---
 @app.route('/api/startups', methods=['GET'])
 def get_startups():
-    """Gets a list of startups for card display, including risk category."""
-    try:
-        db = get_db()
-        cursor = db.cursor()
-        # Select fields needed for cards and risk calculation
-        cursor.execute("""
-            SELECT id, user_id, company_name, description, industry, funding_goal,
-                   funding_acquired, years_operating, website, logo_url, financial_history
-            FROM startups ORDER BY created_at DESC
-        """)
-        startup_rows = cursor.fetchall()
+    """
+    Gets one page of startups for card display, newest first, including risk category.
+    Query parameters:
+      risk    - low|average|high (or the 'high-risk' style used by the filter buttons)
+      sort    - newest (default) or popular: most investor interest first, cards include interest_count
+      limit   - page size, capped at MAX_PAGE_SIZE
+      cursor  - next_cursor from the previous page (keyset on the LISTING_SORTS columns)
+      fields  - comma separated subset of CARD_FIELDS; 'id' is always returned
+    """
+    risk_filter = request.args.get('risk', '').strip().lower()
+    if risk_filter.endswith('-risk'):
+        risk_filter = risk_filter[:-len('-risk')]
+    if risk_filter in ('', 'all'):
+        risk_category = None
+    elif risk_filter in RISK_FILTERS:
+        risk_category = RISK_FILTERS[risk_filter]
+    else:
+        return jsonify({"error": f"Invalid risk filter. Use one of: {', '.join(RISK_FILTERS)}"}), 400
 
-        startups_with_risk = []
-        for row in startup_rows:
-            startup_dict = dict(row)
+    sort = request.args.get('sort', 'newest').strip().lower() or 'newest'
+    if sort not in LISTING_SORTS:
+        return jsonify({"error": f"Invalid sort. Use one of: {', '.join(LISTING_SORTS)}"}), 400
 
-            # Deserialize Financial History Safely for risk calc
-            try:
-                financial_history_json = startup_dict.get('financial_history')
-                if financial_history_json and financial_history_json.strip():
-                    startup_dict['financial_history'] = json.loads(financial_history_json)
-                else:
-                    startup_dict['financial_history'] = []
-            except Exception as e_fin:
-                app.logger.error(f"List API: Error processing financial_history for startup {startup_dict['id']}: {e_fin}")
-                startup_dict['financial_history'] = []
-
-            # Calculate Risk
-            risk_info = calculate_risk(startup_dict)
-            risk_category = risk_info.get('category', 'Unknown')
-
-            # Data for Frontend Card (No sensitive info like contact or full financials)
-            card_data = {
-                "id": startup_dict['id'],
-                "company_name": startup_dict['company_name'],
-                "description": startup_dict.get('description', ''),
-                "industry": startup_dict.get('industry', ''),
-                "funding_goal": startup_dict.get('funding_goal', 0),
-                "funding_acquired": startup_dict.get('funding_acquired', 0),
-                "logo_url": startup_dict.get('logo_url', ''),
-                "risk_category": risk_category
-            }
-            startups_with_risk.append(card_data)
-
-        return jsonify(startups_with_risk), 200
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    fields = CARD_FIELDS
+    if request.args.get('fields'):
+        requested = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        unknown = [f for f in requested if f not in CARD_FIELDS]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+        fields = ['id'] + [f for f in CARD_FIELDS if f in requested and f != 'id']
+
+    after = None
+    if request.args.get('cursor'):
+        try:
+            with request_span('decode'):
+                after = decode_cursor(request.args['cursor'])
+        except ValueError as e:
+            app.logger.warning("List API: %s", e)
+            return jsonify({"error": "Invalid cursor"}), 400
+        if len(after) != len(LISTING_SORTS[sort]):
+            return jsonify({"error": "Cursor belongs to another sort order"}), 400
+
+    cache_key, tags = read_scoped_cache_key(('startups:list', tuple(sorted(request.args.items(multi=True)))),
+                                            [LIST_CACHE_TAG, POPULAR_CACHE_TAG] if sort == 'popular' else [LIST_CACHE_TAG])
+    return cached_json_response(cache_key, tags, lambda: build_startup_page(risk_category, limit, fields, after, sort))
+
+
+def build_startup_page(risk_category, limit, fields, after, sort='newest'):
+    """Queries one listing page; returns (payload, status) for cached_json_response."""
+    db = get_read_db()
+    cursor = db.cursor()
+    try:
+        # Only whitelisted card columns are interpolated; risk is precomputed on write
+        keyset = LISTING_SORTS[sort]
+        conditions = []
+        params = []
+        if risk_category:
+            conditions.append("risk_category = ?")
+            params.append(risk_category)
+        if after:
+            conditions.append(f"({', '.join(keyset)}) < ({', '.join('?' * len(keyset))})")
+            params.extend(after)
+        sql = f"SELECT {', '.join(dict.fromkeys([*fields, *keyset]))} FROM startups"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {', '.join(f'{column} DESC' for column in keyset)} LIMIT ?"
+        params.append(limit + 1) # One extra row tells us whether another page exists
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(*(rows[-1][column] for column in keyset))
+
+        startups = []
+        with request_span('cards'):
+            for row in rows:
+                # Data for Frontend Card (No sensitive info like contact or full financials)
+                card_data = {field: row[field] for field in fields}
+                if 'risk_category' in card_data:
+                    card_data['risk_category'] = card_data['risk_category'] or 'Unknown'
+                if sort == 'popular':
+                    card_data['interest_count'] = row['interest_count']
+                startups.append(card_data)
+
+        return {"startups": startups, "next_cursor": next_cursor}, 200
     except Exception as e:
-        app.logger.error(f"Error fetching startup list with risk: {e}", exc_info=True)
-        return jsonify({"error": "Failed to fetch startup list"}), 500
+        app.logger.error("Error fetching startup list with risk: %s", e, exc_info=True)
+        return {"error": "Failed to fetch startup list"}, 500
 
 
 @app.route('/api/startups/<int:startup_id>', methods=['GET'])
 def get_startup_details(startup_id):
     """Gets detailed info for a specific startup, including calculated valuation."""
-    try:
-        db = get_db()
-        cursor = db.cursor()
-        # Select fields, no stored valuation needed
-        cursor.execute("""
-            SELECT s.*, u.name as founder_name, u.email as founder_email
-            FROM startups s
-            JOIN users u ON s.user_id = u.id
-            WHERE s.id = ?
-        """, (startup_id,))
-        startup_row = cursor.fetchone()
+    # Check Investor Interest (the only per-user part of the body, so it is part of the cache key).
+    # Only investors borrow a database connection here; anonymous reads may be served from the snapshot
+    investor_has_expressed_interest = False
+    if 'user_id' in session and session.get('user_type') == 'investor':
+        cursor = get_db().cursor()
+        try:
+            cursor.execute("SELECT 1 FROM investor_interest WHERE investor_user_id = ? AND startup_id = ?", (session['user_id'], startup_id))
+            investor_has_expressed_interest = bool(cursor.fetchone())
+        except Exception as e_interest:
+            app.logger.error("Error checking investor interest for startup %s: %s", startup_id, e_interest, exc_info=True)
 
-        if startup_row:
-            startup_dict = dict(startup_row)
+    cache_key, tags = read_scoped_cache_key(('startup:detail', startup_id, investor_has_expressed_interest),
+                                            [startup_cache_tag(startup_id)])
+    return cached_json_response(cache_key, tags, lambda: build_startup_details(startup_id, investor_has_expressed_interest))
 
-            # Deserialize Financial History (Robustly)
-            loaded_financials = []
-            try:
-                financial_history_json = startup_dict.get('financial_history')
-                if financial_history_json and financial_history_json.strip():
-                    raw_list = json.loads(financial_history_json)
-                    if isinstance(raw_list, list):
-                        # Optional: further validation/sorting if needed here
-                        raw_list.sort(key=lambda x: x.get('year', float('inf')))
-                        loaded_financials = raw_list
-                startup_dict['financial_history'] = loaded_financials
-            except json.JSONDecodeError as json_err:
-                app.logger.error(f"Detail API: Failed to decode financial_history JSON for startup {startup_id}. Error: {json_err}.")
-                startup_dict['financial_history'] = []
-            except Exception as e_fin:
-                app.logger.error(f"Detail API: Unexpected error processing financial_history for startup {startup_id}: {e_fin}", exc_info=True)
-                startup_dict['financial_history'] = []
-
-            # Calculate Risk
-            risk_info = calculate_risk(startup_dict)
-            startup_dict['risk_analysis'] = risk_info
 
-            # Calculate Valuation
-            calculated_val = calculate_valuation(startup_dict)
-            startup_dict['calculated_valuation'] = calculated_val
-            app.logger.debug(f"Calculated valuation for startup {startup_id}: {calculated_val}")
+def load_startup_details(cursor, startup_ids, interested_ids):
+    """
+    Builds detail payloads for startup_ids with one query for the startups and their founders,
+    whatever the number of ids; financial histories are unpacked from financial_packed, and
+    only rows without it cost one more query. interested_ids are the ids the session's
+    investor has expressed interest in. Each payload includes the startup's industry_benchmark.
+    Returns {id: payload}; ids that don't exist are left out.
+    """
+    placeholders = ', '.join('?' * len(startup_ids))
+    cursor.execute(f"""
+        SELECT s.*, u.name as founder_name, u.email as founder_email
+        FROM startups s
+        JOIN users u ON s.user_id = u.id
+        WHERE s.id IN ({placeholders})
+    """, list(startup_ids))
+    details = {row['id']: dict(row) for row in cursor.fetchall()}
+
+    financial_histories = {}
+    unpacked_ids = []
+    with request_span('unpack'):
+        for startup_id, startup_dict in details.items():
+            packed = startup_dict.pop('financial_packed', None)
+            if packed is not None:
+                financial_histories[startup_id] = unpack_financials(packed)
+            else:
+                unpacked_ids.append(startup_id)
+    if unpacked_ids: # Written without the packed column (e.g. by an external tool)
+        cursor.execute(f"""
+            SELECT startup_id, year, revenue, profit FROM financial_records
+            WHERE startup_id IN ({', '.join('?' * len(unpacked_ids))})
+            ORDER BY startup_id, year
+        """, unpacked_ids)
+        for record in cursor.fetchall():
+            financial_histories.setdefault(record['startup_id'], []).append(
+                {'year': record['year'], 'revenue': record['revenue'], 'profit': record['profit']})
+
+    for startup_id, startup_dict in details.items():
+        startup_dict['financial_history'] = financial_histories.get(startup_id, [])
+
+        # Risk and valuation are precomputed on write; only legacy rows fall back to calculating here
+        if startup_dict.get('risk_category'):
+            with request_span('decode'):
+                startup_dict['risk_analysis'] = stored_risk_analysis(startup_dict)
+        else:
+            with request_span('risk'):
+                startup_dict['risk_analysis'] = calculate_risk(startup_dict)
+            with request_span('valuation'):
+                startup_dict['calculated_valuation'] = calculate_valuation(startup_dict)
+        for derived_field in ('risk_score', 'risk_category', 'risk_reasons'):
+            startup_dict.pop(derived_field, None)
+        app.logger.debug("Calculated valuation for startup %s: %s", startup_id, startup_dict['calculated_valuation'])
 
-            # Check Investor Interest
-            investor_has_expressed_interest = False
-            if 'user_id' in session and session.get('user_type') == 'investor':
-                try:
-                    cursor.execute("SELECT 1 FROM investor_interest WHERE investor_user_id = ? AND startup_id = ?", (session['user_id'], startup_id))
-                    investor_has_expressed_interest = bool(cursor.fetchone())
-                except Exception as e_interest:
-                    app.logger.error(f"Error checking investor interest for startup {startup_id}: {e_interest}", exc_info=True)
-            startup_dict['investor_has_expressed_interest'] = investor_has_expressed_interest
+        startup_dict['investor_has_expressed_interest'] = startup_id in interested_ids
+        startup_dict.pop('user_id', None) # Remove internal ID
+        startup_dict['industry_benchmark'] = startup_industry_benchmark(startup_id)
+    return details
 
-            startup_dict.pop('user_id', None) # Remove internal ID
 
-            return jsonify(startup_dict), 200
+def startup_industry_benchmark(startup_id):
+    """
+    The startup's metrics ranked within its industry (FinancialAnalytics.benchmark), or None.
+    Cached with the detail body, so peers' changes show up within RESPONSE_CACHE_TTL.
+    """
+    try:
+        return get_financial_analytics().benchmark(startup_id)
+    except Exception as e: # The rest of the page doesn't depend on it
+        app.logger.error("Error benchmarking startup %s: %s", startup_id, e, exc_info=True)
+        return None
+
+def build_startup_details(startup_id, investor_has_expressed_interest):
+    """Queries the detail payload for one startup; returns (payload, status) for cached_json_response."""
+    cursor = get_read_db().cursor()
+    try:
+        details = load_startup_details(cursor, [startup_id], {startup_id} if investor_has_expressed_interest else set())
+        if startup_id in details:
+            return details[startup_id], 200
         else:
-            app.logger.warning(f"Startup details requested but not found for ID: {startup_id}")
-            return jsonify({"error": "Startup not found"}), 404
+            app.logger.warning("Startup details requested but not found for ID: %s", startup_id)
+            return {"error": "Startup not found"}, 404
+    except Exception as e:
+         app.logger.error("Error fetching details for startup ID %s: %s", startup_id, e, exc_info=True)
+         return {"error": "Failed to fetch startup details"}, 500
+
+# --- Batch Details ---
+MAX_BATCH_IDS = 50 # Ids one /api/startups/batch request may ask for
+
+@app.route('/api/startups/batch', methods=['GET'])
+def get_startup_details_batch():
+    """
+    Detail payloads for several startups in one request, e.g. ?ids=1,2,3 (at most MAX_BATCH_IDS).
+    Returns {"startups": [...], "not_found": [...]}: each entry has the shape of
+    /api/startups/<id>, in the order requested; duplicate ids are returned once.
+    """
+    try:
+        startup_ids = list(dict.fromkeys(int(part) for part in request.args.get('ids', '').split(',') if part.strip()))
+    except ValueError:
+        return jsonify({"error": "ids must be a comma separated list of startup ids"}), 400
+    if not startup_ids:
+        return jsonify({"error": "No startup ids given"}), 400
+    if len(startup_ids) > MAX_BATCH_IDS:
+        return jsonify({"error": f"At most {MAX_BATCH_IDS} ids per request"}), 400
+
+    # One query for every interest flag; like the detail route, the flags are part of the cache key
+    interested_ids = set()
+    if 'user_id' in session and session.get('user_type') == 'investor':
+        cursor = get_db().cursor()
+        try:
+            cursor.execute(f"""
+                SELECT startup_id FROM investor_interest
+                WHERE investor_user_id = ? AND startup_id IN ({', '.join('?' * len(startup_ids))})
+            """, [session['user_id'], *startup_ids])
+            interested_ids = {row['startup_id'] for row in cursor.fetchall()}
+        except Exception as e_interest:
+            app.logger.error("Error checking investor interest for startups %s: %s", startup_ids, e_interest, exc_info=True)
+
+    cache_key = ('startup:batch', tuple(startup_ids), tuple(sorted(interested_ids)))
+    return cached_json_response(cache_key, [startup_cache_tag(startup_id) for startup_id in startup_ids],
+                                lambda: build_startup_details_batch(startup_ids, interested_ids))
+
+
+def build_startup_details_batch(startup_ids, interested_ids):
+    """Queries the detail payloads for a batch; returns (payload, status) for cached_json_response."""
+    cursor = get_db().cursor()
+    try:
+        details = load_startup_details(cursor, startup_ids, interested_ids)
+        return {"startups": [details[startup_id] for startup_id in startup_ids if startup_id in details],
+                "not_found": [startup_id for startup_id in startup_ids if startup_id not in details]}, 200
+    except Exception as e:
+        app.logger.error("Error fetching details for startups %s: %s", startup_ids, e, exc_info=True)
+        return {"error": "Failed to fetch startup details"}, 500
+
+# --- Search ---
+SEARCH_HIGHLIGHT_START, SEARCH_HIGHLIGHT_END = '\x02', '\x03' # Swapped for <mark> after HTML-escaping
+SEARCH_SQL = f"""
+    SELECT s.id, s.company_name, s.industry, s.logo_url, s.funding_goal, s.funding_acquired, s.risk_category,
+           highlight(startups_fts, 0, '{SEARCH_HIGHLIGHT_START}', '{SEARCH_HIGHLIGHT_END}') AS company_name_highlight,
+           snippet(startups_fts, 1, '{SEARCH_HIGHLIGHT_START}', '{SEARCH_HIGHLIGHT_END}', '…', 16) AS description_snippet,
+           bm25(startups_fts, 10.0, 1.0, 5.0) AS rank -- Name matches outweigh industry, then description
+    FROM startups_fts
+    JOIN startups s ON s.id = startups_fts.rowid
+    WHERE startups_fts MATCH ?
+    ORDER BY rank
+    LIMIT ? OFFSET ?
+"""
+MAX_SEARCH_OFFSET = 1000 # Deep pages of a relevance ranking are not useful and cost O(offset)
+
+def fts_query_from_text(text):
+    """
+    Turns free text into an FTS5 query: every word must match, the last one as a prefix so
+    results appear while typing. Words are quoted, so FTS5 operators in the input are inert.
+    Returns None if the text has no searchable words.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def render_search_highlight(text):
+    """HTML-escapes FTS output, then turns the highlight markers into <mark> tags."""
+    if text is None:
+        return None
+    return html.escape(text).replace(SEARCH_HIGHLIGHT_START, '<mark>').replace(SEARCH_HIGHLIGHT_END, '</mark>')
+
+@app.route('/api/startups/search', methods=['GET'])
+def search_startups():
+    """
+    Full-text search over company name, description and industry, best matches first.
+    Query parameters: q (required), limit (capped at MAX_PAGE_SIZE), offset.
+    """
+    fts_query = fts_query_from_text(request.args.get('q', ''))
+    if not fts_query:
+        return jsonify({"error": "Search query 'q' is required"}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"error": "Invalid limit or offset"}), 400
+    if offset < 0 or offset > MAX_SEARCH_OFFSET:
+        return jsonify({"error": f"Offset must be between 0 and {MAX_SEARCH_OFFSET}"}), 400
+
+    cache_key = ('startups:search', fts_query, limit, offset)
+    return cached_json_response(cache_key, [LIST_CACHE_TAG], lambda: build_search_page(fts_query, limit, offset))
+
+
+def build_search_page(fts_query, limit, offset):
+    """Runs one page of a search; returns (payload, status) for cached_json_response."""
+    db = get_db()
+    cursor = db.cursor()
+    try:
+        cursor.execute(SEARCH_SQL, (fts_query, limit + 1, offset))
+        rows = cursor.fetchall()
+        next_offset = offset + limit if len(rows) > limit else None
+        results = []
+        for row in rows[:limit]:
+            result = {key: row[key] for key in ('id', 'company_name', 'industry', 'logo_url',
+                                                 'funding_goal', 'funding_acquired', 'risk_category')}
+            result['risk_category'] = result['risk_category'] or 'Unknown'
+            result['company_name_highlight'] = render_search_highlight(row['company_name_highlight'])
+            result['description_snippet'] = render_search_highlight(row['description_snippet'])
+            result['rank'] = round(row['rank'], 4)
+            results.append(result)
+        return {"results": results, "next_offset": next_offset}, 200
+    except sqlite3.OperationalError as e:
+        app.logger.warning("Search failed for query %r: %s", fts_query, e)
+        return {"error": "Search query could not be processed"}, 400
+    except Exception as e:
+        app.logger.error("Error searching startups for %r: %s", fts_query, e, exc_info=True)
+        return {"error": "Failed to search startups"}, 500
+
+# --- Facets ---
+FACET_NAMES = ('risk_category', 'industry')
+
+@app.route('/api/startups/facets', methods=['GET'])
+def get_startup_facets():
+    """
+    Startup counts and funding totals per risk category and per industry, plus catalog totals.
+    Read from the trigger-maintained startup_facets table, so the cost does not grow with the catalog.
+    """
+    return cached_json_response(('startups:facets',), [LIST_CACHE_TAG], build_startup_facets)
+
+
+def build_startup_facets():
+    """Reads startup_facets; returns (payload, status) for cached_json_response."""
+    db = get_db()
+    cursor = db.cursor()
+    try:
+        cursor.execute("""
+            SELECT facet, value, startup_count, funding_goal_total, funding_acquired_total
+            FROM startup_facets
+            WHERE facet IN ('all', 'risk_category', 'industry')
+            ORDER BY facet, startup_count DESC, value
+        """)
+        payload = {"total": {"startups": 0, "funding_goal": 0, "funding_acquired": 0}}
+        payload.update({facet: [] for facet in FACET_NAMES})
+        for row in cursor.fetchall():
+            entry = {"startups": row['startup_count'], "funding_goal": row['funding_goal_total'],
+                     "funding_acquired": row['funding_acquired_total']}
+            if row['facet'] == 'all':
+                payload['total'] = entry
+            elif row['facet'] in FACET_NAMES:
+                if row['facet'] == 'risk_category':
+                    value = row['value'] or 'Unknown' # Same label the cards use
+                else:
+                    value = row['value'] or None
+                payload[row['facet']].append({"value": value, **entry})
+        return payload, 200
     except Exception as e:
-         app.logger.error(f"Error fetching details for startup ID {startup_id}: {e}", exc_info=True)
-         return jsonify({"error": "Failed to fetch startup details"}), 500
+        app.logger.error("Error fetching startup facets: %s", e, exc_info=True)
+        return {"error": "Failed to fetch startup facets"}, 500
+
+def facet_drift(cursor, tolerance=0.01):
+    """
+    Compares startup_facets with a full recount from startups. Returns one description per
+    (facet, value) whose count differs or whose totals differ by more than tolerance
+    (the triggers add and subtract floats, so totals may wander by rounding error).
+    """
+    def read(sql):
+        return {(row[0], row[1]): tuple(row[2:]) for row in cursor.execute(sql).fetchall()}
+    stored = read("SELECT facet, value, startup_count, funding_goal_total, funding_acquired_total FROM startup_facets")
+    expected = read(FACETS_RECOUNT_SQL)
+    drift = []
+    for key in sorted(stored.keys() | expected.keys()):
+        have, want = stored.get(key, (0, 0.0, 0.0)), expected.get(key, (0, 0.0, 0.0))
+        if have[0] != want[0] or any(abs(a - b) > tolerance for a, b in zip(have[1:], want[1:])):
+            drift.append(f"{key[0]}={key[1]!r}: stored {have}, recounted {want}")
+    return drift
+
+@app.cli.command('rebuild-facets')
+@click.option('--check-only', is_flag=True, help='Report drift and exit non-zero if any, without rewriting the table.')
+def rebuild_facets_command(check_only):
+    """Recount startup_facets from startups, reporting any drift from the trigger-maintained values."""
+    db = get_db()
+    cursor = db.cursor()
+    drift = facet_drift(cursor)
+    for line in drift[:50]:
+        click.echo(f"DRIFT {line}", err=True)
+    if check_only:
+        if drift:
+            raise SystemExit(1)
+        click.echo("OK: startup_facets matches a full recount.")
+        return
+    started = time.perf_counter()
+    try:
+        cursor.execute("BEGIN IMMEDIATE") # Block writers so the recount can't miss a concurrent change
+        cursor.execute("DELETE FROM startup_facets")
+        cursor.execute(FACETS_REBUILD_SQL)
+        remaining = facet_drift(cursor, tolerance=0)
+        if remaining:
+            raise click.ClickException(f"Recount still differs after rebuild: {remaining[0]}")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    response_cache.clear()
+    click.echo(f"Rebuilt startup_facets in {time.perf_counter() - started:.2f}s; "
+               f"{len(drift)} drifted value(s) corrected.")
 
 # --- Investor Interest ---
 @app.route('/api/startups/<int:startup_id>/interest', methods=['POST', 'DELETE'])
@@ -518,30 +1917,37 @@ def manage_investor_interest(startup_id):
     if request.method == 'POST':
         try:
             cursor.execute("INSERT INTO investor_interest (investor_user_id, startup_id) VALUES (?, ?)", (investor_user_id, startup_id))
+            event_id = record_interest_event(cursor, startup_id, investor_user_id, 'added')
             db.commit()
-            app.logger.info(f"Investor {investor_user_id} expressed interest in startup {startup_id}")
+            invalidate_startup_caches(startup_id, listing=False, popularity=True)
+            publish_interest_event(cursor, startup_id, event_id)
+            app.logger.info("Investor %s expressed interest in startup %s", investor_user_id, startup_id)
             return jsonify({"message": "Interest expressed successfully"}), 201
         except sqlite3.IntegrityError:
             db.rollback()
             return jsonify({"message": "Already expressed interest"}), 200
         except Exception as e:
             db.rollback()
-            app.logger.error(f"Error expressing interest for startup {startup_id}: {e}", exc_info=True)
+            app.logger.error("Error expressing interest for startup %s: %s", startup_id, e, exc_info=True)
             return jsonify({"error": "Failed to express interest"}), 500
 
     elif request.method == 'DELETE':
         try:
             cursor.execute("DELETE FROM investor_interest WHERE investor_user_id = ? AND startup_id = ?", (investor_user_id, startup_id))
             rows_affected = cursor.rowcount
+            if rows_affected > 0:
+                event_id = record_interest_event(cursor, startup_id, investor_user_id, 'removed')
             db.commit()
             if rows_affected > 0:
-                app.logger.info(f"Investor {investor_user_id} withdrew interest from startup {startup_id}")
+                invalidate_startup_caches(startup_id, listing=False, popularity=True)
+                publish_interest_event(cursor, startup_id, event_id)
+                app.logger.info("Investor %s withdrew interest from startup %s", investor_user_id, startup_id)
                 return jsonify({"message": "Interest withdrawn successfully"}), 200
             else:
                 return jsonify({"message": "No interest found to withdraw"}), 404
         except Exception as e:
             db.rollback()
-            app.logger.error(f"Error withdrawing interest for startup {startup_id}: {e}", exc_info=True)
+            app.logger.error("Error withdrawing interest for startup %s: %s", startup_id, e, exc_info=True)
             return jsonify({"error": "Failed to withdraw interest"}), 500
 
 # --- Startup Analytics ---
@@ -555,10 +1961,13 @@ def get_my_startup_analytics():
     cursor = db.cursor()
 
     try:
-        cursor.execute("SELECT id FROM startups WHERE user_id = ?", (startup_user_id,))
+        cursor.execute("SELECT id, interest_count FROM startups WHERE user_id = ?", (startup_user_id,))
         startup_row = cursor.fetchone()
         if not startup_row: return jsonify({"error": "Startup profile not found"}), 404
         startup_id = startup_row['id']
+        # Read before the list: an event logged in between is then replayed, not missed (the page dedupes)
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM interest_events WHERE startup_id = ?", (startup_id,))
+        last_event_id = cursor.fetchone()[0]
 
         # Fetch interested investors (name and email only)
         cursor.execute("""
@@ -570,12 +1979,509 @@ def get_my_startup_analytics():
         """, (startup_id,))
         interested_investors = [dict(row) for row in cursor.fetchall()]
 
-        app.logger.info(f"Fetched {len(interested_investors)} interested investors for startup {startup_id}")
-        return jsonify({"interested_investors": interested_investors}), 200
+        app.logger.info("Fetched %s interested investors for startup %s", len(interested_investors), startup_id)
+        return jsonify({"interested_investors": interested_investors, "interest_count": startup_row['interest_count'],
+                        "last_event_id": last_event_id}), 200
     except Exception as e:
-        app.logger.error(f"Error fetching analytics for startup user {startup_user_id}: {e}", exc_info=True)
+        app.logger.error("Error fetching analytics for startup user %s: %s", startup_user_id, e, exc_info=True)
         return jsonify({"error": "Failed to fetch analytics data"}), 500
 
+# --- Interest Events ---
+# Interest changes are appended to interest_events in the writing transaction, then published to
+# this process's open streams. Streams re-read the log after an overflow and on every heartbeat,
+# which also picks up writes made by other processes (up to EVENTS_HEARTBEAT_SECONDS late).
+event_broker = EventBroker(max_subscribers=app.config['EVENTS_MAX_SUBSCRIBERS'], max_queue=app.config['EVENTS_QUEUE_SIZE'])
+INTEREST_EVENTS_BATCH = 500 # Log rows read per query when a stream catches up
+
+def interest_topic(startup_id):
+    return f"startup:{startup_id}"
+
+def record_interest_event(cursor, startup_id, investor_user_id, action):
+    """Appends an interest change to the event log in the caller's transaction; returns the event id."""
+    cursor.execute("""
+        INSERT INTO interest_events (startup_id, investor_user_id, action, interest_count)
+        SELECT id, ?, ?, interest_count FROM startups WHERE id = ?
+    """, (investor_user_id, action, startup_id))
+    return cursor.lastrowid
+
+def load_interest_events(cursor, startup_id, after_id, limit=INTEREST_EVENTS_BATCH):
+    """Up to limit logged events for a startup with ids above after_id, oldest first, as event payloads."""
+    cursor.execute("""
+        SELECT e.id, e.action, e.interest_count, e.created_at, u.name, u.email
+        FROM interest_events e
+        LEFT JOIN users u ON u.id = e.investor_user_id
+        WHERE e.startup_id = ? AND e.id > ?
+        ORDER BY e.id
+        LIMIT ?
+    """, (startup_id, after_id, limit))
+    return [{'id': row['id'], 'action': row['action'], 'interest_count': row['interest_count'],
+             'created_at': row['created_at'], 'investor': {'name': row['name'], 'email': row['email']}}
+            for row in cursor.fetchall()]
+
+def publish_interest_event(cursor, startup_id, event_id):
+    """Pushes a committed event to this process's streams for the startup (if any are open)."""
+    if not event_broker.subscriber_count(interest_topic(startup_id)):
+        return
+    for event in load_interest_events(cursor, startup_id, event_id - 1, limit=1):
+        event_broker.publish(interest_topic(startup_id), event)
+
+def _sse_message(event):
+    return f"id: {event['id']}\nevent: interest\ndata: {json.dumps(event)}\n\n"
+
+def interest_event_stream(pool, trace_callback, subscription, startup_id, last_id, heartbeat, max_seconds, retry_ms):
+    """
+    Yields SSE messages for events after last_id: first from the log, then as they are
+    published. Borrows a pooled connection only while reading the log.
+    """
+    def read_log(after_id):
+        db = pool.acquire()
+        db.set_trace_callback(trace_callback)
+        try:
+            return load_interest_events(db.cursor(), startup_id, after_id)
+        finally:
+            pool.release(db)
+
+    deadline = time.monotonic() + max_seconds
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        catch_up = True # Subscribed before this first read, so nothing falls in between
+        while True:
+            while catch_up or subscription.overflowed:
+                subscription.overflowed = False # Cleared first: events published meanwhile are queued again
+                events = read_log(last_id)
+                for event in events:
+                    yield _sse_message(event)
+                    last_id = event['id']
+                catch_up = len(events) == INTEREST_EVENTS_BATCH
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event = subscription.get(timeout=min(heartbeat, remaining))
+            catch_up = event is None
+            if event is None:
+                yield ": heartbeat\n\n"
+            elif event['id'] > last_id: # Already sent from the log otherwise
+                yield _sse_message(event)
+                last_id = event['id']
+    finally:
+        event_broker.unsubscribe(subscription)
+
+@app.route('/api/my-startup/events', methods=['GET'])
+def get_my_startup_events():
+    """
+    Server-Sent Events stream of investor interest in the founder's startup ('interest'
+    events with the same fields as the analytics list, plus action and interest_count).
+    Resumes after the Last-Event-ID header, or ?last_event_id= on a first connection;
+    without either it starts with the next event. Streams end after EVENTS_MAX_STREAM_SECONDS
+    and EventSource reconnects with Last-Event-ID, so nothing is missed.
+    """
+    if 'user_id' not in session or session.get('user_type') != 'startup':
+        return jsonify({"error": "Unauthorized"}), 403
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+    cursor = get_db().cursor()
+    startup_row = cursor.execute("SELECT id FROM startups WHERE user_id = ?", (session['user_id'],)).fetchone()
+    if not startup_row:
+        return jsonify({"error": "Startup profile not found"}), 404
+    startup_id = startup_row['id']
+    try:
+        subscription = event_broker.subscribe(interest_topic(startup_id))
+    except BrokerFull as e:
+        app.logger.warning("Rejected event stream for startup %s: %s", startup_id, e)
+        response = jsonify({"error": "Too many open event streams, please retry shortly"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(app.config['EVENTS_RETRY_MS'] // 1000 or 1)
+        return response
+    if last_event_id is None:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM interest_events WHERE startup_id = ?", (startup_id,))
+        last_event_id = cursor.fetchone()[0]
+    release_db() # The stream outlives the request; it borrows a connection only to read the log
+
+    stream = interest_event_stream(get_db_pool(), app.config.get('SQL_TRACE_CALLBACK'), subscription, startup_id,
+                                   last_event_id, app.config['EVENTS_HEARTBEAT_SECONDS'],
+                                   app.config['EVENTS_MAX_STREAM_SECONDS'], app.config['EVENTS_RETRY_MS'])
+    response = app.response_class(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no' # Proxies must pass events through as they are written
+    return response
+
+# --- Recommendations ---
+# startup_neighbors holds the top recommender.NEIGHBORS similar startups of every startup. A full
+# build is `flask rebuild-recommendations`; after that, committed profile changes are queued and a
+# background thread recomputes the changed startup plus every startup whose list it enters or leaves.
+DEFAULT_RECOMMENDATIONS = 10
+MAX_RECOMMENDATIONS = 50
+RECOMMENDATION_FEATURES_SQL = "SELECT id, description, industry, funding_goal, funding_acquired, risk_score FROM startups"
+
+_recommendation_indexes = {} # database -> SimilarityIndex, reused while its revision is current
+_recommendation_queue = {} # database -> startup ids waiting for an incremental update
+_recommendation_condition = threading.Condition()
+_recommendation_worker = None
+
+def _recommendation_inputs(rows):
+    import recommender # Needs NumPy; only the index builders import it
+    terms = [recommender.tokenize(row['description'], row['industry']) for row in rows]
+    numeric = recommender.numeric_features([row['funding_goal'] for row in rows], [row['funding_acquired'] for row in rows],
+                                           [row['risk_score'] for row in rows])
+    return terms, numeric
+
+def _write_neighbors(cursor, startup_ids, neighbor_ids, scores):
+    cursor.executemany("DELETE FROM startup_neighbors WHERE startup_id = ?", ((int(startup_id),) for startup_id in startup_ids))
+    cursor.executemany("INSERT INTO startup_neighbors (startup_id, rank, neighbor_id, score) VALUES (?, ?, ?, ?)",
+                       ((int(startup_id), rank, int(neighbor_id), float(score))
+                        for startup_id, row_ids, row_scores in zip(startup_ids, neighbor_ids, scores)
+                        for rank, (neighbor_id, score) in enumerate(zip(row_ids, row_scores))))
+
+def rebuild_recommendations(db, log=lambda message: None):
+    """
+    Refits the model on every startup and recomputes all vectors and neighbour lists in one
+    transaction. O(startups^2) similarity work, done in CHUNK-row matrix products.
+    """
+    import recommender
+    started = time.perf_counter()
+    cursor = db.cursor()
+    rows = cursor.execute(f"{RECOMMENDATION_FEATURES_SQL} ORDER BY id").fetchall()
+    terms, numeric = _recommendation_inputs(rows)
+    model = recommender.fit_model(terms, numeric)
+    index = recommender.SimilarityIndex([row['id'] for row in rows], recommender.vectorize(model, terms, numeric), 0)
+    del rows, terms
+    log(f"Vectorized {index.size} startups in {time.perf_counter() - started:.2f}s")
+
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        revision = (cursor.execute("SELECT revision FROM recommendation_model WHERE id = 1").fetchone() or [0])[0] + 1
+        cursor.execute("DELETE FROM startup_vectors")
+        cursor.execute("DELETE FROM startup_neighbors")
+        cursor.executemany("INSERT INTO startup_vectors (startup_id, vector) VALUES (?, ?)",
+                           ((int(startup_id), recommender.pack_vector(vector))
+                            for startup_id, vector in zip(index.ids[:index.size], index.matrix[:index.size])))
+        for start in range(0, index.size, recommender.CHUNK * 8):
+            positions = list(range(start, min(start + recommender.CHUNK * 8, index.size)))
+            neighbor_ids, scores = index.top_k(positions)
+            _write_neighbors(cursor, index.ids[positions], neighbor_ids, scores)
+            log(f"Neighbours of {positions[-1] + 1}/{index.size} startups ({time.perf_counter() - started:.1f}s)")
+        cursor.execute("""
+            INSERT INTO recommendation_model (id, model, revision, built_at) VALUES (1, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (id) DO UPDATE SET model = excluded.model, revision = excluded.revision, built_at = excluded.built_at
+        """, (json.dumps(model), revision))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    index.revision = revision
+    with _recommendation_condition:
+        _recommendation_indexes.pop(_database_path(db), None) # Reloaded on the next incremental update
+    return index.size
+
+def _database_path(db):
+    return db.execute("PRAGMA database_list").fetchone()['file']
+
+def _load_recommendation_index(cursor, revision):
+    import recommender
+    rows = cursor.execute("SELECT startup_id, vector FROM startup_vectors ORDER BY startup_id").fetchall()
+    index = recommender.SimilarityIndex([row['startup_id'] for row in rows],
+                                        recommender.unpack_vectors([row['vector'] for row in rows]), revision)
+    del rows
+    full = cursor.execute("""
+        SELECT startup_id, MIN(score) AS kth FROM startup_neighbors GROUP BY startup_id HAVING COUNT(*) = ?
+    """, (recommender.NEIGHBORS,)).fetchall()
+    if full:
+        index.kth[index.positions([row['startup_id'] for row in full])] = [row['kth'] for row in full]
+    return index
+
+def update_recommendations(db, startup_ids):
+    """
+    Re-vectorizes the given startups with the stored model and recomputes the neighbour lists
+    they change. Returns how many lists were rewritten, or None when no index was built yet.
+    """
+    import recommender
+    cursor = db.cursor()
+    database = _database_path(db)
+    db.execute("BEGIN IMMEDIATE") # Serializes updates across processes, so the revision check below holds
+    try:
+        state = cursor.execute("SELECT model, revision FROM recommendation_model WHERE id = 1").fetchone()
+        if state is None:
+            db.rollback()
+            return None
+        with _recommendation_condition:
+            index = _recommendation_indexes.get(database)
+        if index is None or index.revision != state['revision']: # Another process (or a rebuild) wrote since
+            index = _load_recommendation_index(cursor, state['revision'])
+
+        cursor.execute(f"{RECOMMENDATION_FEATURES_SQL} WHERE id IN ({', '.join('?' * len(startup_ids))})", list(startup_ids))
+        rows = cursor.fetchall()
+        changed_ids = [row['id'] for row in rows]
+        if not rows:
+            db.rollback()
+            return 0
+        terms, numeric = _recommendation_inputs(rows)
+        positions = index.upsert(changed_ids, recommender.vectorize(json.loads(state['model']), terms, numeric))
+        # Lists the changed startups now enter, plus lists they were on (their old score is stale)
+        entering = (index.similarities(positions) > index.kth[:index.size]).any(axis=0)
+        cursor.execute(f"""
+            SELECT DISTINCT startup_id FROM startup_neighbors WHERE neighbor_id IN ({', '.join('?' * len(changed_ids))})
+        """, changed_ids)
+        affected = set(index.ids[:index.size][entering].tolist()) | {row['startup_id'] for row in cursor.fetchall()} | set(changed_ids)
+        affected_positions = index.positions(sorted(affected))
+        neighbor_ids, scores = index.top_k(affected_positions)
+        _write_neighbors(cursor, index.ids[affected_positions], neighbor_ids, scores)
+        cursor.executemany("INSERT OR REPLACE INTO startup_vectors (startup_id, vector) VALUES (?, ?)",
+                           ((int(index.ids[position]), recommender.pack_vector(index.matrix[position])) for position in positions))
+        cursor.execute("UPDATE recommendation_model SET revision = revision + 1 WHERE id = 1")
+        db.commit()
+    except Exception:
+        db.rollback()
+        with _recommendation_condition:
+            _recommendation_indexes.pop(database, None) # May hold uncommitted vectors
+        raise
+    index.revision = state['revision'] + 1
+    with _recommendation_condition:
+        _recommendation_indexes[database] = index
+    return len(affected)
+
+def queue_recommendation_update(startup_id):
+    """Schedules an incremental update for a startup whose committed profile changed."""
+    global _recommendation_worker
+    if not app.config['RECOMMENDATIONS_AUTO_UPDATE']:
+        return
+    with _recommendation_condition:
+        _recommendation_queue.setdefault(app.config['DATABASE'], set()).add(startup_id)
+        if _recommendation_worker is None or not _recommendation_worker.is_alive():
+            _recommendation_worker = threading.Thread(target=_recommendation_worker_loop, name='recommendations', daemon=True)
+            _recommendation_worker.start()
+        _recommendation_condition.notify()
+
+def _recommendation_worker_loop():
+    """Applies queued updates; ids queued while an update runs are batched into the next one."""
+    while True:
+        with _recommendation_condition:
+            while not _recommendation_queue:
+                _recommendation_condition.wait()
+            database, startup_ids = _recommendation_queue.popitem()
+        started = time.perf_counter()
+        try:
+            pool = get_db_pool(database)
+            db = pool.acquire()
+            try:
+                rewritten = update_recommendations(db, sorted(startup_ids))
+            finally:
+                pool.release(db)
+            if rewritten is not None:
+                app.logger.info("Updated recommendations for %s changed startups: %s neighbour lists rewritten in %.3fs",
+                                len(startup_ids), rewritten, time.perf_counter() - started)
+        except Exception as e: # Not fatal: the next change or rebuild-recommendations catches up
+            app.logger.error("Incremental recommendation update failed for startups %s: %s", sorted(startup_ids), e, exc_info=True)
+
+@app.route('/api/recommendations', methods=['GET'])
+def get_recommendations():
+    """
+    Startups similar to the ones the investor has expressed interest in, as listing cards with
+    a score (summed similarity to their interests), best first. One indexed read of the
+    precomputed startup_neighbors table. Investors without interests, or databases whose index
+    was never built, get the most popular startups they haven't picked instead (source 'popular').
+    """
+    if 'user_id' not in session or session.get('user_type') != 'investor':
+        return jsonify({"error": "Unauthorized"}), 403
+    try:
+        limit = int(request.args.get('limit', DEFAULT_RECOMMENDATIONS))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    limit = max(1, min(limit, MAX_RECOMMENDATIONS))
+
+    investor_user_id = session['user_id']
+    cursor = get_db().cursor()
+    card_columns = ', '.join(f"s.{field}" for field in CARD_FIELDS)
+    try:
+        cursor.execute(f"""
+            SELECT {card_columns}, SUM(n.score) AS score
+            FROM investor_interest i
+            JOIN startup_neighbors n ON n.startup_id = i.startup_id
+            JOIN startups s ON s.id = n.neighbor_id
+            WHERE i.investor_user_id = ?
+              AND n.neighbor_id NOT IN (SELECT startup_id FROM investor_interest WHERE investor_user_id = ?)
+            GROUP BY n.neighbor_id
+            ORDER BY score DESC, n.neighbor_id
+            LIMIT ?
+        """, (investor_user_id, investor_user_id, limit))
+        rows = cursor.fetchall()
+        source = 'similar'
+        if not rows:
+            cursor.execute(f"""
+                SELECT {card_columns} FROM startups s
+                WHERE s.id NOT IN (SELECT startup_id FROM investor_interest WHERE investor_user_id = ?)
+                ORDER BY s.interest_count DESC, s.created_at DESC, s.id DESC
+                LIMIT ?
+            """, (investor_user_id, limit))
+            rows = cursor.fetchall()
+            source = 'popular'
+
+        startups = []
+        for row in rows:
+            card_data = {field: row[field] for field in CARD_FIELDS}
+            card_data['risk_category'] = card_data['risk_category'] or 'Unknown'
+            if source == 'similar':
+                card_data['score'] = round(row['score'], 4)
+            startups.append(card_data)
+        return jsonify({"startups": startups, "source": source}), 200
+    except Exception as e:
+        app.logger.error("Error fetching recommendations for investor %s: %s", investor_user_id, e, exc_info=True)
+        return jsonify({"error": "Failed to fetch recommendations"}), 500
+
+@app.cli.command('rebuild-recommendations')
+def rebuild_recommendations_command():
+    """Refit the recommendation model and recompute every startup's neighbours."""
+    started = time.perf_counter()
+    count = rebuild_recommendations(get_db(), log=click.echo)
+    click.echo(f"Done: {count} startups indexed in {time.perf_counter() - started:.2f}s")
+
+# --- Financial Analytics ---
+# Industry benchmarks (financial_analytics.py) come from a column-wise NumPy copy of every
+# startup's financial series, one per database in each process. It is built on first use (or
+# by init_worker) from one read of the startups table. Committed changes to a startup's
+# financials, funding or industry are applied to it right after the commit
+# (update_financial_analytics). A full rebuild in a background thread every
+# ANALYTICS_REFRESH_SECONDS picks up writes made by other processes.
+ANALYTICS_INPUTS_SQL = """
+    SELECT id, COALESCE(industry, '') AS industry, funding_goal, funding_acquired, financial_packed FROM startups
+"""
+ANALYTICS_LEGACY_BATCH = 500 # Startups without financial_packed read from financial_records per query
+
+_financial_analytics = {} # database -> FinancialAnalytics
+_financial_analytics_changes = {} # database -> startup ids committed while it is being (re)built, reapplied after
+_financial_analytics_lock = threading.Lock()
+_financial_analytics_build_lock = threading.Lock() # Held by a first build, which requests wait for
+
+def _financial_analytics_inputs(cursor, startup_ids=None):
+    """
+    (ids, industries, funding goals, funding acquired, packed histories) of startup_ids, or of
+    every startup. Rows written without financial_packed are packed from financial_records,
+    with non-numeric values counted as missing.
+    """
+    if startup_ids is None:
+        cursor.execute(ANALYTICS_INPUTS_SQL)
+    else:
+        cursor.execute(f"{ANALYTICS_INPUTS_SQL} WHERE id IN ({', '.join('?' * len(startup_ids))})", list(startup_ids))
+    rows = cursor.fetchall()
+    legacy_ids = [row['id'] for row in rows if row['financial_packed'] is None]
+    histories = {}
+    for start in range(0, len(legacy_ids), ANALYTICS_LEGACY_BATCH):
+        batch = legacy_ids[start:start + ANALYTICS_LEGACY_BATCH]
+        cursor.execute(f"""
+            SELECT startup_id, year, revenue, profit FROM financial_records
+            WHERE startup_id IN ({', '.join('?' * len(batch))})
+            ORDER BY startup_id, year
+        """, batch)
+        for record in cursor.fetchall():
+            histories.setdefault(record['startup_id'], []).append(
+                {'year': record['year'],
+                 'revenue': record['revenue'] if isinstance(record['revenue'], (int, float)) else None,
+                 'profit': record['profit'] if isinstance(record['profit'], (int, float)) else None})
+    packed = [row['financial_packed'] if row['financial_packed'] is not None else pack_financials(histories.get(row['id'], []))
+              for row in rows]
+    return ([row['id'] for row in rows], [row['industry'] for row in rows], [row['funding_goal'] for row in rows],
+            [row['funding_acquired'] for row in rows], packed)
+
+def _financial_analytics_rows(cursor, startup_ids):
+    """FinancialAnalytics.update() rows for startup_ids; ids no longer in the table get None records."""
+    import financial_analytics # Needs NumPy
+    ids, industries, funding_goals, funding_acquired, packed = _financial_analytics_inputs(cursor, startup_ids)
+    records, lengths = financial_analytics.decode_packed(packed)
+    histories = dict(zip(ids, zip(industries, funding_goals, funding_acquired, financial_analytics.split_records(records, lengths))))
+    return [(startup_id, *histories[startup_id]) if startup_id in histories else (startup_id, None, None, None, None)
+            for startup_id in startup_ids]
+
+def _build_financial_analytics(database):
+    """Builds and installs a FinancialAnalytics for database, with the changes committed meanwhile applied."""
+    import financial_analytics # Needs NumPy
+    pool = get_db_pool(database)
+    db = pool.acquire()
+    try:
+        ids, industries, funding_goals, funding_acquired, packed = _financial_analytics_inputs(db.cursor())
+        analytics = financial_analytics.FinancialAnalytics(ids, industries, funding_goals, funding_acquired,
+                                                           *financial_analytics.decode_packed(packed))
+        while True:
+            with _financial_analytics_lock:
+                changed = _financial_analytics_changes.pop(database)
+                if not changed:
+                    _financial_analytics[database] = analytics
+                    return analytics
+                _financial_analytics_changes[database] = set()
+            analytics.update(_financial_analytics_rows(db.cursor(), sorted(changed)))
+    except Exception:
+        with _financial_analytics_lock:
+            _financial_analytics_changes.pop(database, None)
+        raise
+    finally:
+        pool.release(db)
+
+def _refresh_financial_analytics(database):
+    try:
+        analytics = _build_financial_analytics(database)
+        app.logger.info("Rebuilt financial analytics for %s startups in %.3fs", analytics.stats()['startups'], analytics.build_seconds)
+    except Exception as e: # The current copy stays in use; the next request after ANALYTICS_REFRESH_SECONDS retries
+        app.logger.error("Financial analytics rebuild failed: %s", e, exc_info=True, extra={'sample_key': database})
+
+def get_financial_analytics():
+    """This process's FinancialAnalytics for DATABASE: built on first use, rebuilt in the background once stale."""
+    database = app.config['DATABASE']
+    analytics = _financial_analytics.get(database)
+    if analytics is None:
+        with _financial_analytics_build_lock:
+            analytics = _financial_analytics.get(database)
+            if analytics is None:
+                with _financial_analytics_lock:
+                    _financial_analytics_changes[database] = set()
+                analytics = _build_financial_analytics(database)
+    elif analytics.age() > app.config['ANALYTICS_REFRESH_SECONDS']:
+        with _financial_analytics_lock:
+            start_refresh = database not in _financial_analytics_changes
+            if start_refresh:
+                _financial_analytics_changes[database] = set()
+        if start_refresh:
+            threading.Thread(target=_refresh_financial_analytics, args=(database,), name='financial-analytics', daemon=True).start()
+    return analytics
+
+def update_financial_analytics(db, startup_ids):
+    """
+    Applies committed changes to the financials, funding or industry of startup_ids to this
+    process's analytics, if built. Failures are logged, not raised: the write has committed,
+    and the next rebuild catches up.
+    """
+    database = app.config['DATABASE']
+    with _financial_analytics_lock:
+        if database in _financial_analytics_changes: # Being (re)built: reapplied to the result too
+            _financial_analytics_changes[database].update(startup_ids)
+        analytics = _financial_analytics.get(database)
+    if analytics is None:
+        return
+    try:
+        analytics.update(_financial_analytics_rows(db.cursor(), list(startup_ids)))
+    except Exception as e:
+        app.logger.error("Financial analytics update failed for startups %s: %s", sorted(startup_ids), e, exc_info=True)
+
+@app.route('/api/analytics/industry/<industry>', methods=['GET'])
+def get_industry_analytics(industry):
+    """
+    Latest revenue, revenue CAGR, year-over-year profit growth and funding ratio across one
+    industry's startups: per metric the number of startups it applies to, the mean and the
+    10th/25th/50th/75th/90th percentiles. The industry name must match exactly.
+    """
+    try:
+        analytics = get_financial_analytics()
+        stats = analytics.industry_stats(industry)
+        if stats is None:
+            return jsonify({"error": "Unknown industry", "industries": [name for name in analytics.industries() if name]}), 404
+        return jsonify(stats), 200
+    except Exception as e:
+        app.logger.error("Error computing analytics for industry %r: %s", industry, e, exc_info=True)
+        return jsonify({"error": "Failed to compute industry analytics"}), 500
+
 
 # --- Manage Startup Profile (Non-Financials) ---
 @app.route('/api/my-startup', methods=['GET', 'PUT'])
@@ -588,31 +2494,23 @@ def manage_my_startup():
     cursor = db.cursor()
 
     if request.method == 'GET':
-        # Fetch data for update form, including raw financial history JSON
+        # Fetch data for update form, including the financial records
         try:
             cursor.execute("""
                 SELECT id, company_name, description, industry, funding_goal, funding_acquired,
                        years_operating, website, logo_url, contact_phone,
-                       equity_offered, financial_history -- Include financial_history JSON
+                       equity_offered
                 FROM startups WHERE user_id = ?
             """, (user_id,))
             startup_data = cursor.fetchone()
             if not startup_data: return jsonify({"error": "Startup profile not found"}), 404
 
             startup_dict = dict(startup_data)
-            # Try to parse financials for easier frontend use, fallback to empty list
-            try:
-                if startup_dict['financial_history']:
-                    startup_dict['financial_history'] = json.loads(startup_dict['financial_history'])
-                else:
-                    startup_dict['financial_history'] = []
-            except json.JSONDecodeError:
-                app.logger.warning(f"Could not parse financial history JSON for user {user_id} in GET /my-startup.")
-                startup_dict['financial_history'] = [] # Fallback
+            startup_dict['financial_history'] = fetch_financial_history(cursor, startup_dict['id'])
 
             return jsonify(startup_dict), 200
         except Exception as e:
-             app.logger.error(f"Error fetching startup data for update form (user {user_id}): {e}", exc_info=True)
+             app.logger.error("Error fetching startup data for update form (user %s): %s", user_id, e, exc_info=True)
              return jsonify({"error": "Failed to fetch startup data"}), 500
 
     elif request.method == 'PUT':
@@ -620,30 +2518,16 @@ def manage_my_startup():
         data = request.get_json()
         if not data: return jsonify({"error": "No data provided for update"}), 400
 
-        allowed_fields = ['company_name', 'description', 'industry', 'funding_goal',
-                          'funding_acquired', 'years_operating', 'website', 'logo_url',
-                          'contact_phone', 'equity_offered'] # Excludes financials & valuation
-
         update_fields = []
         update_values = []
 
-        for field in allowed_fields:
+        for field in STARTUP_PROFILE_FIELDS:
             if field in data:
+                try:
+                    value = coerce_startup_field(field, data[field])
+                except ValueError as e:
+                    return jsonify({"error": str(e)}), 400
                 update_fields.append(f"{field} = ?")
-                value = data[field]
-                # Type conversions/validations
-                if field in ['funding_goal', 'funding_acquired', 'equity_offered'] and value is not None:
-                     try: value = float(value)
-                     except (ValueError, TypeError): return jsonify({"error": f"Invalid numeric value for {field}"}), 400
-                elif field == 'years_operating' and value is not None:
-                     try: value = int(value)
-                     except (ValueError, TypeError): return jsonify({"error": f"Invalid integer value for {field}"}), 400
-                elif field == 'contact_phone' and value is not None:
-                     value = str(value).strip()
-                # Handle optional text fields possibly being null/empty
-                if value == '' and field in ['website', 'logo_url', 'description', 'industry', 'contact_phone']:
-                    value = None # Store as NULL if empty string is sent for optional text fields
-
                 update_values.append(value)
 
         if not update_fields: return jsonify({"message": "No valid non-financial fields provided for update"}), 400
@@ -654,18 +2538,27 @@ def manage_my_startup():
         try:
             cursor.execute(sql, tuple(update_values))
             rows_affected = cursor.rowcount
+            startup_id = None
+            if rows_affected > 0:
+                cursor.execute("SELECT id FROM startups WHERE user_id = ?", (user_id,))
+                startup_id = cursor.fetchone()['id']
+                refresh_startup_derived_fields(cursor, startup_id)
             db.commit()
+            if startup_id is not None:
+                update_financial_analytics(db, [startup_id]) # Funding and industry feed the benchmarks
+                invalidate_startup_caches(startup_id)
+                queue_recommendation_update(startup_id)
 
             if rows_affected == 0:
                 cursor.execute("SELECT 1 FROM startups WHERE user_id = ?", (user_id,))
                 if not cursor.fetchone(): return jsonify({"error": "Startup profile not found"}), 404
                 else: return jsonify({"message": "No changes detected in profile details"}), 200
 
-            app.logger.info(f"Startup non-financial profile updated successfully for user ID: {user_id}.")
+            app.logger.info("Startup non-financial profile updated successfully for user ID: %s.", user_id)
             return jsonify({"message": "Startup profile details updated successfully"}), 200
         except Exception as e:
             db.rollback()
-            app.logger.error(f"Error updating non-financial startup profile for user ID {user_id}: {e}", exc_info=True)
+            app.logger.error("Error updating non-financial startup profile for user ID %s: %s", user_id, e, exc_info=True)
             return jsonify({"error": "An internal server error occurred during profile update"}), 500
 
 
@@ -678,54 +2571,1020 @@ def update_my_startup_financials():
 
     financials_list = request.get_json()
     if not isinstance(financials_list, list):
-         app.logger.warning(f"Received non-list financial data for update for user {user_id}.")
+         app.logger.warning("Received non-list financial data for update for user %s.", user_id)
          return jsonify({"error": "Invalid data format: Expected a list of financial records"}), 400
 
-    validated_financials = []
-    seen_years = set()
-    for item in financials_list:
-        if isinstance(item, dict) and 'year' in item:
-            try:
-                year = int(item['year'])
-                if year in seen_years:
-                     app.logger.warning(f"Duplicate year {year} found in financial update for user {user_id}. Skipping.")
-                     continue
-                seen_years.add(year)
-
-                revenue = item.get('revenue')
-                profit = item.get('profit')
-                # Store as float or None
-                item_revenue = float(revenue) if revenue is not None else None
-                item_profit = float(profit) if profit is not None else None
-
-                validated_financials.append({'year': year, 'revenue': item_revenue, 'profit': item_profit})
-            except (ValueError, TypeError) as e:
-                 app.logger.warning(f"Skipping invalid financial entry during update for user {user_id}: {item} - Error: {e}")
-        else:
-            app.logger.warning(f"Skipping invalid financial entry format during update for user {user_id}: {item}")
+    validated_financials = validate_financial_records(financials_list, f"financial update of user {user_id}")
 
     db = get_db()
     cursor = db.cursor()
     try:
-        validated_financials.sort(key=lambda x: x.get('year', 0)) # Sort before storing
-        financial_history_json = json.dumps(validated_financials) if validated_financials else None
+        cursor.execute("SELECT id FROM startups WHERE user_id = ?", (user_id,))
+        startup_row = cursor.fetchone()
+        if not startup_row: return jsonify({"error": "Startup profile not found"}), 404
 
-        cursor.execute("UPDATE startups SET financial_history = ? WHERE user_id = ?", (financial_history_json, user_id))
+        # Only changed years are written; the diff, derived fields and commit form one transaction
+        changes = apply_financial_records_diff(cursor, startup_row['id'], validated_financials)
+        if any(changes.values()):
+            refresh_startup_derived_fields(cursor, startup_row['id'])
         db.commit()
-        app.logger.info(f"Successfully updated financial history for user {user_id}.")
+        if any(changes.values()):
+            update_financial_analytics(db, [startup_row['id']]) # Before the detail cache is dropped, so it's rebuilt with these
+            invalidate_startup_caches(startup_row['id']) # Risk category on the cards may have changed
+            queue_recommendation_update(startup_row['id']) # And the risk score is a similarity feature
+        app.logger.info("Successfully updated financial history for user %s: %s.", user_id, changes)
         # Return the validated/sorted list
-        return jsonify({"message": "Financial history updated successfully", "updated_financials": validated_financials}), 200
+        return jsonify({"message": "Financial history updated successfully", "updated_financials": validated_financials,
+                        "changes": changes}), 200
     except Exception as e:
         db.rollback()
-        app.logger.error(f"Error updating financial history for user {user_id}: {e}", exc_info=True)
+        app.logger.error("Error updating financial history for user %s: %s", user_id, e, exc_info=True)
         return jsonify({"error": "Failed to update financial history"}), 500
 
+# --- Batch Rescoring ---
+# The latest year comes from a join rather than financial_packed: bench.financials measured the
+# join, which stays in SQLite's C code, faster than decoding the last packed record per row in Python
+RISK_INPUTS_SQL = """
+    SELECT s.id, s.funding_goal, s.funding_acquired, s.years_operating, s.equity_offered,
+           s.risk_score, s.risk_category, s.risk_reasons, s.calculated_valuation,
+           f.year AS last_year, f.revenue AS last_revenue, f.profit AS last_profit
+    FROM startups s
+    LEFT JOIN financial_records f
+           ON f.startup_id = s.id
+          AND f.year = (SELECT MAX(year) FROM financial_records WHERE startup_id = s.id)
+    WHERE s.id > ?
+    ORDER BY s.id
+    LIMIT ?
+"""
+
+def _risk_input_dict(row):
+    """The dict calculate_risk/calculate_valuation would see for a RISK_INPUTS_SQL row (only the last year matters)."""
+    startup_dict = {key: row[key] for key in ('id', 'funding_goal', 'funding_acquired', 'years_operating', 'equity_offered')}
+    startup_dict['financial_history'] = ([{'year': row['last_year'], 'revenue': row['last_revenue'], 'profit': row['last_profit']}]
+                                         if row['last_year'] is not None else [])
+    return startup_dict
+
+def score_risk_rows(rows):
+    """
+    Scores RISK_INPUTS_SQL rows with the vectorized engine. Returns one
+    (score, category, reasons_json, valuation) tuple per row, in order. Rows holding
+    non-numeric values (possible in legacy data) are scored by calculate_risk itself.
+    """
+    import risk_engine # Needs NumPy; only the batch tools import it
+
+    def numeric(value):
+        return value is None or isinstance(value, (int, float))
+    vector_rows = [row for row in rows if all(numeric(row[key]) for key in
+                   ('funding_goal', 'funding_acquired', 'years_operating', 'equity_offered'))]
+    results = {}
+    if vector_rows:
+        def column(key, missing):
+            return [missing if row[key] is None else row[key] for row in vector_rows]
+        nan = float('nan')
+        scores, categories, reasons_json = risk_engine.score_batch(
+            goal=column('funding_goal', 0), acquired=column('funding_acquired', 0), years=column('years_operating', 0),
+            has_financials=[row['last_year'] is not None for row in vector_rows],
+            last_revenue=column('last_revenue', nan), last_profit=column('last_profit', nan))
+        valuations = risk_engine.valuation_batch(column('funding_goal', 0), column('equity_offered', 0))
+        for row, score, category, reasons, valuation in zip(vector_rows, scores.tolist(), categories, reasons_json, valuations):
+            results[row['id']] = (score, category, reasons, valuation)
+    for row in rows:
+        if row['id'] not in results:
+            startup_dict = _risk_input_dict(row)
+            risk_info = calculate_risk(startup_dict)
+            results[row['id']] = (risk_info['score'], risk_info['category'], json.dumps(risk_info['reasons']),
+                                  calculate_valuation(startup_dict))
+    return [results[row['id']] for row in rows]
+
+def risk_mismatches(rows, scored):
+    """Compares engine output against calculate_risk/calculate_valuation; returns a description per differing row."""
+    mismatches = []
+    for row, (score, category, reasons_json, valuation) in zip(rows, scored):
+        startup_dict = _risk_input_dict(row)
+        expected = calculate_risk(startup_dict)
+        expected_valuation = calculate_valuation(startup_dict)
+        actual = {'score': score, 'category': category, 'reasons': json.loads(reasons_json)}
+        if actual != expected or valuation != expected_valuation:
+            mismatches.append(f"startup {row['id']}: engine {actual} / {valuation}, calculate_risk {expected} / {expected_valuation}")
+    return mismatches
+
+@app.cli.command('rescore-all')
+@click.option('--chunk-size', default=5000, show_default=True, help='Startups loaded, scored and committed per batch.')
+@click.option('--verify', is_flag=True, help='Also run calculate_risk on every row and abort on any difference.')
+def rescore_all_command(chunk_size, verify):
+    """Recompute stored risk and valuation for every startup with the vectorized engine."""
+    db = get_db()
+    cursor = db.cursor()
+    total = cursor.execute("SELECT COUNT(*) FROM startups").fetchone()[0]
+    processed = changed = 0
+    last_id = 0
+    started = time.perf_counter()
+    while True:
+        rows = cursor.execute(RISK_INPUTS_SQL, (last_id, chunk_size)).fetchall()
+        if not rows:
+            break
+        scored = score_risk_rows(rows)
+        if verify:
+            mismatches = risk_mismatches(rows, scored)
+            if mismatches:
+                for mismatch in mismatches[:20]:
+                    click.echo(f"MISMATCH {mismatch}", err=True)
+                raise click.ClickException(f"{len(mismatches)} engine results differ from calculate_risk; nothing in this chunk was written.")
+        updates = [(score, category, reasons, valuation, row['id'])
+                   for row, (score, category, reasons, valuation) in zip(rows, scored)
+                   if (row['risk_score'], row['risk_category'], row['risk_reasons'], row['calculated_valuation'])
+                      != (score, category, reasons, valuation)]
+        if updates:
+            cursor.executemany("""
+                UPDATE startups
+                SET risk_score = ?, risk_category = ?, risk_reasons = ?, calculated_valuation = ?
+                WHERE id = ?
+            """, updates)
+            db.commit()
+        processed += len(rows)
+        changed += len(updates)
+        last_id = rows[-1]['id']
+        elapsed = time.perf_counter() - started
+        click.echo(f"Scored {processed}/{total} startups ({processed / max(total, 1):.0%}), "
+                   f"{changed} changed, {processed / max(elapsed, 1e-9):,.0f} rows/s")
+    if changed:
+        response_cache.clear() # Other processes pick the new scores up within RESPONSE_CACHE_TTL
+        click.echo("Risk scores are a similarity feature; run `flask rebuild-recommendations` to refresh recommendations.")
+    click.echo(f"Done: {processed} startups scored, {changed} updated in {time.perf_counter() - started:.2f}s"
+               + (" (verified against calculate_risk)" if verify else ""))
+
+@app.cli.command('check-risk-engine')
+@click.option('--samples', default=100000, show_default=True, help='Random startups to compare, on top of the boundary cases.')
+@click.option('--seed', default=0, show_default=True)
+def check_risk_engine_command(samples, seed):
+    """Compare the vectorized engine with calculate_risk on boundary and random inputs (no database needed)."""
+    import random
+    rng = random.Random(seed)
+    boundary_goals = [None, 0, 1, 4, 1000000, 1000000.01, 2500000]
+    boundary_values = [None, -1, 0, 0.5, 1, 2.99, 3, 9999.99, 10000, 250000, 750000]
+    keys = ['id', 'funding_goal', 'funding_acquired', 'years_operating', 'equity_offered',
+            'last_year', 'last_revenue', 'last_profit']
+
+    def sample(startup_id):
+        goal = rng.choice(boundary_goals + [rng.uniform(0, 5000000)])
+        has_history = rng.random() < 0.8
+        return dict(zip(keys, [
+            startup_id, goal,
+            rng.choice(boundary_values + [None if goal is None else goal * rng.choice([0.2499, 0.25, 0.7499, 0.75, 1])]),
+            rng.choice([None, 0, 1, 2, 3, 4, 10]),
+            rng.choice([None, 0, 0.5, 10, 33.3, 100, 100.5]),
+            2023 if has_history else None,
+            rng.choice(boundary_values) if has_history else None,
+            rng.choice(boundary_values) if has_history else None,
+        ]))
+
+    rows = [sample(i) for i in range(1, samples + 1)]
+    mismatches = risk_mismatches(rows, score_risk_rows(rows))
+    for mismatch in mismatches[:20]:
+        click.echo(f"MISMATCH {mismatch}", err=True)
+    if mismatches:
+        raise click.ClickException(f"{len(mismatches)} of {len(rows)} cases differ.")
+    click.echo(f"OK: engine matches calculate_risk and calculate_valuation on {len(rows)} cases.")
+
+# --- Bulk Import ---
+# `flask import` loads users, startups and financial records from CSV or JSONL files,
+# validated like the registration and profile forms. Each batch is one transaction written
+# with executemany; rows that fail validation go to a reject file and the run carries on.
+IMPORT_SQL_CHUNK = 500 # Values per IN (...) lookup
+
+def read_import_rows(path):
+    """Yields (line_number, row, error) from a .csv or .jsonl/.ndjson file; row is None when error is set."""
+    with open(path, newline='', encoding='utf-8') as source:
+        if path.lower().endswith('.csv'):
+            reader = csv.DictReader(source)
+            for row in reader:
+                # Empty CSV cells mean "not provided"; financial history may be a JSON list in one cell
+                row = {key: (value if value != '' else None) for key, value in row.items()}
+                yield reader.line_num, row, None
+        else:
+            for line_number, line in enumerate(source, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, None, f"Invalid JSON: {e}"
+                    continue
+                if isinstance(row, dict):
+                    yield line_number, row, None
+                else:
+                    yield line_number, None, "Expected a JSON object per line"
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def lookup_in_chunks(cursor, sql, values):
+    """Runs sql (containing one '{placeholders}') for values in chunks; returns all fetched rows."""
+    rows = []
+    values = list(values)
+    for start in range(0, len(values), IMPORT_SQL_CHUNK):
+        chunk = values[start:start + IMPORT_SQL_CHUNK]
+        rows.extend(cursor.execute(sql.format(placeholders=', '.join('?' * len(chunk))), chunk).fetchall())
+    return rows
+
+def prepare_users(rows, reject, seen_emails):
+    """
+    Validates one batch of user rows and hashes their plaintext passwords, before the batch's
+    write transaction: scrypt takes tens of milliseconds per password, far too long to hold
+    the write lock for. Rows need a password or an existing password_hash. Returns
+    (line, row, password_hash) for the rows that passed validation.
+    """
+    accepted = []
+    for line, row in rows:
+        error = registration_error(row, required_fields=['email', 'name', 'user_type'])
+        if not error and not row.get('password') and not row.get('password_hash'):
+            error = "Missing password or password_hash"
+        if not error and row.get('password_hash') and not row.get('password') \
+                and not (is_legacy_sha256(row['password_hash']) or parse_scrypt_hash(row['password_hash'])):
+            error = "Unrecognized password_hash format"
+        if not error and row['email'] in seen_emails:
+            error = "Email already registered"
+        if error:
+            reject(line, row, error)
+            continue
+        seen_emails.add(row['email'])
+        accepted.append((line, row))
+
+    # Plaintext passwords go through the hashing pool, keeping every worker busy; legacy
+    # SHA-256 hashes are stored as they are and upgraded on the user's first login
+    hasher = get_password_hasher()
+    to_hash = [row['password'] for _, row in accepted if row.get('password')]
+    hashes = iter(())
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=max(1, min(hasher.workers, hasher.max_pending))) as threads:
+            hashes = iter(list(threads.map(hash_password, to_hash)))
+    return [(line, row, next(hashes) if row.get('password') else row['password_hash']) for line, row in accepted]
+
+def import_users(db, prepared, reject):
+    """Inserts a batch from prepare_users(), rejecting emails that are already registered."""
+    cursor = db.cursor()
+    existing = {r['email'] for r in lookup_in_chunks(cursor, "SELECT email FROM users WHERE email IN ({placeholders})",
+                                                      [row['email'] for _, row, _ in prepared])}
+    values = []
+    for line, row, password_hash in prepared:
+        if row['email'] in existing:
+            reject(line, row, "Email already registered")
+        else:
+            values.append((row['email'], password_hash, row['user_type'], row['name']))
+    cursor.executemany("INSERT INTO users (email, password_hash, user_type, name) VALUES (?, ?, ?, ?)", values)
+    return len(values)
+
+def import_startups(db, rows, reject, claimed_user_ids):
+    """
+    Imports one batch of startup rows, owned by user_email or user_id (a startup user without
+    a startup yet). financial_history / financials may hold the records as a list (JSON in CSV).
+    Risk and valuation are computed before the insert, so each row is written once.
+    """
+    cursor = db.cursor()
+    owner_emails = [row['user_email'] for _, row in rows if row.get('user_email')]
+    owners_by_email = {r['email']: r for r in lookup_in_chunks(cursor, """
+        SELECT u.id, u.email, u.name, u.user_type, s.id AS startup_id
+        FROM users u LEFT JOIN startups s ON s.user_id = u.id
+        WHERE u.email IN ({placeholders})""", owner_emails)}
+    owner_ids = []
+    for _, row in rows:
+        if not row.get('user_email') and row.get('user_id') is not None:
+            try:
+                owner_ids.append(int(row['user_id']))
+            except (ValueError, TypeError):
+                pass
+    owners_by_id = {r['id']: r for r in lookup_in_chunks(cursor, """
+        SELECT u.id, u.email, u.name, u.user_type, s.id AS startup_id
+        FROM users u LEFT JOIN startups s ON s.user_id = u.id
+        WHERE u.id IN ({placeholders})""", owner_ids)}
+
+    # Ids are assigned here so startups and their financial records go in with executemany;
+    # AUTOINCREMENT never reuses ids, so continue from the sequence (this runs under BEGIN IMMEDIATE)
+    sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'startups'").fetchone()
+    next_id = max(sequence[0] if sequence else 0, cursor.execute("SELECT COALESCE(MAX(id), 0) FROM startups").fetchone()[0]) + 1
+
+    startup_values, record_values = [], []
+    for line, row in rows:
+        try:
+            if row.get('user_email'):
+                owner = owners_by_email.get(row['user_email'])
+            else:
+                owner = owners_by_id.get(int(row['user_id'])) if row.get('user_id') is not None else None
+        except (ValueError, TypeError):
+            owner = None
+        if owner is None:
+            reject(line, row, "Unknown owner: user_email or user_id must name an existing user")
+            continue
+        if owner['user_type'] != 'startup':
+            reject(line, row, "Owner is not a startup user")
+            continue
+        if owner['startup_id'] is not None or owner['id'] in claimed_user_ids:
+            reject(line, row, "Owner already has a startup")
+            continue
+        try:
+            fields = {field: coerce_startup_field(field, row.get(field)) for field in STARTUP_PROFILE_FIELDS}
+        except ValueError as e:
+            reject(line, row, str(e))
+            continue
+        financials_list = row.get('financial_history', row.get('financials')) or []
+        if isinstance(financials_list, str):
+            try:
+                financials_list = json.loads(financials_list)
+            except json.JSONDecodeError:
+                reject(line, row, "financial_history is not valid JSON")
+                continue
+        fields['company_name'] = (fields['company_name'] or '').strip() or owner['name']
+        for numeric_field, default in (('funding_goal', 0), ('funding_acquired', 0), ('years_operating', 0), ('equity_offered', 0)):
+            if fields[numeric_field] is None:
+                fields[numeric_field] = default # Column defaults, as for a registration that leaves them out
+
+        startup_id = next_id
+        next_id += 1
+        claimed_user_ids.add(owner['id'])
+        startup_dict = {'id': startup_id, **fields,
+                        'financial_history': coerce_submitted_financials(financials_list, f"import line {line}")}
+        risk_info = calculate_risk(startup_dict)
+        startup_values.append((startup_id, owner['id'], *(fields[field] for field in STARTUP_PROFILE_FIELDS),
+                               risk_info['score'], risk_info['category'], json.dumps(risk_info['reasons']),
+                               calculate_valuation(startup_dict), pack_financials(startup_dict['financial_history'])))
+        record_values.extend((startup_id, item['year'], item['revenue'], item['profit'])
+                             for item in startup_dict['financial_history'])
+
+    cursor.executemany(f"""
+        INSERT INTO startups (id, user_id, {', '.join(STARTUP_PROFILE_FIELDS)},
+                              risk_score, risk_category, risk_reasons, calculated_valuation, financial_packed)
+        VALUES ({', '.join('?' * (len(STARTUP_PROFILE_FIELDS) + 7))})
+    """, startup_values)
+    cursor.executemany("INSERT INTO financial_records (startup_id, year, revenue, profit) VALUES (?, ?, ?, ?)", record_values)
+    return len(startup_values)
+
+def import_financials(db, rows, reject, touched_startup_ids):
+    """
+    Imports one batch of single-year records for startup_id or user_email (the founder).
+    An existing record for the same year is replaced. Derived risk fields are refreshed by
+    the caller once all batches are in.
+    """
+    cursor = db.cursor()
+    startup_ids = {r['id'] for r in lookup_in_chunks(cursor, "SELECT id FROM startups WHERE id IN ({placeholders})",
+                   [row['startup_id'] for _, row in rows if not row.get('user_email') and str(row.get('startup_id') or '').isdigit()])}
+    by_email = {r['email']: r['id'] for r in lookup_in_chunks(cursor, """
+        SELECT s.id, u.email FROM users u JOIN startups s ON s.user_id = u.id
+        WHERE u.email IN ({placeholders})""", [row['user_email'] for _, row in rows if row.get('user_email')])}
+
+    values = []
+    for line, row in rows:
+        if row.get('user_email'):
+            startup_id = by_email.get(row['user_email'])
+        else:
+            startup_id = int(row['startup_id']) if str(row.get('startup_id') or '').isdigit() else None
+            startup_id = startup_id if startup_id in startup_ids else None
+        if startup_id is None:
+            reject(line, row, "Unknown startup: startup_id or user_email must name an existing startup")
+            continue
+        validated = validate_financial_records([row], f"import line {line}")
+        if not validated or (row.get('revenue') is None and row.get('profit') is None):
+            reject(line, row, "Invalid financial record: needs an integer year and numeric revenue/profit")
+            continue
+        item = validated[0]
+        values.append((startup_id, item['year'], item['revenue'], item['profit']))
+        touched_startup_ids.add(startup_id)
+    cursor.executemany("""
+        INSERT INTO financial_records (startup_id, year, revenue, profit) VALUES (?, ?, ?, ?)
+        ON CONFLICT (startup_id, year) DO UPDATE SET revenue = excluded.revenue, profit = excluded.profit
+    """, values)
+    return len(values)
+
+@app.cli.command('import')
+@click.option('--users', 'users_path', type=click.Path(exists=True, dir_okay=False), help='Users: email, name, user_type and password or password_hash.')
+@click.option('--startups', 'startups_path', type=click.Path(exists=True, dir_okay=False), help='Startups: user_email or user_id plus profile fields.')
+@click.option('--financials', 'financials_path', type=click.Path(exists=True, dir_okay=False), help='Financial records: startup_id or user_email, year, revenue, profit.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per transaction.')
+@click.option('--reject-file', default='import_rejects.jsonl', show_default=True, type=click.Path(dir_okay=False),
+              help='Invalid rows are appended here as JSON lines with the reason.')
+def import_command(users_path, startups_path, financials_path, batch_size, reject_file):
+    """Bulk-load users, startups and financial records from CSV or JSONL files (applied in that order)."""
+    if not (users_path or startups_path or financials_path):
+        raise click.UsageError("Give at least one of --users, --startups or --financials.")
+    db = get_db()
+    rejects = {'count': 0, 'file': None}
+
+    def reject_writer(path):
+        def reject(line, row, error):
+            if rejects['file'] is None:
+                rejects['file'] = open(reject_file, 'a', encoding='utf-8')
+            rejects['file'].write(json.dumps({'file': path, 'line': line, 'error': error, 'row': row}, default=str) + '\n')
+            rejects['count'] += 1
+        return reject
+
+    seen_emails, claimed_user_ids, touched_startup_ids = set(), set(), set()
+    # (kind, path, prepare, import): prepare(rows, reject) runs before the batch's write
+    # transaction, import(prepared, reject) inside it
+    unprepared = lambda rows, reject: rows
+    steps = [('users', users_path, lambda rows, reject: prepare_users(rows, reject, seen_emails),
+              lambda prepared, reject: import_users(db, prepared, reject)),
+             ('startups', startups_path, unprepared,
+              lambda rows, reject: import_startups(db, rows, reject, claimed_user_ids)),
+             ('financials', financials_path, unprepared,
+              lambda rows, reject: import_financials(db, rows, reject, touched_startup_ids))]
+    try:
+        for kind, path, prepare_batch, import_batch in steps:
+            if not path:
+                continue
+            reject = reject_writer(path)
+            started = time.perf_counter()
+            rejected_before = rejects['count']
+            imported = read = 0
+            for batch in batched(read_import_rows(path), batch_size):
+                rows = []
+                for line, row, error in batch:
+                    if error:
+                        reject(line, row, error)
+                    else:
+                        rows.append((line, row))
+                read += len(batch)
+                prepared = prepare_batch(rows, reject)
+                try:
+                    db.execute("BEGIN IMMEDIATE") # One write transaction per batch
+                    imported += import_batch(prepared, reject)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+                elapsed = time.perf_counter() - started
+                click.echo(f"{kind}: {read} rows read, {imported} imported, {rejects['count'] - rejected_before} rejected, "
+                           f"{read / max(elapsed, 1e-9):,.0f} rows/s")
+
+        if touched_startup_ids:
+            # Records from --financials change risk inputs; recompute like update_my_startup_financials does
+            started = time.perf_counter()
+            for chunk in batched(sorted(touched_startup_ids), batch_size):
+                try:
+                    db.execute("BEGIN IMMEDIATE")
+                    for startup_id in chunk:
+                        refresh_startup_derived_fields(db.cursor(), startup_id)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+            click.echo(f"Refreshed risk and valuation for {len(touched_startup_ids)} startups "
+                       f"in {time.perf_counter() - started:.2f}s")
+    finally:
+        if rejects['file'] is not None:
+            rejects['file'].close()
+        response_cache.clear() # Other processes see the new rows within RESPONSE_CACHE_TTL
+    if rejects['count']:
+        click.echo(f"{rejects['count']} rows rejected; see {reject_file}", err=True)
+    if startups_path or financials_path:
+        click.echo("Imports don't update recommendations; run `flask rebuild-recommendations` afterwards.")
+
+# --- Export ---
+# Full dumps as NDJSON (one JSON object per line), streamed in EXPORT_BATCH_SIZE chunks so
+# memory stays flat whatever the table size. Each export reads inside one transaction, so
+# it is a consistent snapshot even while writers carry on (WAL).
+EXPORT_STARTUP_COLUMNS = ['id', 'user_id', 'company_name', 'description', 'industry', 'funding_goal',
+                          'funding_acquired', 'years_operating', 'website', 'logo_url', 'contact_phone',
+                          'equity_offered', 'created_at', 'risk_score', 'risk_category', 'risk_reasons',
+                          'calculated_valuation', 'interest_count']
+
+def _ndjson_chunk(records):
+    return ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode('utf-8')
+
+def export_startups_ndjson(db, batch_size):
+    """Yields NDJSON chunks of every startup with its decoded financial history and risk reasons."""
+    cursor = db.cursor()
+    records_cursor = db.cursor()
+    cursor.execute(f"SELECT {', '.join(EXPORT_STARTUP_COLUMNS)} FROM startups ORDER BY id")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        # One range query per batch instead of one per startup; the primary key keeps it sorted
+        records_cursor.execute("""
+            SELECT startup_id, year, revenue, profit FROM financial_records
+            WHERE startup_id BETWEEN ? AND ?
+            ORDER BY startup_id, year
+        """, (rows[0]['id'], rows[-1]['id']))
+        financials = {}
+        for record in records_cursor.fetchall():
+            financials.setdefault(record['startup_id'], []).append(
+                {'year': record['year'], 'revenue': record['revenue'], 'profit': record['profit']})
+        startups = []
+        for row in rows:
+            startup_dict = dict(row)
+            try:
+                startup_dict['risk_reasons'] = json.loads(startup_dict['risk_reasons']) if startup_dict['risk_reasons'] else []
+            except json.JSONDecodeError:
+                startup_dict['risk_reasons'] = []
+            startup_dict['financial_history'] = financials.get(row['id'], [])
+            startups.append(startup_dict)
+        yield _ndjson_chunk(startups)
+
+def export_interest_ndjson(db, batch_size):
+    """Yields NDJSON chunks of the investor_interest ledger in insertion order."""
+    cursor = db.cursor()
+    cursor.execute("SELECT id, investor_user_id, startup_id, expressed_at FROM investor_interest ORDER BY id")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield _ndjson_chunk(dict(row) for row in rows)
+
+EXPORTS = {'startups': export_startups_ndjson, 'interest': export_interest_ndjson}
+
+def gzip_chunks(chunks):
+    """Compresses a stream of byte chunks into one gzip stream, flushing after every chunk."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+def stream_export(name, batch_size, pool):
+    """Runs an export on a connection borrowed from pool for the duration of the stream."""
+    db = pool.acquire()
+    db.set_trace_callback(sql_trace_callback())
+    try:
+        db.execute("BEGIN") # One read snapshot across all batches
+        yield from EXPORTS[name](db, batch_size)
+    finally:
+        pool.release(db) # Also rolls back the read transaction
+
+def bearer_token_authorized(setting):
+    """Whether the request sends 'Authorization: Bearer <app.config[setting]>'; never while that token is unset."""
+    token = app.config.get(setting)
+    provided = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(provided.encode('utf-8'), f"Bearer {token}".encode('utf-8'))
+
+@app.route('/api/export/<any(startups, interest):name>.ndjson', methods=['GET'])
+def export_ndjson(name):
+    """
+    Streams a full export of startups or investor_interest as NDJSON. Requires
+    'Authorization: Bearer <EXPORT_API_TOKEN>'. Gzipped when the client accepts it.
+    """
+    if not bearer_token_authorized('EXPORT_API_TOKEN'):
+        return jsonify({"error": "Unauthorized"}), 403
+    chunks = stream_export(name, app.config['EXPORT_BATCH_SIZE'], get_db_pool())
+    use_gzip = 'gzip' in request.accept_encodings
+    response = app.response_class(stream_with_context(gzip_chunks(chunks) if use_gzip else chunks),
+                                  mimetype='application/x-ndjson')
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}.ndjson"'
+    response.headers['Cache-Control'] = 'no-store'
+    app.logger.info("Streaming %s export%s", name, ' (gzip)' if use_gzip else '')
+    return response
+
+@app.cli.command('export')
+@click.argument('names', nargs=-1, type=click.Choice(sorted(EXPORTS)))
+@click.option('--output-dir', default='.', show_default=True, type=click.Path(file_okay=False), help='Directory for the .ndjson files.')
+@click.option('--gzip', 'use_gzip', is_flag=True, help='Write .ndjson.gz files.')
+def export_command(names, output_dir, use_gzip):
+    """Write NDJSON exports (default: all of them) to files, streaming like the export API."""
+    os.makedirs(output_dir, exist_ok=True)
+    for name in names or sorted(EXPORTS):
+        path = os.path.join(output_dir, f"{name}.ndjson" + ('.gz' if use_gzip else ''))
+        started = time.perf_counter()
+        counts = {'rows': 0, 'bytes': 0}
+
+        def counted(chunks):
+            for chunk in chunks:
+                counts['rows'] += chunk.count(b'\n')
+                yield chunk
+        chunks = counted(stream_export(name, app.config['EXPORT_BATCH_SIZE'], get_db_pool()))
+        with open(path, 'wb') as output:
+            for chunk in (gzip_chunks(chunks) if use_gzip else chunks):
+                output.write(chunk)
+                counts['bytes'] += len(chunk)
+        elapsed = time.perf_counter() - started
+        click.echo(f"Wrote {path}: {counts['rows']} rows, {counts['bytes'] / 1e6:.1f} MB in {elapsed:.2f}s "
+                   f"({counts['rows'] / max(elapsed, 1e-9):,.0f} rows/s)")
+
+# --- Health ---
+# /metrics and /api/health/* expose pool, cache, limiter and logging internals and the shape of
+# slow SQL, so they need 'Authorization: Bearer <METRICS_API_TOKEN>'. Only liveness is public.
+PUBLIC_HEALTH_ENDPOINTS = {'get_liveness'}
+
+@app.before_request
+def require_metrics_token():
+    if request.endpoint in PUBLIC_HEALTH_ENDPOINTS:
+        return None
+    if request.path == '/metrics' or request.path.startswith('/api/health/'):
+        if not bearer_token_authorized('METRICS_API_TOKEN'):
+            return jsonify({"error": "Unauthorized"}), 403
+    return None
+
+@app.route('/api/health/live', methods=['GET'])
+def get_liveness():
+    """Public liveness probe: the process is up and serving requests."""
+    return jsonify({"status": "ok"}), 200
+
+@app.route('/api/health/db-pool', methods=['GET'])
+def get_db_pool_stats():
+    """Connection pool counters for every database this process has opened."""
+    with _db_pools_lock:
+        pools = list(_db_pools.values())
+    return jsonify({"pools": [pool.stats() for pool in pools]}), 200
+
+@app.route('/api/health/cache', methods=['GET'])
+def get_response_cache_stats():
+    """Hit/miss and invalidation counters for the in-process response cache."""
+    return jsonify(response_cache.stats()), 200
+
+@app.route('/api/health/read-snapshot', methods=['GET'])
+def get_read_snapshot_stats():
+    """Age, refresh counters and size of the in-memory read snapshots of this process."""
+    with _read_snapshot_stores_lock:
+        stores = list(_read_snapshot_stores.values())
+    return jsonify({"enabled": app.config['READ_SNAPSHOT_ENABLED'], "snapshots": [store.stats() for store in stores]}), 200
+
+@app.route('/api/health/admission', methods=['GET'])
+def get_admission_stats():
+    """In-flight requests, admitted/shed counts per priority, and every rate limiter's counters."""
+    return jsonify({"admission": get_admission_controller().stats(), "rate_limit_enabled": app.config['RATE_LIMIT_ENABLED'],
+                    "rate_limits": {bucket: limiter.stats() for bucket, limiter in list(_rate_limiters.items())}}), 200
+
+@app.route('/api/health/logging', methods=['GET'])
+def get_logging_stats():
+    """Log format and level, records queued/dropped by the log writer, and warnings suppressed by sampling."""
+    return jsonify(logging_stats()), 200
+
+@app.route('/api/health/password-hasher', methods=['GET'])
+def get_password_hasher_stats():
+    """Queue depth and counters for the scrypt hashing pool of this process."""
+    return jsonify(get_password_hasher().stats()), 200
+
+@app.route('/api/health/slow-requests', methods=['GET'])
+def get_slow_requests():
+    """The most recent requests slower than SLOW_REQUEST_MS, with the SQL they ran (literals replaced by ?)."""
+    return jsonify({"threshold_ms": app.config['SLOW_REQUEST_MS'], "requests": request_metrics.slow_requests()}), 200
+
+def _numeric_gauges(gauges, prefix, stats, labels=None):
+    for key, value in stats.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            gauges.setdefault(f"{prefix}_{key}", []).append((labels or {}, value))
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text format: request/SQL/stage metrics plus pool, cache, hasher, event broker, read snapshot, admission, logging and analytics counters."""
+    gauges = {}
+    with _db_pools_lock:
+        pools = list(_db_pools.values())
+    for pool in pools:
+        _numeric_gauges(gauges, 'db_pool', pool.stats(), {'database': pool.database})
+    _numeric_gauges(gauges, 'response_cache', response_cache.stats())
+    _numeric_gauges(gauges, 'password_hasher', get_password_hasher().stats())
+    _numeric_gauges(gauges, 'event_broker', event_broker.stats())
+    with _read_snapshot_stores_lock:
+        stores = list(_read_snapshot_stores.values())
+    for store in stores:
+        _numeric_gauges(gauges, 'read_snapshot', store.stats(), {'database': store.source})
+    _numeric_gauges(gauges, 'admission', get_admission_controller().stats())
+    for bucket, limiter in list(_rate_limiters.items()):
+        _numeric_gauges(gauges, 'rate_limit', limiter.stats(), {'bucket': bucket})
+    _numeric_gauges(gauges, 'logging', logging_stats())
+    with _financial_analytics_lock:
+        analytics_by_database = list(_financial_analytics.items())
+    for database, analytics in analytics_by_database:
+        _numeric_gauges(gauges, 'financial_analytics', analytics.stats(), {'database': database})
+    return app.response_class(request_metrics.render_prometheus(gauges), mimetype='text/plain; version=0.0.4')
+
+# --- Query Plan Check ---
+# One sample request per endpoint. check-query-plans fails if a route has no sample, so new
+# routes must add one here. 'as' logs the request in as the seeded startup or investor first;
+# 'full_scan' marks routes that read whole tables by design (exports), which are not flagged.
+QUERY_PLAN_SAMPLES = [
+    {'endpoint': 'register', 'method': 'POST', 'path': '/api/register',
+     'json': {'email': 'plan-new@example.com', 'password': 'pw', 'name': 'Plan New', 'user_type': 'startup',
+              'funding_goal': 50000, 'financials': [{'year': 2023, 'revenue': 1000, 'profit': -10}]}},
+    {'endpoint': 'login', 'method': 'POST', 'path': '/api/login',
+     'json': {'email': 'plan-investor@example.com', 'password': 'pw'}},
+    {'endpoint': 'logout', 'method': 'POST', 'path': '/api/logout'},
+    {'endpoint': 'auth_status', 'method': 'GET', 'path': '/api/auth/status'},
+    {'endpoint': 'get_startups', 'method': 'GET', 'path': '/api/startups?limit=1'},
+    {'endpoint': 'get_startups', 'method': 'GET', 'path': '/api/startups?risk=high&limit=1'},
+    {'endpoint': 'get_startups', 'method': 'GET', 'path': '/api/startups?limit=1', 'follow_cursor': True},
+    {'endpoint': 'get_startups', 'method': 'GET', 'path': '/api/startups?risk=average&limit=1', 'follow_cursor': True},
+    {'endpoint': 'get_startups', 'method': 'GET', 'path': '/api/startups?sort=popular&limit=1', 'follow_cursor': True},
+    {'endpoint': 'get_startups', 'method': 'GET', 'path': '/api/startups?sort=popular&risk=average&limit=1', 'follow_cursor': True},
+    {'endpoint': 'get_startup_details', 'method': 'GET', 'path': '/api/startups/1', 'as': 'investor'},
+    {'endpoint': 'get_industry_analytics', 'method': 'GET', 'path': '/api/analytics/industry/Fintech'},
+    {'endpoint': 'get_startup_details_batch', 'method': 'GET', 'path': '/api/startups/batch?ids=2,1,999', 'as': 'investor'},
+    {'endpoint': 'get_startup_facets', 'method': 'GET', 'path': '/api/startups/facets'},
+    {'endpoint': 'search_startups', 'method': 'GET', 'path': '/api/startups/search?q=plan+start&limit=1', 'follow_offset': True},
+    {'endpoint': 'manage_investor_interest', 'method': 'POST', 'path': '/api/startups/1/interest', 'as': 'investor'},
+    {'endpoint': 'get_recommendations', 'method': 'GET', 'path': '/api/recommendations?limit=5', 'as': 'investor'},
+    {'endpoint': 'manage_investor_interest', 'method': 'DELETE', 'path': '/api/startups/1/interest', 'as': 'investor'},
+    {'endpoint': 'get_my_startup_analytics', 'method': 'GET', 'path': '/api/my-startup/analytics', 'as': 'startup'},
+    {'endpoint': 'get_my_startup_events', 'method': 'GET', 'path': '/api/my-startup/events', 'as': 'startup',
+     'headers': {'Last-Event-ID': '0'}},
+    {'endpoint': 'manage_my_startup', 'method': 'GET', 'path': '/api/my-startup', 'as': 'startup'},
+    {'endpoint': 'manage_my_startup', 'method': 'PUT', 'path': '/api/my-startup', 'as': 'startup',
+     'json': {'funding_goal': 75000}},
+    {'endpoint': 'update_my_startup_financials', 'method': 'PUT', 'path': '/api/my-startup/financials', 'as': 'startup',
+     'json': [{'year': 2023, 'revenue': 2000, 'profit': 5}]},
+    {'endpoint': 'export_ndjson', 'method': 'GET', 'path': '/api/export/startups.ndjson', 'full_scan': True,
+     'headers': {'Authorization': 'Bearer plan-export-token', 'Accept-Encoding': 'gzip'}},
+    {'endpoint': 'export_ndjson', 'method': 'GET', 'path': '/api/export/interest.ndjson', 'full_scan': True,
+     'headers': {'Authorization': 'Bearer plan-export-token'}},
+    {'endpoint': 'get_liveness', 'method': 'GET', 'path': '/api/health/live'},
+    {'endpoint': 'get_db_pool_stats', 'method': 'GET', 'path': '/api/health/db-pool', 'headers': {'Authorization': 'Bearer plan-metrics-token'}},
+    {'endpoint': 'get_response_cache_stats', 'method': 'GET', 'path': '/api/health/cache', 'headers': {'Authorization': 'Bearer plan-metrics-token'}},
+    {'endpoint': 'get_read_snapshot_stats', 'method': 'GET', 'path': '/api/health/read-snapshot', 'headers': {'Authorization': 'Bearer plan-metrics-token'}},
+    {'endpoint': 'get_admission_stats', 'method': 'GET', 'path': '/api/health/admission', 'headers': {'Authorization': 'Bearer plan-metrics-token'}},
+    {'endpoint': 'get_logging_stats', 'method': 'GET', 'path': '/api/health/logging', 'headers': {'Authorization': 'Bearer plan-metrics-token'}},
+    {'endpoint': 'get_password_hasher_stats', 'method': 'GET', 'path': '/api/health/password-hasher', 'headers': {'Authorization': 'Bearer plan-metrics-token'}},
+    {'endpoint': 'get_slow_requests', 'method': 'GET', 'path': '/api/health/slow-requests', 'headers': {'Authorization': 'Bearer plan-metrics-token'}},
+    {'endpoint': 'get_metrics', 'method': 'GET', 'path': '/metrics', 'headers': {'Authorization': 'Bearer plan-metrics-token'}},
+]
+
+def _plan_has_table_scan(detail):
+    """True for a full table scan; ordered index scans, virtual tables and constant rows are fine."""
+    if not detail.startswith('SCAN ') or detail.startswith('SCAN CONSTANT ROW'):
+        return False
+    return 'USING' not in detail and 'VIRTUAL TABLE' not in detail
+
+def check_query_plans():
+    """
+    Runs every QUERY_PLAN_SAMPLES request against a scratch, fully migrated database, captures
+    the SQL each one executes and EXPLAINs it. Returns (problems, statements_checked).
+    """
+    import tempfile
+    problems = []
+    captured = []
+    statements_checked = 0
+    original_database = app.config['DATABASE']
+    original_trace = app.config.get('SQL_TRACE_CALLBACK')
+    original_export_token = app.config.get('EXPORT_API_TOKEN')
+    original_metrics_token = app.config.get('METRICS_API_TOKEN')
+    original_stream_seconds = app.config['EVENTS_MAX_STREAM_SECONDS']
+    original_auto_update = app.config['RECOMMENDATIONS_AUTO_UPDATE']
+    original_rate_limit = app.config['RATE_LIMIT_ENABLED']
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        app.config['DATABASE'] = os.path.join(scratch_dir, 'query_plans.db')
+        app.config['EXPORT_API_TOKEN'] = 'plan-export-token' # Matches the export samples' headers
+        app.config['METRICS_API_TOKEN'] = 'plan-metrics-token' # Likewise for the health and metrics samples
+        app.config['EVENTS_MAX_STREAM_SECONDS'] = 0 # Event streams replay the log and end instead of waiting
+        app.config['RECOMMENDATIONS_AUTO_UPDATE'] = False # No background writes to the scratch database
+        app.config['RATE_LIMIT_ENABLED'] = False # Every sample request comes from the same address
+        response_cache.clear() # Cached bodies belong to the real database and would hide the SQL
+        try:
+            with app.app_context():
+                migrate(get_db())
+            client = app.test_client()
+            for user_type in ('startup', 'investor'):
+                client.post('/api/register', json={'email': f'plan-{user_type}@example.com', 'password': 'pw',
+                                                   'name': f'Plan {user_type}', 'user_type': user_type,
+                                                   'funding_goal': 100000, 'funding_acquired': 40000})
+            client.post('/api/logout')
+            get_financial_analytics() # Its one-off build reads every startup; afterwards routes only update it
+
+            app.config['SQL_TRACE_CALLBACK'] = captured.append
+            exercised = set()
+            for sample in QUERY_PLAN_SAMPLES:
+                client.post('/api/logout')
+                if sample.get('as'):
+                    client.post('/api/login', json={'email': f"plan-{sample['as']}@example.com", 'password': 'pw'})
+                captured.clear()
+                response = client.open(sample['path'], method=sample['method'], json=sample.get('json'),
+                                       headers=sample.get('headers'))
+                response.get_data() # Drain streamed bodies so their SQL runs and is captured
+                separator = '&' if '?' in sample['path'] else '?'
+                if sample.get('follow_cursor') and response.is_json and (response.get_json() or {}).get('next_cursor'):
+                    response = client.get(f"{sample['path']}{separator}cursor={response.get_json()['next_cursor']}")
+                if sample.get('follow_offset') and response.is_json and (response.get_json() or {}).get('next_offset'):
+                    response = client.get(f"{sample['path']}{separator}offset={response.get_json()['next_offset']}")
+                if response.status_code >= 500:
+                    problems.append(f"{sample['method']} {sample['path']}: returned {response.status_code}")
+                exercised.add(sample['endpoint'])
+
+                plan_db = sqlite3.connect(app.config['DATABASE'])
+                try:
+                    for statement in list(captured):
+                        if not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH')):
+                            continue
+                        for plan_row in plan_db.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall():
+                            if _plan_has_table_scan(plan_row[3]) and not sample.get('full_scan'):
+                                problems.append(f"{sample['method']} {sample['path']}: {plan_row[3]} in: {' '.join(statement.split())}")
+                finally:
+                    plan_db.close()
+                statements_checked += len(captured)
+
+            for rule in app.url_map.iter_rules():
+                if rule.endpoint != 'static' and rule.endpoint not in exercised:
+                    problems.append(f"{rule.rule}: no QUERY_PLAN_SAMPLES entry for endpoint '{rule.endpoint}'")
+        finally:
+            response_cache.clear()
+            with _financial_analytics_lock:
+                _financial_analytics.pop(app.config['DATABASE'], None)
+            close_db_pool(app.config['DATABASE'])
+            app.config['DATABASE'] = original_database
+            app.config['SQL_TRACE_CALLBACK'] = original_trace
+            app.config['EXPORT_API_TOKEN'] = original_export_token
+            app.config['METRICS_API_TOKEN'] = original_metrics_token
+            app.config['EVENTS_MAX_STREAM_SECONDS'] = original_stream_seconds
+            app.config['RECOMMENDATIONS_AUTO_UPDATE'] = original_auto_update
+            app.config['RATE_LIMIT_ENABLED'] = original_rate_limit
+    return problems, statements_checked
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """EXPLAIN the SQL behind every route and fail on any full table scan."""
+    # The CLI keeps an app context pushed, which sample requests would share (and with it one
+    # untraced connection); run the check in an empty context so each request gets its own.
+    problems, statements_checked = contextvars.Context().run(check_query_plans)
+    for problem in problems:
+        click.echo(f"FAIL {problem}", err=True)
+    if problems:
+        raise SystemExit(1)
+    click.echo(f"OK: no table scans in {statements_checked} statements across {len(QUERY_PLAN_SAMPLES)} route samples.")
+
+# --- App Factory & Worker Processes ---
+# Production runs several server processes (wsgi.py, gunicorn.conf.py). Each one calls
+# create_app() and then init_worker(); they share nothing but the database file and SECRET_KEY.
+worker_init_hooks = []
+
+def create_app(config=None):
+    """
+    Configures the app for this process and returns it. Settings are the defaults above,
+    overridden by FLASK_-prefixed environment variables (FLASK_SECRET_KEY, FLASK_DATABASE,
+    FLASK_DB_POOL_SIZE=16, ...; values are parsed as JSON where possible), overridden by config.
+    Routes are registered on the module-level app, so there is one app per process.
+
+    Every process serving the same users needs the same SECRET_KEY; without one, the
+    per-process development key is kept and sessions only work on the process that issued them.
+    """
+    app.config.from_prefixed_env()
+    app.config.update(config or {})
+    configure_logging()
+    if app.config['PROXY_FIX_X_FOR'] and not isinstance(app.wsgi_app, ProxyFix):
+        # Behind a reverse proxy every peer address is the proxy's; rate limits need the client's
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    if app.config['SECRET_KEY'] is SECRET_KEY:
+        app.logger.warning("No SECRET_KEY configured (set FLASK_SECRET_KEY): sessions are only valid in this process")
+    return app
+
+def worker_init_hook(function):
+    """Registers function() to run in init_worker(), in registration order."""
+    worker_init_hooks.append(function)
+    return function
+
+def init_worker():
+    """
+    Prepares a server process before it takes requests. Connections, hashing pools and threads
+    are all created on first use, so a parent that imported the app before forking (gunicorn
+    --preload) normally holds none; any it did open are dropped here rather than shared.
+    """
+    global _password_hasher
+    configure_logging() # The log writer thread of a parent that forked this process isn't running here
+    with _db_pools_lock:
+        _db_pools.clear()
+    with _read_snapshot_stores_lock:
+        _read_snapshot_stores.clear()
+    with _financial_analytics_lock:
+        _financial_analytics.clear()
+        _financial_analytics_changes.clear()
+    _password_hasher = None
+    response_cache.clear()
+    for hook in worker_init_hooks:
+        started = time.perf_counter()
+        hook()
+        app.logger.info("Worker %s: %s took %.3fs", os.getpid(), hook.__name__, time.perf_counter() - started)
+
+@worker_init_hook
+def warm_connections():
+    """Opens WORKER_WARM_CONNECTIONS pooled connections, with pragmas applied and the schema read."""
+    pool = get_db_pool()
+    connections = [pool.acquire() for _ in range(min(app.config['WORKER_WARM_CONNECTIONS'], pool.max_size))]
+    try:
+        for conn in connections:
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+    finally:
+        for conn in connections:
+            pool.release(conn)
+
+@worker_init_hook
+def start_password_hasher():
+    """Starts the scrypt worker processes now instead of on the first login."""
+    get_password_hasher()
+
+@worker_init_hook
+def warm_financial_analytics():
+    """Builds the industry analytics now, so the first detail or analytics request doesn't pay for it."""
+    get_financial_analytics()
+
+@worker_init_hook
+def prefill_response_cache():
+    """Requests WORKER_WARM_PATHS once, so the busiest pages are cached before real traffic."""
+    client = app.test_client()
+    for path in app.config['WORKER_WARM_PATHS']:
+        response = client.get(path)
+        if response.status_code != 200:
+            app.logger.warning("Worker %s: warming %s returned %s", os.getpid(), path, response.status_code)
+
+def serve_worker(config, ports):
+    """One server process for check-workers and bench.routes: create_app(config), init_worker(), serve on a free port."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    WSGIRequestHandler.log_request = lambda *args, **kwargs: None
+    import signal
+    worker_app = create_app(config)
+    init_worker()
+    server = make_server('127.0.0.1', 0, worker_app, threaded=True)
+    # terminate() stops serving and exits normally, so the scrypt pool is shut down rather than orphaned
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    ports.put(server.server_port)
+    server.serve_forever()
+    get_password_hasher().shutdown()
+
+def start_workers(config, count, timeout=60.0):
+    """Starts count serve_worker processes; returns (processes, ports). Terminate the processes when done."""
+    import multiprocessing
+    context = multiprocessing.get_context('spawn') # A fresh interpreter each, like separate server workers
+    ports = context.Queue()
+    # Not daemonic: a worker starts its own scrypt process pool, and daemonic processes can't have children
+    processes = [context.Process(target=serve_worker, args=(config, ports)) for _ in range(count)]
+    for process in processes:
+        process.start()
+    try:
+        return processes, [ports.get(timeout=timeout) for _ in processes]
+    except Exception:
+        for process in processes:
+            process.terminate()
+        raise
+
+@app.cli.command('check-workers')
+@click.option('--workers', default=3, show_default=True, help='Server processes sharing one SECRET_KEY.')
+def check_workers_command(workers):
+    """Check that a session issued by one server process is accepted by every other one."""
+    import http.client
+    import tempfile
+
+    def call(port, method, path, body=None, cookie=None):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        if cookie:
+            headers['Cookie'] = cookie
+        connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = connection.getresponse()
+        payload = json.loads(response.read() or b'null')
+        cookie = (response.getheader('Set-Cookie') or '').split(';')[0] or cookie
+        connection.close()
+        return response.status, payload, cookie
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        database = os.path.join(scratch_dir, 'check_workers.db')
+        original_database = app.config['DATABASE']
+        app.config['DATABASE'] = database
+        try:
+            with app.app_context():
+                migrate(get_db())
+        finally:
+            close_db_pool(database)
+            app.config['DATABASE'] = original_database
+        config = {'DATABASE': database, 'SECRET_KEY': os.urandom(24).hex(), 'PASSWORD_HASH_WORKERS': 0,
+                  'RECOMMENDATIONS_AUTO_UPDATE': False}
+        # One more process with its own key: it must reject the session, or the check proves nothing
+        processes, ports = start_workers(config, workers)
+        control_processes, (control_port,) = start_workers({**config, 'SECRET_KEY': os.urandom(24).hex()}, 1)
+        try:
+            credentials = {'email': 'check-workers@example.com', 'password': 'check-workers'}
+            call(ports[0], 'POST', '/api/register', {**credentials, 'name': 'Check Workers', 'user_type': 'investor'})
+            status, _, cookie = call(ports[0], 'POST', '/api/login', credentials)
+            if status != 200:
+                raise SystemExit(f"FAIL login on worker 0 returned {status}")
+            failures = 0
+            for index, port in enumerate(ports):
+                _, auth, _ = call(port, 'GET', '/api/auth/status', cookie=cookie)
+                status, _, _ = call(port, 'GET', '/api/recommendations', cookie=cookie)
+                accepted = auth['logged_in'] and status == 200
+                failures += not accepted
+                click.echo(f"{'OK  ' if accepted else 'FAIL'} worker {index} (port {port}): "
+                           f"logged_in={auth['logged_in']}, /api/recommendations {status}")
+            _, auth, _ = call(control_port, 'GET', '/api/auth/status', cookie=cookie)
+            if auth['logged_in']:
+                raise SystemExit("FAIL a process with a different SECRET_KEY accepted the session")
+            click.echo("OK   control process with its own SECRET_KEY rejected the session")
+        finally:
+            for process in processes + control_processes:
+                process.terminate()
+                process.join()
+    if failures:
+        raise SystemExit(1)
+    click.echo(f"OK: a session issued by worker 0 was accepted by all {workers} workers.")
+
 # --- Main Execution ---
 if __name__ == '__main__':
-    if not os.path.exists(DATABASE):
-         print(f"Database file '{DATABASE}' not found. Initializing...")
-         with app.app_context():
-             init_db()
+    # Development server: one process, debug mode. Production runs wsgi.py under gunicorn.
+    create_app()
+    if not os.path.exists(app.config['DATABASE']):
+         print(f"Database file '{app.config['DATABASE']}' not found. Initializing...")
+    with app.app_context():
+        migrate(get_db()) # Creates the schema on first run, applies pending migrations afterwards
     print("Starting Flask server...")
-    # Ensure debug is False in production!
     app.run(debug=True, port=5000, host='127.0.0.1')
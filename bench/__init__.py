@@ -0,0 +1,15 @@
+# backend/bench/__init__.py
+"""
+Benchmarks for the CapitalBay backend. Run modules with `python -m bench.<name>` from the backend directory.
+
+    dataset   cached synthetic databases at 1k/10k/100k/1M startups
+    routes    concurrent load over every API route (test client or local WSGI server)
+    micro     per-call cost of scoring and JSON decoding
+    compare   diff two saved result files and flag regressions
+    search    FTS5 against the old LIKE search
+    login     login throughput against the password hashing pool size
+    financials financial history formats: JSON, financial_records rows and the packed BLOB
+    admission  credential stuffing against catalog reads, with rate limits and the concurrency cap on and off
+    log_overhead catalog read throughput with logging off, inline, queued and sampled
+    analytics  industry analytics from the NumPy column cache against computing them per request
+"""
@@ -0,0 +1,142 @@
+# backend/bench/admission.py
+"""
+Credential stuffing against catalog reads. Starts the threaded WSGI server on a cached
+dataset; --readers client threads browse the listing and detail pages while --attackers
+threads post /api/login with wrong passwords for random bench accounts, from --attacker-ips
+distinct X-Forwarded-For addresses, at --attack-rate attempts per second in total (a bot
+fleet keeps its pace whatever the answers; a thread only falls behind while its previous
+attempt is still running). The same load runs twice: with RATE_LIMIT_ENABLED off
+and a concurrency cap too high to shed anything, then with the configured limits and cap.
+
+    python -m bench.admission --startups 10000 --readers 4 --attackers 32 --attack-rate 50 --duration 15
+    python -m bench.admission --attacker-ips 1000   # distributed: per-IP buckets rarely fire
+
+Reports the readers' throughput and latency, the attackers' status counts, and the per-call
+cost of TokenBucketLimiter.acquire.
+"""
+
+import argparse
+import random
+import threading
+import time
+
+import app as backend
+from bench import dataset
+from bench.routes import HTTPTransport, start_wsgi_server
+from bench.stats import latency_summary, save_results
+from rate_limiter import TokenBucketLimiter
+
+
+def acquire_ns(keys, max_keys, calls=200000):
+    limiter = TokenBucketLimiter(1000.0, 1000, max_keys=max_keys)
+    names = [f"10.0.{i // 256}.{i % 256}" for i in range(keys)]
+    started = time.perf_counter_ns()
+    for i in range(calls):
+        limiter.acquire(names[i % keys])
+    return round((time.perf_counter_ns() - started) / calls, 1)
+
+
+def run_load(port, size, readers, attackers, attack_rate, attacker_ips, duration, seed):
+    stop_at = time.perf_counter() + duration
+    reader_timings = []
+    attacker_statuses = {}
+    record = threading.Lock()
+
+    def reader(index):
+        rng = random.Random(seed * 1000 + index)
+        transport = HTTPTransport(port)
+        timings = []
+        while time.perf_counter() < stop_at:
+            path = '/api/startups?limit=24' if rng.random() < 0.4 else f"/api/startups/{rng.randint(1, size)}"
+            started = time.perf_counter()
+            transport.request('GET', path, headers={'X-Forwarded-For': f"192.168.0.{index}"})
+            timings.append((time.perf_counter() - started) * 1000)
+        transport.close()
+        with record:
+            reader_timings.extend(timings)
+
+    def attacker(index):
+        rng = random.Random(seed * 1000 + 500 + index)
+        transport = HTTPTransport(port)
+        statuses = {}
+        interval = attackers / attack_rate
+        next_at = time.perf_counter() + rng.random() * interval
+        while next_at < stop_at:
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+            next_at = max(next_at + interval, time.perf_counter())
+            ip = rng.randrange(attacker_ips)
+            body = {'email': f"founder{rng.randint(1, size)}@bench.example", 'password': f"guess-{rng.getrandbits(32)}"}
+            status, _ = transport.request('POST', '/api/login', body,
+                                          headers={'X-Forwarded-For': f"10.{ip >> 16 & 255}.{ip >> 8 & 255}.{ip & 255}"})
+            statuses[status] = statuses.get(status, 0) + 1
+        transport.close()
+        with record:
+            for status, count in statuses.items():
+                attacker_statuses[status] = attacker_statuses.get(status, 0) + count
+
+    threads = ([threading.Thread(target=reader, args=(i,)) for i in range(readers)] +
+               [threading.Thread(target=attacker, args=(i,)) for i in range(attackers)])
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'readers': {**latency_summary(reader_timings), 'throughput_per_s': round(len(reader_timings) / elapsed, 2)},
+        'attackers': {'statuses': {str(status): count for status, count in sorted(attacker_statuses.items())},
+                      'throughput_per_s': round(sum(attacker_statuses.values()) / elapsed, 2)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--startups', type=int, default=10000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--attackers', type=int, default=32)
+    parser.add_argument('--attack-rate', type=float, default=50.0)
+    parser.add_argument('--attacker-ips', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=dataset.DEFAULT_DATA_DIR)
+    parser.add_argument('--output', help='Write results as JSON to this path.')
+    args = parser.parse_args()
+
+    path = dataset.ensure_dataset(args.startups, args.seed, args.data_dir)
+    backend.create_app({'DATABASE': path, 'PROXY_FIX_X_FOR': 1, # Clients pick their address in X-Forwarded-For
+                        'DB_POOL_SIZE': max(backend.app.config['DB_POOL_SIZE'], args.readers + args.attackers)})
+    backend.app.logger.setLevel('ERROR') # One warning per limited request otherwise
+    configured = {key: backend.app.config[key] for key in ('RATE_LIMIT_ENABLED', 'MAX_CONCURRENT_REQUESTS')}
+    results = {'acquire_ns': {'100_keys': acquire_ns(100, 10000), # Every key stays in the LRU
+                              '100000_keys': acquire_ns(100000, 10000)}} # Every call evicts one
+    server = start_wsgi_server()
+    try:
+        for mode, overrides in (('unprotected', {'RATE_LIMIT_ENABLED': False, 'MAX_CONCURRENT_REQUESTS': 100000}),
+                                ('protected', configured)):
+            backend.app.config.update(overrides)
+            backend._admission_controller = None # Rebuilt from the config above
+            backend._rate_limiters.clear()
+            backend.response_cache.clear()
+            results[mode] = run_load(server.server_port, args.startups, args.readers, args.attackers,
+                                     args.attack_rate, args.attacker_ips, args.duration, args.seed)
+            results[mode]['admission'] = backend.get_admission_controller().stats()
+    finally:
+        server.shutdown()
+        backend.get_password_hasher().shutdown()
+        backend.close_db_pool(path)
+
+    print(f"{args.startups} startups, {args.readers} readers, {args.attackers} attackers from {args.attacker_ips} IPs "
+          f"at {args.attack_rate:.0f}/s, {args.duration:.0f}s; acquire() {results['acquire_ns']} ns")
+    for mode in ('unprotected', 'protected'):
+        readers, attackers = results[mode]['readers'], results[mode]['attackers']
+        print(f"{mode:<12} readers {readers['throughput_per_s']:8.1f} req/s  p50 {readers['p50_ms']:7.2f} ms  "
+              f"p99 {readers['p99_ms']:8.2f} ms   attackers {attackers['throughput_per_s']:7.1f} req/s {attackers['statuses']}")
+    if args.output:
+        config = {'startups': args.startups, 'readers': args.readers, 'attackers': args.attackers,
+                  'attack_rate': args.attack_rate, 'attacker_ips': args.attacker_ips, 'duration_s': args.duration, 'seed': args.seed}
+        save_results(args.output, 'admission', config, results)
+        print(f"Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
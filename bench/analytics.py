@@ -0,0 +1,111 @@
+# backend/bench/analytics.py
+"""
+Industry analytics from the NumPy column cache against computing them per request. On a
+cached dataset, reports:
+
+    build     the full build: one read of the startups table plus the vectorized metrics
+    update    update_financial_analytics() for one startup, as after a financials PUT
+    route     GET /api/analytics/industry/<industry>, each industry in turn
+    detail    GET /api/startups/<id> with the response cache off (includes the benchmark)
+    per_request  the same statistics for one industry computed the straightforward way:
+              its startups' financial_records rows read and reduced in Python
+
+    python -m bench.analytics --startups 100000 --requests 200
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+import app as backend
+from bench import dataset
+from bench.stats import latency_summary, save_results
+from financial_analytics import PERCENTILES
+
+
+def per_request_stats(db, industry):
+    """Revenue CAGR and latest revenue percentiles for one industry from financial_records, in Python."""
+    rows = db.execute("""
+        SELECT r.startup_id, r.year, r.revenue FROM startups s JOIN financial_records r ON r.startup_id = s.id
+        WHERE s.industry = ? ORDER BY r.startup_id, r.year
+    """, (industry,)).fetchall()
+    series = {}
+    for row in rows:
+        series.setdefault(row['startup_id'], []).append((row['year'], row['revenue']))
+    latest, growth = [], []
+    for records in series.values():
+        (first_year, first_revenue), (last_year, last_revenue) = records[0], records[-1]
+        if last_revenue is not None:
+            latest.append(last_revenue)
+        if last_year > first_year and (first_revenue or 0) > 0 and (last_revenue or 0) > 0:
+            growth.append((last_revenue / first_revenue) ** (1 / (last_year - first_year)) - 1)
+    stats = {}
+    for name, values in (('revenue', latest), ('revenue_cagr', growth)):
+        if len(values) > 1:
+            quantiles = statistics.quantiles(values, n=100)
+            stats[name] = [quantiles[percentile - 1] for percentile in PERCENTILES]
+    return stats
+
+
+def timed(call, count):
+    timings = []
+    for i in range(count):
+        started = time.perf_counter()
+        call(i)
+        timings.append((time.perf_counter() - started) * 1000)
+    return latency_summary(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--startups', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=dataset.DEFAULT_DATA_DIR)
+    parser.add_argument('--output', help='Write results as JSON to this path.')
+    args = parser.parse_args()
+
+    path = dataset.ensure_dataset(args.startups, args.seed, args.data_dir)
+    backend.create_app({'DATABASE': path})
+    backend.response_cache.max_entries = 0 # Detail bodies are built on every request
+    industries = [name for name in dataset.INDUSTRIES if name]
+    rng = random.Random(args.seed)
+    client = backend.app.test_client()
+    results = {}
+    try:
+        builds = []
+        for _ in range(3):
+            backend._financial_analytics.pop(path, None) # The next call builds from scratch
+            started = time.perf_counter()
+            backend.get_financial_analytics()
+            builds.append(time.perf_counter() - started)
+        analytics = backend.get_financial_analytics()
+        results['build_s'] = round(min(builds), 3)
+        results['build_vectorized_s'] = round(analytics.build_seconds, 3)
+        results['records'] = analytics.stats()['records']
+        with backend.app.app_context():
+            db = backend.get_db()
+            results['update'] = timed(lambda i: backend.update_financial_analytics(db, [rng.randint(1, args.startups)]), args.requests)
+            results['route'] = timed(lambda i: client.get(f"/api/analytics/industry/{industries[i % len(industries)]}").close(),
+                                     args.requests)
+            results['detail'] = timed(lambda i: client.get(f"/api/startups/{rng.randint(1, args.startups)}").close(), args.requests)
+            results['per_request'] = timed(lambda i: per_request_stats(db, industries[i % len(industries)]),
+                                           max(1, args.requests // 20))
+    finally:
+        backend.close_db_pool(path)
+
+    print(f"{args.startups} startups, {results['records']} financial records")
+    print(f"build        {results['build_s']:.3f} s (vectorized part {results['build_vectorized_s']:.3f} s)")
+    for name in ('update', 'route', 'detail', 'per_request'):
+        print(f"{name:<12} p50 {results[name]['p50_ms']:8.2f} ms  p99 {results[name]['p99_ms']:8.2f} ms")
+    if args.output:
+        config = {'startups': args.startups, 'requests': args.requests, 'seed': args.seed, 'numpy': np.__version__}
+        save_results(args.output, 'analytics', config, results)
+        print(f"Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
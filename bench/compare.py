@@ -0,0 +1,88 @@
+# backend/bench/compare.py
+"""
+Compares two benchmark result files from the same benchmark (e.g. before and after a change).
+
+    python -m bench.compare bench/results/routes-before.json bench/results/routes-after.json --threshold 10
+
+Every numeric result is matched by its path. Latencies (*_ms, *_ns, ns_per_call) and sizes
+(*_mb, *_bytes, *_bytes_per_startup) are better when lower; throughput (*_per_s) is better
+when higher; other numbers are shown without a verdict. Exits with status 1 if any directional metric regressed by more than
+--threshold percent.
+"""
+
+import argparse
+import sys
+
+from bench.stats import load_results
+
+LOWER_IS_BETTER = ('_ms', '_mb', 'ns_per_call', '_ns', '_ns_per_startup', '_bytes', '_bytes_per_startup', 'peak', 'before_load', 'after_load')
+HIGHER_IS_BETTER = ('_per_s',)
+
+
+def flatten(value, prefix=''):
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def direction(path):
+    leaf = path.rsplit('.', 1)[-1]
+    if leaf.endswith(HIGHER_IS_BETTER):
+        return 1
+    if leaf.endswith(LOWER_IS_BETTER) or path.startswith('rss_mb.'):
+        return -1
+    return 0
+
+
+def compare(baseline, candidate, threshold):
+    """Returns rows of (path, before, after, change %, verdict) and whether anything regressed."""
+    before, after = flatten(baseline['results']), flatten(candidate['results'])
+    rows, regressed = [], False
+    for path in sorted(before.keys() | after.keys()):
+        old, new = before.get(path), after.get(path)
+        if old is None or new is None:
+            rows.append((path, old, new, None, 'added' if old is None else 'removed'))
+            continue
+        change = (new - old) / abs(old) * 100 if old else (0.0 if new == old else None)
+        sign = direction(path)
+        verdict = ''
+        if sign and change is not None:
+            improvement = change * sign
+            if improvement < -threshold:
+                verdict, regressed = 'REGRESSED', True
+            elif improvement > threshold:
+                verdict = 'improved'
+        rows.append((path, old, new, change, verdict))
+    return rows, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Percent change treated as noise.')
+    args = parser.parse_args()
+
+    baseline, candidate = load_results(args.baseline), load_results(args.candidate)
+    if baseline['benchmark'] != candidate['benchmark']:
+        sys.exit(f"Cannot compare a '{baseline['benchmark']}' result with a '{candidate['benchmark']}' result")
+    if baseline['config'] != candidate['config']:
+        print(f"WARNING: configs differ\n  baseline:  {baseline['config']}\n  candidate: {candidate['config']}")
+    print(f"baseline  {baseline['environment'].get('git_commit')} {baseline['recorded_at']}")
+    print(f"candidate {candidate['environment'].get('git_commit')} {candidate['recorded_at']}")
+
+    rows, regressed = compare(baseline, candidate, args.threshold)
+    width = max((len(row[0]) for row in rows), default=10)
+    for path, old, new, change, verdict in rows:
+        change_text = f"{change:+8.1f}%" if change is not None else ' ' * 9
+        print(f"{path:<{width}}  {old if old is not None else '-':>12}  {new if new is not None else '-':>12}  {change_text}  {verdict}")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+# backend/bench/dataset.py
+"""
+Synthetic, fully migrated databases for the benchmarks: startup users with one startup each,
+0-5 years of financial records per startup, investors, and investor interest rows with a
+skewed popularity (a few startups attract most of the interest). Datasets of up to
+RECOMMENDATIONS_MAX_STARTUPS startups also get a built recommendation index.
+
+    python -m bench.dataset --startups 100000
+
+Databases are cached in --data-dir under a name that includes the size, seed and schema
+version, so every benchmark run at the same size starts from identical data. Every user's
+password is BENCH_PASSWORD.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+
+import app as backend
+from financial_pack import pack_financials
+
+BENCH_PASSWORD = 'bench-password'
+SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+BATCH = 20000
+RECOMMENDATIONS_MAX_STARTUPS = 100000 # The full build is O(n^2); larger datasets serve popular fallbacks
+
+WORDS = ("solar wind battery grid farm agri drone robot cloud data ledger payments lending insurance "
+         "health clinic genomics biotech fitness food delivery kitchen grocery logistics freight fleet "
+         "travel hotel housing rental school tutor learning language music video gaming studio fashion "
+         "retail marketplace analytics security identity privacy water recycling carbon mining space").split()
+INDUSTRIES = ["Energy", "Fintech", "Healthcare", "Education", "Logistics", "Retail", "Media", "AgriTech", "SaaS", None]
+
+
+def schema_version():
+    return max(version for version, _, _ in backend.MIGRATIONS)
+
+
+def dataset_path(startups, seed=0, data_dir=DEFAULT_DATA_DIR):
+    return os.path.join(data_dir, f"startups-{startups}-seed{seed}-schema{schema_version()}.db")
+
+
+def investor_count(startups):
+    return max(50, startups // 10)
+
+
+def ensure_dataset(startups, seed=0, data_dir=DEFAULT_DATA_DIR, log=print):
+    """Returns the path of the cached dataset for this size, building it first if needed."""
+    path = dataset_path(startups, seed, data_dir)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        partial = path + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        started = time.perf_counter()
+        build_dataset(partial, startups, seed, log=log)
+        os.replace(partial, path)
+        log(f"Built {path} in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def _bench_password_hash():
+    # One real scrypt hash shared by every user, so logins exercise the KDF with production settings
+    hasher = backend.PasswordHasher(workers=0, n=backend.app.config['SCRYPT_N'],
+                                    r=backend.app.config['SCRYPT_R'], p=backend.app.config['SCRYPT_P'])
+    return hasher.hash(BENCH_PASSWORD)
+
+
+def build_dataset(path, startups, seed=0, log=print):
+    rng = random.Random(seed)
+    backend.app.config['DATABASE'] = path
+    with backend.app.app_context():
+        backend.migrate(backend.get_db())
+    backend.close_db_pool(path)
+
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode = WAL")
+    db.execute("PRAGMA synchronous = OFF") # A half-built file is discarded anyway
+
+    # Bulk load with the startups triggers dropped, then rebuild what they maintain in one pass
+    triggers = db.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'startups'").fetchall()
+    for trigger in triggers:
+        db.execute(f"DROP TRIGGER {trigger['name']}")
+
+    password_hash = _bench_password_hash()
+    investors = investor_count(startups)
+    db.execute("BEGIN")
+    db.executemany("INSERT INTO users (id, email, password_hash, user_type, name) VALUES (?, ?, ?, 'investor', ?)",
+                   ((i, f"investor{i}@bench.example", password_hash, f"Investor {i}") for i in range(1, investors + 1)))
+
+    started = time.perf_counter()
+    for first in range(1, startups + 1, BATCH):
+        ids = range(first, min(first + BATCH, startups + 1))
+        users, rows, records = [], [], []
+        for startup_id in ids:
+            user_id = investors + startup_id
+            users.append((user_id, f"founder{startup_id}@bench.example", password_hash, f"Founder {startup_id}"))
+            goal = rng.choice([0, 25000, 100000, 250000, 500000, 1000000, 2500000, 10000000])
+            startup = {
+                'id': startup_id, 'funding_goal': goal,
+                'funding_acquired': round(goal * rng.random() * rng.choice([0.2, 0.6, 1.0])),
+                'years_operating': rng.randint(0, 12),
+                'equity_offered': rng.choice([0, 5, 10, 15, 20, 25]),
+                'financial_history': [],
+            }
+            first_year = rng.randint(2018, 2024)
+            for year in range(first_year, min(first_year + rng.randint(0, 5), 2025)):
+                revenue = round(rng.lognormvariate(11, 2), 2)
+                startup['financial_history'].append({'year': year, 'revenue': revenue,
+                                                     'profit': round(revenue * rng.uniform(-0.6, 0.3), 2)})
+            risk = backend.calculate_risk(startup)
+            name = f"{rng.choice(WORDS).title()}{rng.choice(WORDS)} {startup_id}"
+            description = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(12, 40)))
+            created_at = f"2024-{1 + startup_id % 12:02d}-{1 + startup_id % 28:02d} {startup_id % 24:02d}:{startup_id % 60:02d}:00"
+            rows.append((startup_id, user_id, name, description, rng.choice(INDUSTRIES), goal, startup['funding_acquired'],
+                         startup['years_operating'], f"https://{name.split()[0].lower()}.example", '', '+1 555 0100',
+                         startup['equity_offered'], created_at, risk['score'], risk['category'], json.dumps(risk['reasons']),
+                         backend.calculate_valuation(startup), pack_financials(startup['financial_history'])))
+            records.extend((startup_id, item['year'], item['revenue'], item['profit']) for item in startup['financial_history'])
+        db.executemany("INSERT INTO users (id, email, password_hash, user_type, name) VALUES (?, ?, ?, 'startup', ?)", users)
+        db.executemany("""
+            INSERT INTO startups (id, user_id, company_name, description, industry, funding_goal, funding_acquired,
+                                  years_operating, website, logo_url, contact_phone, equity_offered, created_at,
+                                  risk_score, risk_category, risk_reasons, calculated_valuation, financial_packed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        db.executemany("INSERT INTO financial_records (startup_id, year, revenue, profit) VALUES (?, ?, ?, ?)", records)
+        done = ids[-1]
+        log(f"  {done}/{startups} startups ({done / max(time.perf_counter() - started, 1e-9):,.0f}/s)")
+
+    # Interest: about three rows per startup, popularity skewed towards low ids
+    interest = set()
+    for _ in range(startups * 3):
+        startup_id = min(startups, int(rng.paretovariate(1.2))) if rng.random() < 0.3 else rng.randint(1, startups)
+        interest.add((rng.randint(1, investors), startup_id))
+    db.executemany("INSERT INTO investor_interest (investor_user_id, startup_id, expressed_at) VALUES (?, ?, ?)",
+                   ((investor_id, startup_id, f"2024-06-{1 + (investor_id + startup_id) % 28:02d} 12:00:00")
+                    for investor_id, startup_id in sorted(interest)))
+
+    for trigger in triggers:
+        db.execute(trigger['sql'])
+    db.execute("INSERT INTO startups_fts (startups_fts) VALUES ('rebuild')")
+    db.execute("DELETE FROM startup_facets")
+    db.execute(backend.FACETS_REBUILD_SQL)
+    db.commit()
+    if startups <= RECOMMENDATIONS_MAX_STARTUPS:
+        backend.rebuild_recommendations(db, log=lambda message: log(f"  {message}"))
+    else:
+        log(f"  Skipped the recommendation index (over {RECOMMENDATIONS_MAX_STARTUPS} startups)")
+    db.execute("PRAGMA wal_checkpoint(TRUNCATE)") # No ANALYZE: production databases don't have statistics either
+    db.close()
+    log(f"  {investors} investors, {len(interest)} interest rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--startups', type=int, action='append', help=f"Size(s) to build (default: {SIZES}).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+    for startups in args.startups or SIZES:
+        print(ensure_dataset(startups, args.seed, args.data_dir))
+
+
+if __name__ == '__main__':
+    main()
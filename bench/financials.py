@@ -0,0 +1,186 @@
+# backend/bench/financials.py
+"""
+Financial history formats compared on the same startups: the legacy JSON text
+(startups.financial_history before migration 5), financial_records rows, and the packed
+BLOB in startups.financial_packed.
+
+    python -m bench.financials --startups 100000 --samples 20000 --output bench/results/financials.json
+
+For each format it reports the stored bytes, the time to decode one startup's history and
+to get only its latest year (all risk scoring needs), and the Python memory held by the
+decoded histories. Two database reads are timed the way the app does them, before and
+after the packed column: a detail view (startup row, then its records vs. the row alone)
+and a rescoring pass over every startup (latest-year join vs. decoding the last record).
+The app uses the packed column only where it measured faster: detail views.
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import time
+import tracemalloc
+
+import app as backend
+from bench import dataset
+from bench.stats import save_results
+from financial_pack import last_financial_record, unpack_financials
+
+
+def legacy_json_decode(text):
+    """The pre-migration-5 read path: decode the JSON column, then sort by year."""
+    history = backend.load_financial_history(text)
+    history.sort(key=lambda item: item['year'])
+    return history
+
+
+def legacy_json_last(text):
+    history = legacy_json_decode(text)
+    return history[-1] if history else None
+
+
+# RISK_INPUTS_SQL with the latest year decoded from financial_packed instead of joined
+PACKED_RISK_INPUTS_SQL = """
+    SELECT id, funding_goal, funding_acquired, years_operating, equity_offered,
+           risk_score, risk_category, risk_reasons, calculated_valuation, financial_packed
+    FROM startups
+    WHERE id > ?
+    ORDER BY id
+    LIMIT ?
+"""
+RESCORE_CHUNK = 5000
+
+
+def rescore_pass_ns(db, read_chunk, total, repeat):
+    """Best-of-repeat ns per startup to read every startup's risk inputs in rescore-all sized chunks."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        last_id = 0
+        while True:
+            rows = read_chunk(last_id)
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+        elapsed = time.perf_counter_ns() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best / total, 1)
+
+
+def time_per_call(function, inputs, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for value in inputs:
+            function(value)
+        elapsed = time.perf_counter_ns() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best / len(inputs), 1)
+
+
+def retained_bytes(function, inputs):
+    """Bytes still allocated after decoding every input and keeping the results, per input."""
+    tracemalloc.start()
+    try:
+        kept = [function(value) for value in inputs]
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return {'retained_bytes_per_startup': round(current / len(inputs), 1), 'peak_bytes_per_startup': round(peak / len(inputs), 1)}
+
+
+def run(path, samples, repeat, seed):
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    total = db.execute("SELECT MAX(id) FROM startups").fetchone()[0]
+    ids = random.Random(seed).sample(range(1, total + 1), min(samples, total))
+    packed = [db.execute("SELECT financial_packed FROM startups WHERE id = ?", (startup_id,)).fetchone()[0] for startup_id in ids]
+    histories = [[{'year': year, 'revenue': revenue, 'profit': profit} for year, revenue, profit in db.execute(
+        "SELECT year, revenue, profit FROM financial_records WHERE startup_id = ? ORDER BY year", (startup_id,))]
+        for startup_id in ids]
+    # The legacy column as the old write path stored it: json.dumps of the submitted, unsorted list
+    legacy = [json.dumps(list(reversed(history))) for history in histories]
+    assert all(unpack_financials(blob) == history for blob, history in zip(packed, histories))
+
+    db.row_factory = sqlite3.Row
+
+    def detail_with_records(startup_id):
+        startup = dict(db.execute("SELECT * FROM startups WHERE id = ?", (startup_id,)).fetchone())
+        startup.pop('financial_packed')
+        startup['financial_history'] = [dict(row) for row in db.execute(
+            "SELECT year, revenue, profit FROM financial_records WHERE startup_id = ? ORDER BY year", (startup_id,))]
+        return startup
+
+    def detail_with_packed(startup_id):
+        startup = dict(db.execute("SELECT * FROM startups WHERE id = ?", (startup_id,)).fetchone())
+        startup['financial_history'] = unpack_financials(startup.pop('financial_packed'))
+        return startup
+
+    def risk_inputs_with_records(last_id):
+        return db.execute(backend.RISK_INPUTS_SQL, (last_id, RESCORE_CHUNK)).fetchall()
+
+    def risk_inputs_with_packed(last_id):
+        # The dict rows score_risk_rows would need, with last_year/last_revenue/last_profit from the blob
+        risk_rows = []
+        for row in db.execute(PACKED_RISK_INPUTS_SQL, (last_id, RESCORE_CHUNK)):
+            row_dict = dict(row)
+            last = last_financial_record(row_dict.pop('financial_packed')) or {'year': None, 'revenue': None, 'profit': None}
+            row_dict.update(last_year=last['year'], last_revenue=last['revenue'], last_profit=last['profit'])
+            risk_rows.append(row_dict)
+        return risk_rows
+
+    records = sum(len(history) for history in histories)
+    results = {
+        'records_per_startup': round(records / len(ids), 2),
+        'json': {
+            'stored_bytes_per_startup': round(sum(len(text.encode('utf-8')) for text in legacy) / len(ids), 1),
+            'decode_ns': time_per_call(legacy_json_decode, legacy, repeat),
+            'last_year_ns': time_per_call(legacy_json_last, legacy, repeat),
+            **retained_bytes(legacy_json_decode, legacy),
+        },
+        'records': {
+            'detail_read_ns': time_per_call(detail_with_records, ids, repeat),
+            'rescore_read_ns_per_startup': rescore_pass_ns(db, risk_inputs_with_records, total, repeat),
+        },
+        'packed': {
+            'stored_bytes_per_startup': round(sum(len(blob) for blob in packed) / len(ids), 1),
+            'decode_ns': time_per_call(unpack_financials, packed, repeat),
+            'last_year_ns': time_per_call(last_financial_record, packed, repeat),
+            'detail_read_ns': time_per_call(detail_with_packed, ids, repeat),
+            'rescore_read_ns_per_startup': rescore_pass_ns(db, risk_inputs_with_packed, total, repeat),
+            **retained_bytes(unpack_financials, packed),
+        },
+    }
+    db.row_factory = None
+    try: # dbstat is an optional SQLite build feature
+        table_bytes = db.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'financial_records'").fetchone()[0]
+        results['records']['stored_bytes_per_startup'] = round(table_bytes / total, 1)
+    except sqlite3.OperationalError:
+        pass
+    db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--startups', type=int, default=100000, help='Dataset size to sample from.')
+    parser.add_argument('--samples', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=dataset.DEFAULT_DATA_DIR)
+    parser.add_argument('--output', help='Write results as JSON to this path.')
+    args = parser.parse_args()
+
+    path = dataset.ensure_dataset(args.startups, args.seed, args.data_dir)
+    results = run(path, args.samples, args.repeat, args.seed)
+    print(f"{results['records_per_startup']} records per startup on average")
+    for fmt in ('json', 'records', 'packed'):
+        print(f"{fmt:<8}" + '  '.join(f"{key} {value:,}" for key, value in results[fmt].items()))
+    if args.output:
+        config = {'startups': args.startups, 'samples': args.samples, 'repeat': args.repeat, 'seed': args.seed}
+        save_results(args.output, 'financials', config, results)
+        print(f"Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
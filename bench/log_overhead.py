@@ -0,0 +1,141 @@
+# backend/bench/log_overhead.py
+"""
+What logging costs the catalog routes. A scratch copy of a cached dataset gets --bad-share
+of its startups made malformed the way rows written by an external tool can be: no packed
+financials, no precomputed risk, and a non-numeric latest revenue and profit, so every
+detail read of one of them recalculates risk and logs warnings. Client threads then read
+the listing and detail routes, with the response cache off, once per logging setup:
+
+    off          logging.disable(): the floor
+    inline-text  LEVEL:logger:message lines written on the request thread, nothing sampled
+    queue-json   JSON lines written by the log writer thread, nothing sampled
+    queue-json-sampled  the defaults: as above, repeated warnings per startup sampled
+
+    python -m bench.log_overhead --startups 10000 --clients 4 --duration 10
+
+Log lines go to a scratch file. Reports requests/s, latency, and log bytes written per mode.
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+import app as backend
+from bench import dataset
+from bench.stats import latency_summary, save_results
+
+MODES = {
+    'off': None,
+    'inline-text': {'LOG_FORMAT': 'text', 'LOG_QUEUE_SIZE': 0, 'LOG_SAMPLE_SECONDS': 0},
+    'queue-json': {'LOG_FORMAT': 'json', 'LOG_QUEUE_SIZE': 10000, 'LOG_SAMPLE_SECONDS': 0},
+    'queue-json-sampled': {'LOG_FORMAT': 'json', 'LOG_QUEUE_SIZE': 10000, 'LOG_SAMPLE_SECONDS': 60.0},
+}
+
+
+def make_malformed(path, size, bad_share, seed):
+    """Strips derived data from bad_share of the startups and garbles their latest financial year; returns their ids."""
+    bad_ids = sorted(random.Random(seed).sample(range(1, size + 1), int(size * bad_share)))
+    with backend.app.app_context():
+        db = backend.get_db()
+        db.executemany("UPDATE startups SET financial_packed = NULL, risk_category = NULL WHERE id = ?",
+                       [(startup_id,) for startup_id in bad_ids])
+        db.executemany("""
+            INSERT OR REPLACE INTO financial_records (startup_id, year, revenue, profit) VALUES (?, 2099, 'n/a', 'unknown')
+        """, [(startup_id,) for startup_id in bad_ids])
+        db.commit()
+    return bad_ids
+
+
+def run_load(size, bad_ids, clients, duration, seed):
+    stop_at = time.perf_counter() + duration
+    timings = []
+    record = threading.Lock()
+
+    def client(index):
+        rng = random.Random(seed * 1000 + index)
+        test_client = backend.app.test_client()
+        own = []
+        while time.perf_counter() < stop_at:
+            roll = rng.random()
+            if roll < 0.4:
+                path = '/api/startups?limit=24'
+            elif roll < 0.7:
+                path = f"/api/startups/{rng.choice(bad_ids)}"
+            else:
+                path = f"/api/startups/{rng.randint(1, size)}"
+            started = time.perf_counter()
+            test_client.get(path).close()
+            own.append((time.perf_counter() - started) * 1000)
+        with record:
+            timings.extend(own)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {**latency_summary(timings), 'throughput_per_s': round(len(timings) / elapsed, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--startups', type=int, default=10000)
+    parser.add_argument('--bad-share', type=float, default=0.1, help='Share of startups with malformed financials.')
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=dataset.DEFAULT_DATA_DIR)
+    parser.add_argument('--output', help='Write results as JSON to this path.')
+    args = parser.parse_args()
+
+    source = dataset.ensure_dataset(args.startups, args.seed, args.data_dir)
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        path = os.path.join(scratch_dir, 'bench_logging.db')
+        shutil.copy(source, path)
+        backend.create_app({'DATABASE': path, 'RATE_LIMIT_ENABLED': False})
+        backend.response_cache.max_entries = 0 # Every request builds its body
+        bad_ids = make_malformed(path, args.startups, args.bad_share, args.seed)
+        log_path = os.path.join(scratch_dir, 'app.log')
+        try:
+            with open(log_path, 'a') as log_file:
+                for mode in args.modes.split(','):
+                    overrides = MODES[mode]
+                    if overrides is None:
+                        logging.disable(logging.CRITICAL)
+                    else:
+                        backend.app.config.update(overrides)
+                        backend.configure_logging(log_file)
+                    written_before = os.path.getsize(log_path)
+                    results[mode] = run_load(args.startups, bad_ids, args.clients, args.duration, args.seed)
+                    stats = backend.logging_stats()
+                    backend.flush_logging()
+                    logging.disable(logging.NOTSET)
+                    log_file.flush()
+                    results[mode].update(log_bytes=os.path.getsize(log_path) - written_before,
+                                         dropped=stats.get('dropped', 0), suppressed=stats.get('sampled_suppressed', 0))
+        finally:
+            backend.close_db_pool(path)
+            backend.configure_logging() # Back to stderr
+
+    print(f"{args.startups} startups ({len(bad_ids)} malformed), {args.clients} clients, {args.duration:.0f}s per mode")
+    for mode, result in results.items():
+        print(f"{mode:<20} {result['throughput_per_s']:8.1f} req/s  p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+              f"log {result['log_bytes'] / 1e6:7.2f} MB  dropped {result['dropped']}  suppressed {result['suppressed']}")
+    if args.output:
+        config = {'startups': args.startups, 'bad_share': args.bad_share, 'clients': args.clients,
+                  'duration_s': args.duration, 'seed': args.seed}
+        save_results(args.output, 'log_overhead', config, results)
+        print(f"Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
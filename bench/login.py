@@ -0,0 +1,93 @@
+# backend/bench/login.py
+"""
+Login throughput against the size of the scrypt hashing pool. Each run registers a set of
+users in a scratch database, then fires concurrent /api/login requests from client threads
+and reports logins/s, latency percentiles and how many requests were shed with 503.
+
+    python -m bench.login --workers 0,1,2,4 --clients 16 --logins 400
+
+--workers 0 hashes inline on the request threads, for comparison.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import app as backend
+
+
+def run(workers, clients, logins, users, max_pending):
+    backend.app.config['PASSWORD_HASH_WORKERS'] = workers
+    backend.app.config['PASSWORD_HASH_MAX_PENDING'] = max_pending
+    backend.app.config['RATE_LIMIT_ENABLED'] = False # Measures hashing throughput, and every client is 127.0.0.1
+    backend._password_hasher = None # Rebuilt from the config above on first use
+    hasher = backend.get_password_hasher()
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        backend.app.config['DATABASE'] = os.path.join(scratch_dir, 'bench_login.db')
+        try:
+            with backend.app.app_context():
+                backend.migrate(backend.get_db())
+            client = backend.app.test_client()
+            for i in range(users):
+                client.post('/api/register', json={'email': f'user{i}@example.com', 'password': f'pw{i}',
+                                                   'name': f'User {i}', 'user_type': 'investor'})
+            client.post('/api/login', json={'email': 'user0@example.com', 'password': 'pw0'}) # Warm up the workers
+
+            timings, statuses = [], []
+            record = threading.Lock()
+            next_login = iter(range(logins))
+
+            def client_thread():
+                thread_client = backend.app.test_client()
+                while True:
+                    with record:
+                        i = next(next_login, None)
+                    if i is None:
+                        return
+                    started = time.perf_counter()
+                    response = thread_client.post('/api/login', json={'email': f'user{i % users}@example.com',
+                                                                      'password': f'pw{i % users}'})
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with record:
+                        timings.append(elapsed)
+                        statuses.append(response.status_code)
+
+            threads = [threading.Thread(target=client_thread) for _ in range(clients)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.perf_counter() - started
+        finally:
+            hasher.shutdown()
+            backend.close_db_pool(backend.app.config['DATABASE'])
+
+    ok = [t for t, status in zip(timings, statuses) if status == 200]
+    ordered = sorted(ok) or [0.0]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"workers {workers:>2}: {len(ok) / wall:8.1f} logins/s   p50 {statistics.median(ordered):8.1f} ms   "
+          f"p95 {p95:8.1f} ms   503s {statuses.count(503):>4}   other errors {len(statuses) - len(ok) - statuses.count(503)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default=f"0,1,2,{os.cpu_count() or 1}", help='Comma separated pool sizes to compare.')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent client threads.')
+    parser.add_argument('--logins', type=int, default=400)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--max-pending', type=int, default=backend.app.config['PASSWORD_HASH_MAX_PENDING'])
+    args = parser.parse_args()
+
+    print(f"scrypt n={backend.app.config['SCRYPT_N']} r={backend.app.config['SCRYPT_R']} p={backend.app.config['SCRYPT_P']}, "
+          f"{args.clients} clients, {args.logins} logins, {os.cpu_count()} CPUs")
+    for workers in sorted({int(w) for w in args.workers.split(',')}):
+        run(workers, args.clients, args.logins, args.users, args.max_pending)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# backend/bench/micro.py
+"""
+Micro-benchmarks of the per-request CPU paths: risk and valuation scoring, the JSON
+decoding done on reads (stored risk reasons, financial history, cursors, detail payloads),
+and response encoding (the standard library vs. the app's JSON provider, gzip).
+
+    python -m bench.micro --startups 10000 --output bench/results/micro.json
+
+Inputs are sampled from the synthetic dataset of that size, so the mix of empty and long
+financial histories matches the load benchmark. Each function runs over the whole sample
+--repeat times; the best repeat is reported as ns per call.
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import time
+
+import app as backend
+from bench import dataset
+from bench.stats import save_results
+from response_encoding import compress
+
+
+def load_samples(path, count, seed):
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    db.row_factory = sqlite3.Row
+    total = db.execute("SELECT MAX(id) FROM startups").fetchone()[0]
+    ids = random.Random(seed).sample(range(1, total + 1), min(count, total))
+    startups = []
+    for startup_id in ids:
+        startup = dict(db.execute("""
+            SELECT s.*, u.name AS founder_name, u.email AS founder_email
+            FROM startups s JOIN users u ON s.user_id = u.id WHERE s.id = ?
+        """, (startup_id,)).fetchone())
+        del startup['financial_packed'] # Never part of a response
+        startup['financial_history'] = [dict(row) for row in db.execute(
+            "SELECT year, revenue, profit FROM financial_records WHERE startup_id = ? ORDER BY year", (startup_id,))]
+        startups.append(startup)
+    db.close()
+    return startups
+
+
+def detail_payload(startup):
+    payload = {key: value for key, value in startup.items() if key not in ('risk_score', 'risk_category', 'risk_reasons', 'user_id')}
+    payload['risk_analysis'] = backend.stored_risk_analysis(startup)
+    payload['investor_has_expressed_interest'] = False
+    return payload
+
+
+def time_per_call(function, inputs, repeat):
+    """Best-of-repeat ns per call of function over every input."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for value in inputs:
+            function(value)
+        elapsed = time.perf_counter_ns() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(inputs)
+
+
+def run(startups, repeat):
+    histories = [json.dumps(startup['financial_history']) for startup in startups]
+    cursors = [backend.encode_cursor(startup['created_at'], startup['id']) for startup in startups]
+    payloads = [json.dumps(detail_payload(startup)) for startup in startups]
+    decoded_payloads = [json.loads(payload) for payload in payloads]
+    encoded_payloads = [backend.app.json.dumps_bytes(payload) for payload in decoded_payloads]
+    cases = {
+        'calculate_risk': (backend.calculate_risk, startups),
+        'calculate_valuation': (backend.calculate_valuation, startups),
+        'stored_risk_analysis': (backend.stored_risk_analysis, startups),
+        'load_financial_history': (backend.load_financial_history, histories),
+        'decode_cursor': (backend.decode_cursor, cursors),
+        'json_decode_detail_payload': (json.loads, payloads),
+        'json_encode_detail_payload': (json.dumps, decoded_payloads),
+        'provider_encode_detail_payload': (backend.app.json.dumps_bytes, decoded_payloads), # orjson when installed
+        'gzip_detail_payload': (lambda body: compress(body, 'gzip', backend.app.config['COMPRESS_LEVEL']), encoded_payloads),
+    }
+    return {name: {'ns_per_call': round(time_per_call(function, inputs, repeat), 1), 'calls': len(inputs)}
+            for name, (function, inputs) in cases.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--startups', type=int, default=10000, help='Dataset size to sample inputs from.')
+    parser.add_argument('--samples', type=int, default=2000, help='Startups sampled as inputs.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=dataset.DEFAULT_DATA_DIR)
+    parser.add_argument('--output', help='Write results as JSON to this path.')
+    args = parser.parse_args()
+
+    path = dataset.ensure_dataset(args.startups, args.seed, args.data_dir)
+    results = run(load_samples(path, args.samples, args.seed), args.repeat)
+    for name, result in results.items():
+        print(f"{name:<30}{result['ns_per_call']:>12,.0f} ns/call")
+    if args.output:
+        config = {'startups': args.startups, 'samples': args.samples, 'repeat': args.repeat, 'seed': args.seed}
+        save_results(args.output, 'micro', config, results)
+        print(f"Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+# backend/bench/routes.py
+"""
+Concurrent load over every API route on a synthetic dataset.
+
+    python -m bench.routes --startups 10000 --clients 8 --duration 20 --output bench/results/routes-10k.json
+    python -m bench.routes --startups 100000 --server wsgi --read-only
+
+Each client thread logs in as its own investor or founder and then issues requests back to
+back, picking scenarios by weight. --server client drives the app in-process through Flask's
+test client; --server wsgi starts a threaded local WSGI server and talks HTTP to it;
+--server workers starts --workers server processes through create_app() (sharing one
+SECRET_KEY, like gunicorn workers) and spreads the clients over them round-robin. Write
+scenarios run against a scratch copy of the cached dataset, so every run starts from the
+same data; --read-only skips them and serves the cached file directly. --anonymous-clients
+adds clients that never log in and only run the read scenarios open to anyone, which is the
+traffic --read-snapshot (READ_SNAPSHOT_ENABLED) serves from the in-memory copy.
+
+Reports per-scenario and overall p50/p95/p99 latency and throughput, plus RSS, and saves
+them as JSON for `python -m bench.compare`. RSS includes database pages read through the
+connections' mmap (DB_PRAGMAS), so scans such as the exports raise the peak by roughly the
+size of the tables they touch. With --server workers it is this process only, not the servers.
+"""
+
+import argparse
+import itertools
+import http.client
+import http.cookies
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import app as backend
+from bench import dataset
+from bench.stats import current_rss_mb, latency_summary, peak_rss_mb, save_results
+
+
+class Scenario:
+    """One kind of request: path/json are built per call from a random generator and the dataset size."""
+
+    def __init__(self, name, endpoint, method, path, weight, role=None, json_body=None, write=False, bulk=False):
+        self.name = name
+        self.endpoint = endpoint
+        self.method = method
+        self.path = path
+        self.weight = weight
+        self.role = role # 'investor' or 'startup' clients only; None for anyone
+        self.json_body = json_body
+        self.write = write
+        self.bulk = bulk # Long streaming responses: reported, but kept out of the overall latency figures
+
+
+def _random_startup(rng, size):
+    # Mostly the popular head, like real traffic, with a uniform tail
+    return min(size, int(rng.paretovariate(1.1))) if rng.random() < 0.5 else rng.randint(1, size)
+
+
+def _financials(rng):
+    first_year = rng.randint(2019, 2023)
+    return [{'year': year, 'revenue': rng.randint(0, 500000), 'profit': rng.randint(-50000, 50000)}
+            for year in range(first_year, first_year + rng.randint(1, 4))]
+
+
+SCENARIOS = [
+    Scenario('list', 'get_startups', 'GET', lambda rng, size: '/api/startups?limit=24', 20),
+    Scenario('list_risk_filter', 'get_startups', 'GET',
+             lambda rng, size: f"/api/startups?limit=24&risk={rng.choice(['low', 'average', 'high'])}", 10),
+    Scenario('list_popular', 'get_startups', 'GET', lambda rng, size: '/api/startups?limit=24&sort=popular', 5),
+    Scenario('detail', 'get_startup_details', 'GET', lambda rng, size: f"/api/startups/{_random_startup(rng, size)}", 25),
+    Scenario('detail_batch', 'get_startup_details_batch', 'GET',
+             lambda rng, size: f"/api/startups/batch?ids={','.join(str(_random_startup(rng, size)) for _ in range(20))}", 5),
+    Scenario('facets', 'get_startup_facets', 'GET', lambda rng, size: '/api/startups/facets', 5),
+    Scenario('search', 'search_startups', 'GET',
+             lambda rng, size: f"/api/startups/search?q={rng.choice(dataset.WORDS)}+{rng.choice(dataset.WORDS)[:3]}", 10),
+    Scenario('auth_status', 'auth_status', 'GET', lambda rng, size: '/api/auth/status', 5),
+    Scenario('analytics', 'get_my_startup_analytics', 'GET', lambda rng, size: '/api/my-startup/analytics', 5, role='startup'),
+    Scenario('my_startup', 'manage_my_startup', 'GET', lambda rng, size: '/api/my-startup', 5, role='startup'),
+    # Streams end right after replaying the log (EVENTS_MAX_STREAM_SECONDS is 0 during runs): connect + replay cost
+    Scenario('my_startup_events', 'get_my_startup_events', 'GET',
+             lambda rng, size: '/api/my-startup/events?last_event_id=0', 1, role='startup'),
+    Scenario('industry_analytics', 'get_industry_analytics', 'GET',
+             lambda rng, size: f"/api/analytics/industry/{rng.choice([name for name in dataset.INDUSTRIES if name])}", 3),
+    Scenario('recommendations', 'get_recommendations', 'GET', lambda rng, size: '/api/recommendations', 3, role='investor'),
+    Scenario('interest_add', 'manage_investor_interest', 'POST',
+             lambda rng, size: f"/api/startups/{_random_startup(rng, size)}/interest", 4, role='investor', write=True),
+    Scenario('interest_remove', 'manage_investor_interest', 'DELETE',
+             lambda rng, size: f"/api/startups/{_random_startup(rng, size)}/interest", 2, role='investor', write=True),
+    Scenario('profile_update', 'manage_my_startup', 'PUT', lambda rng, size: '/api/my-startup', 2, role='startup',
+             json_body=lambda rng: {'funding_acquired': rng.randint(0, 1000000)}, write=True),
+    Scenario('financials_update', 'update_my_startup_financials', 'PUT', lambda rng, size: '/api/my-startup/financials', 2,
+             role='startup', json_body=_financials, write=True),
+    Scenario('register', 'register', 'POST', lambda rng, size: '/api/register', 1, write=True,
+             json_body=lambda rng: {'email': f"new{rng.getrandbits(64):x}@bench.example", 'password': dataset.BENCH_PASSWORD,
+                                    'name': 'New Founder', 'user_type': 'startup', 'funding_goal': rng.randint(0, 2000000),
+                                    'financials': _financials(rng)}),
+    Scenario('login', 'login', 'POST', lambda rng, size: '/api/login', 1, write=True,
+             json_body=lambda rng: None), # Filled in per client with its own credentials
+    Scenario('logout', 'logout', 'POST', lambda rng, size: '/api/logout', 0), # Only exercised through relogin
+    Scenario('export_interest', 'export_ndjson', 'GET', lambda rng, size: '/api/export/interest.ndjson', 0.05, bulk=True),
+    Scenario('export_startups', 'export_ndjson', 'GET', lambda rng, size: '/api/export/startups.ndjson', 0.05, bulk=True),
+    Scenario('health_live', 'get_liveness', 'GET', lambda rng, size: '/api/health/live', 0.5),
+    Scenario('health_db_pool', 'get_db_pool_stats', 'GET', lambda rng, size: '/api/health/db-pool', 0.5),
+    Scenario('health_cache', 'get_response_cache_stats', 'GET', lambda rng, size: '/api/health/cache', 0.5),
+    Scenario('health_read_snapshot', 'get_read_snapshot_stats', 'GET', lambda rng, size: '/api/health/read-snapshot', 0.5),
+    Scenario('health_password_hasher', 'get_password_hasher_stats', 'GET', lambda rng, size: '/api/health/password-hasher', 0.5),
+    Scenario('health_admission', 'get_admission_stats', 'GET', lambda rng, size: '/api/health/admission', 0.5),
+    Scenario('health_logging', 'get_logging_stats', 'GET', lambda rng, size: '/api/health/logging', 0.5),
+    Scenario('health_slow_requests', 'get_slow_requests', 'GET', lambda rng, size: '/api/health/slow-requests', 0.5),
+    Scenario('metrics', 'get_metrics', 'GET', lambda rng, size: '/metrics', 0.5),
+]
+EXPORT_TOKEN = 'bench-export-token'
+METRICS_TOKEN = 'bench-metrics-token'
+
+
+class TestClientTransport:
+    """In-process requests through Flask's test client (keeps its own cookie jar)."""
+
+    def __init__(self):
+        self.client = backend.app.test_client()
+
+    def request(self, method, path, json_body=None, headers=None):
+        """Returns (status, body size); the body is consumed chunk by chunk, not kept."""
+        response = self.client.open(path, method=method, json=json_body, headers=headers, buffered=False)
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+        return response.status_code, size
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """HTTP/1.1 keep-alive connection to the local WSGI server, with a minimal cookie jar."""
+
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        self.cookies = http.cookies.SimpleCookie()
+
+    def request(self, method, path, json_body=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body)
+            headers['Content-Type'] = 'application/json'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{key}={morsel.value}" for key, morsel in self.cookies.items())
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        size = 0
+        while chunk := response.read(65536):
+            size += len(chunk)
+        for header in response.headers.get_all('Set-Cookie') or []:
+            self.cookies.load(header)
+        return response.status, size
+
+    def close(self):
+        self.connection.close()
+
+
+def start_wsgi_server():
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    WSGIRequestHandler.log_request = lambda *args, **kwargs: None # No access log line per request
+    server = make_server('127.0.0.1', 0, backend.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def missing_scenarios():
+    covered = {scenario.endpoint for scenario in SCENARIOS}
+    return sorted({rule.endpoint for rule in backend.app.url_map.iter_rules()
+                   if rule.endpoint != 'static' and rule.endpoint not in covered})
+
+
+def run_load(size, clients, duration, make_transport, scenarios, seed, accept_encoding=None, anonymous_clients=0):
+    """
+    Closed-loop load: every client sends its next request as soon as the previous one finished.
+    With accept_encoding, every request sends that Accept-Encoding; response sizes are as sent.
+    The anonymous_clients come on top of clients and stay logged out.
+    """
+    investors = dataset.investor_count(size)
+    timings = {scenario.name: [] for scenario in scenarios}
+    statuses = {scenario.name: {} for scenario in scenarios}
+    sizes = {scenario.name: 0 for scenario in scenarios}
+    record = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client_thread(index):
+        rng = random.Random(seed * 1000 + index)
+        role = 'anonymous' if index >= clients else 'investor' if index % 2 == 0 else 'startup'
+        # Founders of popular startups, so analytics and profile routes touch busy rows
+        email = (f"investor{1 + index % investors}@bench.example" if role == 'investor'
+                 else f"founder{1 + index // 2 % size}@bench.example")
+        credentials = {'email': email, 'password': dataset.BENCH_PASSWORD}
+        transport = make_transport()
+        if role == 'anonymous':
+            eligible = [s for s in scenarios if s.role is None and not s.write and s.weight > 0]
+        else:
+            transport.request('POST', '/api/login', credentials)
+            eligible = [s for s in scenarios if s.role in (None, role) and s.weight > 0]
+        weights = [s.weight for s in eligible]
+        local_timings = {s.name: [] for s in eligible}
+        local_statuses = {s.name: {} for s in eligible}
+        local_sizes = {s.name: 0 for s in eligible}
+        while time.perf_counter() < stop_at:
+            scenario = rng.choices(eligible, weights)[0]
+            body = scenario.json_body(rng) if scenario.json_body else None
+            headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+            if scenario.name == 'login':
+                body = credentials
+            path = scenario.path(rng, size)
+            if scenario.endpoint == 'export_ndjson':
+                headers['Authorization'] = f"Bearer {EXPORT_TOKEN}"
+            elif path == '/metrics' or path.startswith('/api/health/'):
+                headers['Authorization'] = f"Bearer {METRICS_TOKEN}"
+            started = time.perf_counter()
+            status, response_size = transport.request(scenario.method, path, body, headers)
+            local_timings[scenario.name].append((time.perf_counter() - started) * 1000)
+            local_sizes[scenario.name] += response_size
+            local_statuses[scenario.name][status] = local_statuses[scenario.name].get(status, 0) + 1
+            if scenario.name == 'register':
+                transport.request('POST', '/api/logout')
+                transport.request('POST', '/api/login', credentials)
+        transport.close()
+        with record:
+            for name, values in local_timings.items():
+                timings[name].extend(values)
+                sizes[name] += local_sizes[name]
+                for status, count in local_statuses[name].items():
+                    statuses[name][status] = statuses[name].get(status, 0) + count
+
+    threads = [threading.Thread(target=client_thread, args=(i,)) for i in range(clients + anonymous_clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    results = {'scenarios': {}, 'elapsed_s': round(elapsed, 3)}
+    all_timings = []
+    for scenario in scenarios:
+        values = timings[scenario.name]
+        if not values:
+            continue
+        if not scenario.bulk:
+            all_timings.extend(values)
+        results['scenarios'][scenario.name] = {
+            **latency_summary(values),
+            'throughput_per_s': round(len(values) / elapsed, 2),
+            'response_bytes': round(sizes[scenario.name] / len(values)),
+            'statuses': {str(status): count for status, count in sorted(statuses[scenario.name].items())},
+            'errors': sum(count for status, count in statuses[scenario.name].items() if status >= 500),
+        }
+    results['overall'] = {**latency_summary(all_timings), 'throughput_per_s': round(len(all_timings) / elapsed, 2),
+                          'errors': sum(s['errors'] for s in results['scenarios'].values())} # Errors include bulk ones
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--startups', type=int, default=10000, help=f"Dataset size, e.g. one of {dataset.SIZES}.")
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent client threads.')
+    parser.add_argument('--anonymous-clients', type=int, default=0, help='Extra client threads that never log in.')
+    parser.add_argument('--read-snapshot', action='store_true', help='Serve anonymous reads from the in-memory snapshot.')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds of load.')
+    parser.add_argument('--server', choices=['client', 'wsgi', 'workers'], default='client')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Server processes for --server workers.')
+    parser.add_argument('--read-only', action='store_true', help='Skip write scenarios and use the cached dataset in place.')
+    parser.add_argument('--scenario', action='append', help='Only run these scenarios (repeatable).')
+    parser.add_argument('--accept-encoding', help="Accept-Encoding sent with every request, e.g. 'gzip'.")
+    parser.add_argument('--log-level', default='WARNING', help="The app logger's level during the run.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=dataset.DEFAULT_DATA_DIR)
+    parser.add_argument('--output', help='Write results as JSON to this path.')
+    args = parser.parse_args()
+
+    for endpoint in missing_scenarios():
+        print(f"WARNING: no scenario for endpoint '{endpoint}'; add one to SCENARIOS", file=sys.stderr)
+    scenarios = [s for s in SCENARIOS if not (args.read_only and s.write)
+                 and (not args.scenario or s.name in args.scenario)]
+
+    path = dataset.dataset_path(args.startups, args.seed, args.data_dir)
+    if not os.path.exists(path):
+        # Built in a child process so its memory doesn't count towards this run's peak RSS
+        subprocess.run([sys.executable, '-m', 'bench.dataset', '--startups', str(args.startups),
+                        '--seed', str(args.seed), '--data-dir', args.data_dir], check=True)
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        if not args.read_only:
+            scratch = os.path.join(scratch_dir, os.path.basename(path))
+            shutil.copyfile(path, scratch)
+            path = scratch
+        backend.app.config['DATABASE'] = path
+        backend.app.logger.setLevel(args.log_level.upper())
+        backend.app.config['EXPORT_API_TOKEN'] = EXPORT_TOKEN
+        backend.app.config['METRICS_API_TOKEN'] = METRICS_TOKEN
+        backend.app.config['EVENTS_MAX_STREAM_SECONDS'] = 0 # Event streams would otherwise hold a client for minutes
+        backend.app.config['DB_POOL_SIZE'] = max(backend.app.config['DB_POOL_SIZE'], args.clients + args.anonymous_clients)
+        backend.app.config['READ_SNAPSHOT_ENABLED'] = args.read_snapshot
+        backend.app.config['RATE_LIMIT_ENABLED'] = False # Every client is 127.0.0.1; bench.admission covers the limiter
+        backend.app.config['MAX_CONCURRENT_REQUESTS'] = max(backend.app.config['MAX_CONCURRENT_REQUESTS'],
+                                                            2 * (args.clients + args.anonymous_clients))
+        if args.read_snapshot:
+            store = backend.get_read_snapshot_store()
+            while not store.stats()['ready']: # Measure the snapshot, not the fallback while the first copy builds
+                time.sleep(0.05)
+        server = None
+        worker_processes = []
+        if args.server == 'wsgi':
+            server = start_wsgi_server()
+            port = server.server_port
+            make_transport = lambda: HTTPTransport(port)
+        elif args.server == 'workers':
+            worker_config = {key: backend.app.config[key] for key in (
+                'DATABASE', 'EXPORT_API_TOKEN', 'METRICS_API_TOKEN', 'EVENTS_MAX_STREAM_SECONDS', 'DB_POOL_SIZE',
+                'READ_SNAPSHOT_ENABLED', 'RATE_LIMIT_ENABLED', 'MAX_CONCURRENT_REQUESTS')}
+            worker_config['SECRET_KEY'] = os.urandom(24).hex()
+            worker_processes, ports = backend.start_workers(worker_config, args.workers)
+            port_cycle = itertools.cycle(ports)
+            make_transport = lambda: HTTPTransport(next(port_cycle))
+        else:
+            make_transport = TestClientTransport
+        rss_before = current_rss_mb()
+        try:
+            results = run_load(args.startups, args.clients, args.duration, make_transport, scenarios, args.seed,
+                               args.accept_encoding, args.anonymous_clients)
+        finally:
+            if server is not None:
+                server.shutdown()
+            for process in worker_processes:
+                process.terminate()
+                process.join()
+            backend.close_read_snapshot_store(path)
+            backend.get_password_hasher().shutdown()
+            backend.close_db_pool(path)
+        results['rss_mb'] = {'before_load': rss_before, 'after_load': current_rss_mb(), 'peak': peak_rss_mb()}
+
+    print(f"{args.startups} startups, {args.clients} clients, {args.anonymous_clients} anonymous, {args.duration:.0f}s, {args.server}"
+          f"{f' x{args.workers}' if args.server == 'workers' else ''}"
+          f"{', read snapshot' if args.read_snapshot else ''}"
+          f"{', read-only' if args.read_only else ''}{f', Accept-Encoding: {args.accept_encoding}' if args.accept_encoding else ''}")
+    print(f"{'scenario':<24}{'count':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'5xx':>6}{'bytes':>10}")
+    for name, summary in list(results['scenarios'].items()) + [('OVERALL', results['overall'])]:
+        if not summary['count']:
+            print(f"{name:<24}{0:>8}")
+            continue
+        print(f"{name:<24}{summary['count']:>8}{summary['throughput_per_s']:>10.1f}{summary['p50_ms']:>10.2f}"
+              f"{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}{summary['errors']:>6}"
+              f"{summary.get('response_bytes', ''):>10}")
+    print(f"RSS MB: {results['rss_mb']}")
+    if args.output:
+        config = {'startups': args.startups, 'clients': args.clients, 'anonymous_clients': args.anonymous_clients,
+                  'read_snapshot': args.read_snapshot, 'duration_s': args.duration, 'server': args.server,
+                  'workers': args.workers if args.server == 'workers' else None,
+                  'read_only': args.read_only, 'accept_encoding': args.accept_encoding, 'log_level': args.log_level.upper(), 'seed': args.seed, 'scenarios': [s.name for s in scenarios]}
+        save_results(args.output, 'routes', config, results)
+        print(f"Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
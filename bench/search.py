@@ -0,0 +1,118 @@
+# backend/bench/search.py
+"""
+Search latency: the FTS5 index behind /api/startups/search versus a LIKE scan over the same
+columns, on a synthetic catalog.
+
+    python -m bench.search --startups 100000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import app as backend
+
+WORDS = ("solar wind battery grid farm agri drone robot cloud data ledger payments lending insurance "
+         "health clinic genomics biotech fitness food delivery kitchen grocery logistics freight fleet "
+         "travel hotel housing rental school tutor learning language music video gaming studio fashion "
+         "retail marketplace analytics security identity privacy water recycling carbon mining space").split()
+INDUSTRIES = ["Energy", "Fintech", "Healthcare", "Education", "Logistics", "Retail", "Media", "AgriTech", "SaaS"]
+SYLLABLES = "ka lo mi ne ru sa ti vo ze xu pa qi bo de fa gu hi ja".split()
+
+
+def long_tail_vocabulary(rng, size=20000):
+    """Pseudo-words standing in for product names and jargon: individually rare, like real catalog text."""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 4))))
+    return sorted(words)
+
+
+def build_catalog(path, startups, long_tail, seed=0):
+    """Creates a migrated database at path with `startups` synthetic rows (FTS is filled by the triggers)."""
+    rng = random.Random(seed)
+    tail_weights = [1 / rank for rank in range(1, len(long_tail) + 1)] # Zipf-like
+    backend.app.config['DATABASE'] = path
+    with backend.app.app_context():
+        backend.migrate(backend.get_db())
+    backend.close_db_pool(path)
+
+    db = sqlite3.connect(path)
+    db.execute("INSERT INTO users (id, email, password_hash, user_type, name) VALUES (1, 'bench@example.com', '-', 'startup', 'Bench')")
+    batch = []
+    for startup_id in range(1, startups + 1):
+        name = f"{rng.choice(WORDS).title()}{rng.choice(WORDS)} {startup_id}"
+        description = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(10, 30)))
+        description += ' ' + ' '.join(rng.choices(long_tail, tail_weights, k=rng.randint(2, 10)))
+        batch.append((startup_id, 1, name, description, rng.choice(INDUSTRIES)))
+        if len(batch) == 10000:
+            db.executemany("INSERT INTO startups (id, user_id, company_name, description, industry) VALUES (?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    db.executemany("INSERT INTO startups (id, user_id, company_name, description, industry) VALUES (?, ?, ?, ?, ?)", batch)
+    db.commit()
+    db.close()
+
+
+def time_queries(db, sql, param_sets):
+    timings = []
+    for params in param_sets:
+        started = time.perf_counter()
+        db.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summarize(label, timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<8} p50 {statistics.median(ordered):9.2f} ms   p95 {p95:9.2f} ms   max {ordered[-1]:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--startups', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--limit', type=int, default=backend.DEFAULT_PAGE_SIZE)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    long_tail = long_tail_vocabulary(rng)
+    query_sets = {
+        'selective': [rng.choice(long_tail[50:5000]) for _ in range(args.queries)], # Few hundred matches or less
+        'common': [' '.join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(args.queries)], # Tens of thousands
+    }
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        path = os.path.join(scratch_dir, 'bench_search.db')
+        started = time.perf_counter()
+        build_catalog(path, args.startups, long_tail, args.seed)
+        print(f"Built {args.startups} startups in {time.perf_counter() - started:.1f}s")
+
+        db = sqlite3.connect(path)
+        # LIKE cannot rank, so it only has to find `limit` matches; on selective queries that still means a full scan
+        like_sql = """
+            SELECT id, company_name, industry, logo_url, funding_goal, funding_acquired, risk_category
+            FROM startups
+            WHERE """ + ' AND '.join(["(company_name LIKE ? OR description LIKE ? OR industry LIKE ?)"] * 2) + """
+            LIMIT ?
+        """
+        for label, texts in query_sets.items():
+            fts_params = [(backend.fts_query_from_text(text), args.limit + 1, 0) for text in texts]
+            like_params = []
+            for text in texts:
+                words = (text.split() * 2)[:2] # Pad single-word queries so the statement shape is fixed
+                like_params.append(tuple(f"%{word}%" for word in words for _ in range(3)) + (args.limit + 1,))
+
+            time_queries(db, backend.SEARCH_SQL, fts_params[:5]) # Warm the page cache for both
+            time_queries(db, like_sql, like_params[:5])
+            print(f"{label} queries ({args.queries}, limit {args.limit}):")
+            summarize('FTS5', time_queries(db, backend.SEARCH_SQL, fts_params))
+            summarize('LIKE', time_queries(db, like_sql, like_params))
+        db.close()
+
+if __name__ == '__main__':
+    main()
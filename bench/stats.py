@@ -0,0 +1,86 @@
+# backend/bench/stats.py
+"""Latency summaries, memory readings and the JSON result files shared by the benchmarks."""
+
+import datetime
+import json
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def latency_summary(timings_ms):
+    """p50/p95/p99/max/mean of a list of latencies in milliseconds."""
+    ordered = sorted(timings_ms)
+    if not ordered:
+        return {'count': 0}
+    return {
+        'count': len(ordered),
+        'p50_ms': round(percentile(ordered, 0.50), 3),
+        'p95_ms': round(percentile(ordered, 0.95), 3),
+        'p99_ms': round(percentile(ordered, 0.99), 3),
+        'max_ms': round(ordered[-1], 3),
+        'mean_ms': round(sum(ordered) / len(ordered), 3),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def current_rss_mb():
+    """Current resident set size, where /proc is available; None elsewhere."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return round(int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def environment():
+    """What a result was measured on, so comparisons across machines are recognisable."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def save_results(path, benchmark, config, results):
+    """Writes one benchmark run as JSON: {benchmark, started_at, environment, config, results}."""
+    document = {
+        'benchmark': benchmark,
+        'recorded_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'config': config,
+        'results': results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(document, output, indent=2, sort_keys=True)
+    return document
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
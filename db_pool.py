@@ -0,0 +1,127 @@
+# backend/db_pool.py
+
+import sqlite3
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became free within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    A bounded pool of long-lived SQLite connections for one database file (or, with
+    uri=True, any SQLite URI such as a shared in-memory database).
+
+    A connection is handed back to the thread that used it last whenever possible, so a
+    worker thread normally keeps reusing one warm connection (and its statement cache).
+    At most max_size connections are ever open; acquire() waits up to timeout seconds
+    for one to be released before raising PoolTimeout.
+
+    Connections are opened with check_same_thread=False because they can move between
+    threads, but the pool guarantees only one thread holds a connection at a time.
+    """
+
+    def __init__(self, database, max_size=8, timeout=5.0, cached_statements=512, pragmas=None, uri=False):
+        self.database = database
+        self.uri = uri
+        self.max_size = max_size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.pragmas = list(pragmas or [])
+        self._idle = [] # Released connections, most recently used last
+        self._all = set()
+        self._connecting = 0 # Slots reserved by threads currently opening a connection
+        self._local = threading.local()
+        self._condition = threading.Condition()
+        self._counters = {'created': 0, 'acquired': 0, 'reused_same_thread': 0, 'waited': 0, 'timeouts': 0}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, check_same_thread=False, cached_statements=self.cached_statements,
+                               uri=self.uri)
+        conn.row_factory = sqlite3.Row
+        for pragma in self.pragmas: # Applied once, for the lifetime of the connection
+            conn.execute(f"PRAGMA {pragma}")
+        return conn
+
+    def acquire(self):
+        """Returns a connection for exclusive use by the calling thread until release()."""
+        with self._condition:
+            deadline = None
+            while True:
+                preferred = getattr(self._local, 'conn', None)
+                if preferred is not None and preferred in self._idle:
+                    self._idle.remove(preferred)
+                    self._counters['reused_same_thread'] += 1
+                    conn = preferred
+                    break
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if len(self._all) + self._connecting < self.max_size:
+                    conn = None
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self.timeout
+                    self._counters['waited'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(f"No free connection to {self.database} after {self.timeout}s")
+                self._condition.wait(remaining)
+            if conn is None:
+                self._connecting += 1 # Reserve the slot while connecting outside the lock
+            self._counters['acquired'] += 1
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._condition:
+                    self._connecting -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._connecting -= 1
+                self._all.add(conn)
+                self._counters['created'] += 1
+        self._local.conn = conn
+        return conn
+
+    def release(self, conn):
+        """Returns a connection to the pool, rolling back anything left uncommitted."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # A broken connection is dropped rather than handed to the next request
+            with self._condition:
+                self._all.discard(conn)
+                self._condition.notify()
+            conn.close()
+            return
+        with self._condition:
+            self._idle.append(conn)
+            self._condition.notify()
+
+    def close_all(self):
+        """Closes idle connections and forgets the rest; used on shutdown and for scratch databases."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._all.clear()
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        with self._condition:
+            open_connections = len(self._all)
+            idle = len(self._idle)
+            return {
+                'database': self.database,
+                'max_size': self.max_size,
+                'open': open_connections,
+                'idle': idle,
+                'in_use': open_connections - idle,
+                **self._counters,
+            }
@@ -0,0 +1,91 @@
+# backend/event_broker.py
+
+import queue
+import threading
+
+
+class BrokerFull(Exception):
+    """Raised by subscribe() when the broker already has max_subscribers."""
+
+
+class Subscription:
+    """One subscriber's bounded event queue. overflowed is set when an event was dropped because it was full."""
+
+    __slots__ = ('topic', 'queue', 'overflowed')
+
+    def __init__(self, topic, max_queue):
+        self.topic = topic
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def get(self, timeout):
+        """The next event, or None if none arrived within timeout seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe by topic (e.g. 'startup:42').
+
+    publish() never blocks on a slow subscriber: an event that doesn't fit in a
+    subscriber's queue is dropped for that subscriber and its subscription is marked
+    overflowed, so the reader knows to catch up from durable storage instead. Only
+    subscribers in this process see an event.
+    """
+
+    def __init__(self, max_subscribers=100, max_queue=64):
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+        self._topics = {} # topic -> set of Subscriptions
+        self._count = 0
+        self._lock = threading.Lock()
+        self._counters = {'published': 0, 'delivered': 0, 'dropped': 0, 'rejected_subscribers': 0}
+
+    def subscribe(self, topic):
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                self._counters['rejected_subscribers'] += 1
+                raise BrokerFull(f"{self._count} subscribers already connected")
+            subscription = Subscription(topic, self.max_queue)
+            self._topics.setdefault(topic, set()).add(subscription)
+            self._count += 1
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[subscription.topic]
+            self._count -= 1
+
+    def subscriber_count(self, topic):
+        with self._lock:
+            return len(self._topics.get(topic, ()))
+
+    def publish(self, topic, event):
+        """Queues event for every subscriber of topic; returns how many received it."""
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+            self._counters['published'] += 1
+        delivered = 0
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+                delivered += 1
+            except queue.Full:
+                subscription.overflowed = True
+        with self._lock:
+            self._counters['delivered'] += delivered
+            self._counters['dropped'] += len(subscribers) - delivered
+        return delivered
+
+    def stats(self):
+        with self._lock:
+            return {'subscribers': self._count, 'topics': len(self._topics),
+                    'max_subscribers': self.max_subscribers, 'max_queue': self.max_queue, **self._counters}
@@ -0,0 +1,264 @@
+# backend/financial_analytics.py
+"""
+Industry benchmarks over every startup's financial history, for /api/analytics/industry/<industry>
+and the industry_benchmark in /api/startups/<id>.
+
+FinancialAnalytics keeps the series column-wise in NumPy arrays: the records of all startups
+back to back (year, revenue, profit), an offset and length per startup, and per-startup
+industry, funding goal and funding acquired. Packed financial histories (financial_pack)
+already use this record layout, so decode_packed() turns any number of them into columns
+with one np.frombuffer. Metrics are computed for all startups at once:
+
+    revenue            latest reported revenue
+    revenue_cagr       (last revenue / first revenue) ** (1 / years between them) - 1; needs
+                       positive revenue at both ends, at least one year apart
+    profit_yoy_growth  (last profit - previous year's profit) / |previous year's profit|;
+                       needs the two latest records in consecutive years, the earlier non-zero
+    funding_ratio      funding acquired / funding goal, for a positive goal
+
+A metric that doesn't apply to a startup is NaN and left out of the statistics. update()
+replaces the rows of changed startups: their new records are appended and the old ones left
+as garbage, compacted once it outnumbers the live records. The sorted values of a metric
+within an industry are computed on first use after that industry changes, so percentiles
+and a startup's percentile rank are then a lookup and a binary search.
+
+Requires NumPy.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from financial_pack import PACK_VERSION, RECORD_SIZE
+
+RECORD_DTYPE = np.dtype([('year', '<i8'), ('revenue', '<f8'), ('profit', '<f8')]) # financial_pack's record
+METRICS = ('revenue', 'revenue_cagr', 'profit_yoy_growth', 'funding_ratio')
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def decode_packed(packed_histories):
+    """Decodes packed financial histories into (records, lengths): RECORD_DTYPE records back to back, and a count per history."""
+    lengths = np.empty(len(packed_histories), dtype=np.int64)
+    for i, packed in enumerate(packed_histories):
+        if not packed or packed[0] != PACK_VERSION or (len(packed) - 1) % RECORD_SIZE:
+            raise ValueError(f"Not a version {PACK_VERSION} packed financial history ({len(packed or b'')} bytes)")
+        lengths[i] = (len(packed) - 1) // RECORD_SIZE
+    records = np.frombuffer(b''.join(memoryview(packed)[1:] for packed in packed_histories), dtype=RECORD_DTYPE)
+    return records, lengths
+
+
+def split_records(records, lengths):
+    """decode_packed()'s records as one array per history."""
+    return np.split(records, np.cumsum(lengths)[:-1]) if len(lengths) else []
+
+
+def _number(value, digits=4):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+class FinancialAnalytics:
+    """
+    The financial series and metrics of a set of startups. Rows are built from parallel
+    sequences (ids, industry names, funding goals, funding acquired, and decode_packed()'s
+    records and lengths); None goals and amounts count as missing. Thread-safe.
+    """
+
+    def __init__(self, ids, industries, funding_goals, funding_acquired, records, lengths):
+        started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._industry_names = []
+        self._industry_codes = {}
+        self._positions = {int(startup_id): position for position, startup_id in enumerate(ids)}
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.industry = np.array([self._industry_code(name) for name in industries], dtype=np.int32)
+        self.funding_goal = np.array(funding_goals, dtype=np.float64) # None -> NaN
+        self.funding_acquired = np.array(funding_acquired, dtype=np.float64)
+        self.years = np.array(records['year'], dtype=np.int64)
+        self.revenue = np.array(records['revenue'], dtype=np.float64)
+        self.profit = np.array(records['profit'], dtype=np.float64)
+        self.lengths = np.array(lengths, dtype=np.int64)
+        self.offsets = np.cumsum(self.lengths) - self.lengths
+        self._live_records = len(self.years) # The rest of the record arrays is garbage left by update()
+        self.metrics = {name: np.full(len(self.ids), np.nan) for name in METRICS}
+        self._compute(np.arange(len(self.ids)))
+        self._sorted = {} # (industry code, metric) -> sorted non-NaN values; (code, None) -> member count
+        self.generation = 0
+        self.built_at = time.monotonic()
+        self.build_seconds = time.perf_counter() - started
+
+    def _industry_code(self, name):
+        name = name or ''
+        code = self._industry_codes.get(name)
+        if code is None:
+            code = self._industry_codes[name] = len(self._industry_names)
+            self._industry_names.append(name)
+        return code
+
+    def _compute(self, rows):
+        """Recomputes every metric for the row positions in rows."""
+        lengths = self.lengths[rows]
+        has_records = lengths > 0
+        has_previous = lengths > 1
+        goal, acquired = self.funding_goal[rows], self.funding_acquired[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.metrics['funding_ratio'][rows] = np.where(goal > 0, acquired / goal, np.nan)
+            if not self.years.size:
+                for name in ('revenue', 'revenue_cagr', 'profit_yoy_growth'):
+                    self.metrics[name][rows] = np.nan
+                return
+            first = np.where(has_records, self.offsets[rows], 0) # Index 0 stands in for missing records; masked below
+            last = np.where(has_records, self.offsets[rows] + lengths - 1, 0)
+            previous = np.where(has_previous, last - 1, 0)
+
+            revenue = np.where(has_records, self.revenue[last], np.nan)
+            first_revenue = self.revenue[first]
+            span = self.years[last] - self.years[first]
+            grows = has_records & (span > 0) & (first_revenue > 0) & (revenue > 0)
+            self.metrics['revenue'][rows] = revenue
+            self.metrics['revenue_cagr'][rows] = np.where(
+                grows, (revenue / first_revenue) ** (1.0 / np.maximum(span, 1)) - 1, np.nan)
+
+            previous_profit = self.profit[previous]
+            consecutive = has_previous & (self.years[previous] == self.years[last] - 1) & (previous_profit != 0)
+            self.metrics['profit_yoy_growth'][rows] = np.where(
+                consecutive, (self.profit[last] - previous_profit) / np.abs(previous_profit), np.nan)
+
+    def update(self, rows):
+        """
+        Replaces changed startups. rows holds (id, industry, funding goal, funding acquired,
+        records) per startup, records as decoded by decode_packed() for that one history, or
+        None for a startup that no longer exists.
+        """
+        with self._lock:
+            touched = set()
+            new_ids = [int(row[0]) for row in rows if int(row[0]) not in self._positions and row[4] is not None]
+            if new_ids:
+                self._append_rows(new_ids)
+            positions = []
+            appended = []
+            end = len(self.years)
+            for startup_id, industry, funding_goal, funding_acquired, records in rows:
+                position = self._positions.get(int(startup_id))
+                if position is None:
+                    continue # Removed before it was ever loaded
+                touched.add(int(self.industry[position]))
+                self._live_records -= int(self.lengths[position])
+                if records is None:
+                    self.industry[position] = -1 # In no industry: left out of every statistic
+                    self.lengths[position] = 0
+                    self.funding_goal[position] = self.funding_acquired[position] = np.nan
+                else:
+                    self.industry[position] = code = self._industry_code(industry)
+                    touched.add(code)
+                    self.funding_goal[position] = np.nan if funding_goal is None else funding_goal
+                    self.funding_acquired[position] = np.nan if funding_acquired is None else funding_acquired
+                    self.offsets[position] = end
+                    self.lengths[position] = len(records)
+                    self._live_records += len(records)
+                    end += len(records)
+                    appended.append(records)
+                positions.append(position)
+            if appended:
+                records = np.concatenate(appended)
+                self.years = np.concatenate([self.years, records['year'].astype(np.int64)])
+                self.revenue = np.concatenate([self.revenue, records['revenue'].astype(np.float64)])
+                self.profit = np.concatenate([self.profit, records['profit'].astype(np.float64)])
+            if positions:
+                self._compute(np.array(positions, dtype=np.int64))
+            if len(self.years) > 2 * self._live_records:
+                self._compact()
+            for key in [key for key in self._sorted if key[0] in touched]:
+                del self._sorted[key]
+            self.generation += 1
+
+    def _append_rows(self, new_ids):
+        start = len(self.ids)
+        for offset, startup_id in enumerate(new_ids):
+            self._positions[startup_id] = start + offset
+        count = len(new_ids)
+        self.ids = np.concatenate([self.ids, np.array(new_ids, dtype=np.int64)])
+        self.industry = np.concatenate([self.industry, np.full(count, -1, dtype=np.int32)])
+        self.funding_goal = np.concatenate([self.funding_goal, np.full(count, np.nan)])
+        self.funding_acquired = np.concatenate([self.funding_acquired, np.full(count, np.nan)])
+        self.offsets = np.concatenate([self.offsets, np.zeros(count, dtype=np.int64)])
+        self.lengths = np.concatenate([self.lengths, np.zeros(count, dtype=np.int64)])
+        for name in METRICS:
+            self.metrics[name] = np.concatenate([self.metrics[name], np.full(count, np.nan)])
+
+    def _compact(self):
+        """Copies the live records to fresh arrays, in row order."""
+        starts = np.cumsum(self.lengths) - self.lengths
+        source = np.repeat(self.offsets - starts, self.lengths) + np.arange(int(self.lengths.sum()))
+        self.years, self.revenue, self.profit = self.years[source], self.revenue[source], self.profit[source]
+        self.offsets = starts
+        self._live_records = len(self.years)
+
+    def _sorted_values(self, code, metric):
+        """Sorted non-NaN values of metric in one industry (metric None: the member count). Lock held."""
+        key = (code, metric)
+        values = self._sorted.get(key)
+        if values is None:
+            members = self.industry == code
+            if metric is None:
+                values = int(np.count_nonzero(members))
+            else:
+                values = self.metrics[metric][members]
+                values = np.sort(values[~np.isnan(values)])
+            self._sorted[key] = values
+        return values
+
+    def industries(self):
+        with self._lock:
+            return sorted(name for code, name in enumerate(self._industry_names) if self._sorted_values(code, None))
+
+    def industry_stats(self, industry):
+        """Startup count and, per metric, count, mean and PERCENTILES; None for an industry without startups."""
+        with self._lock:
+            code = self._industry_codes.get(industry)
+            if code is None or not self._sorted_values(code, None):
+                return None
+            metrics = {}
+            for metric in METRICS:
+                values = self._sorted_values(code, metric)
+                summary = {'count': len(values)}
+                if len(values):
+                    summary['mean'] = _number(values.mean())
+                    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                        summary[f"p{percentile}"] = _number(value)
+                metrics[metric] = summary
+            return {'industry': industry, 'startups': self._sorted_values(code, None), 'metrics': metrics}
+
+    def benchmark(self, startup_id):
+        """
+        One startup's metrics against its industry: per metric its value, its percentile rank
+        (the share of peers with a value at or below it, itself included) and the industry
+        median. None if the startup isn't loaded or has no industry.
+        """
+        with self._lock:
+            position = self._positions.get(int(startup_id))
+            if position is None or self.industry[position] < 0:
+                return None
+            code = int(self.industry[position])
+            if not self._industry_names[code]:
+                return None
+            metrics = {}
+            for metric in METRICS:
+                values = self._sorted_values(code, metric)
+                value = self.metrics[metric][position]
+                metrics[metric] = {
+                    'value': _number(value),
+                    'percentile': None if np.isnan(value) or not len(values) else
+                                  round(100.0 * int(np.searchsorted(values, value, side='right')) / len(values), 1),
+                    'industry_median': _number(np.median(values)) if len(values) else None,
+                }
+            return {'industry': self._industry_names[code], 'peers': self._sorted_values(code, None), 'metrics': metrics}
+
+    def age(self):
+        return time.monotonic() - self.built_at
+
+    def stats(self):
+        with self._lock:
+            return {'startups': int(np.count_nonzero(self.industry >= 0)), 'industries': len(self._industry_names),
+                    'records': self._live_records, 'record_capacity': len(self.years), 'generation': self.generation,
+                    'age_seconds': round(self.age(), 3), 'build_seconds': round(self.build_seconds, 3)}
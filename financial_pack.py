@@ -0,0 +1,57 @@
+# backend/financial_pack.py
+"""
+Compact binary form of a startup's financial history, stored in startups.financial_packed.
+
+Layout: one version byte, then one little-endian (year int64, revenue float64, profit
+float64) record per year, sorted by year. A missing revenue or profit is stored as NaN,
+which is also how SQLite stores a NaN REAL (as NULL), so values read back exactly as they
+read from financial_records. Records have a fixed size, so the latest year can be read
+without decoding the rest.
+"""
+
+import math
+import struct
+
+PACK_VERSION = 1
+_RECORD = struct.Struct('<qdd')
+RECORD_SIZE = _RECORD.size
+_HEADER = bytes([PACK_VERSION])
+_NAN = float('nan')
+
+
+def pack_financials(financial_history):
+    """Packs a year-sorted list of {'year', 'revenue', 'profit'} dicts."""
+    parts = [_HEADER]
+    for item in financial_history:
+        revenue, profit = item['revenue'], item['profit']
+        parts.append(_RECORD.pack(int(item['year']), _NAN if revenue is None else float(revenue),
+                                  _NAN if profit is None else float(profit)))
+    return b''.join(parts)
+
+
+def _check(packed):
+    if not packed or packed[0] != PACK_VERSION or (len(packed) - 1) % RECORD_SIZE:
+        raise ValueError(f"Not a version {PACK_VERSION} packed financial history ({len(packed or b'')} bytes)")
+
+
+def _record(year, revenue, profit):
+    return {'year': year, 'revenue': None if math.isnan(revenue) else revenue,
+            'profit': None if math.isnan(profit) else profit}
+
+
+def unpack_financials(packed):
+    """Decodes the full series as a year-sorted list of dicts (the detail views' shape)."""
+    _check(packed)
+    return [_record(*values) for values in _RECORD.iter_unpack(memoryview(packed)[1:])]
+
+
+def last_financial_record(packed):
+    """
+    Decodes only the latest year as a dict, or returns None for an empty history. Only
+    bench.financials uses it, to time a latest-year read against a full unpack; the app's
+    rescoring reads the latest year with a join on financial_records instead.
+    """
+    _check(packed)
+    if len(packed) == 1:
+        return None
+    return _record(*_RECORD.unpack_from(packed, len(packed) - RECORD_SIZE))
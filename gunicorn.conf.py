@@ -0,0 +1,30 @@
+# backend/gunicorn.conf.py
+"""
+gunicorn settings for wsgi:app (see wsgi.py). Every setting can still be overridden on the
+command line, e.g. `gunicorn -c gunicorn.conf.py -w 2 wsgi:app`.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count())) # One process per core
+worker_class = 'gthread' # Threads overlap SQLite I/O, scrypt waits and event streams
+threads = int(os.environ.get('THREADS', 8)) # Keep at or below DB_POOL_SIZE
+timeout = 30 # gthread workers heartbeat between requests, so long event streams don't trip this
+graceful_timeout = 30
+preload_app = True # Import once in the master; init_worker() gives each worker its own connections
+
+
+def on_starting(server):
+    """Applies pending migrations once, before any worker starts."""
+    import app as backend
+    backend.create_app()
+    with backend.app.app_context():
+        backend.migrate(backend.get_db())
+    backend.close_db_pool()
+
+
+def post_worker_init(worker):
+    import app as backend
+    backend.init_worker()
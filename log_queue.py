@@ -0,0 +1,102 @@
+# backend/log_queue.py
+"""
+Logging off the request path.
+
+QueueingHandler puts records on a bounded queue; a logging.handlers.QueueListener thread
+formats and writes them, with JsonFormatter as one JSON object per line. The calling thread
+only merges the message with its arguments (so mutable arguments are logged as they were at
+the call) and renders any traceback. If the writer falls behind and the queue fills up, new
+records are dropped and counted instead of blocking the request.
+
+SampleFilter thins out repeated warnings before they are queued: records logged with
+extra={'sample_key': ...} (a startup id, a client address) pass at most burst times per
+interval for each message template and key. Calls should pass arguments lazily
+(logger.warning("... %s", value)) so that records that are filtered out or below the log
+level are never formatted, and so that the template identifies the call site.
+"""
+
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import time
+
+from rate_limiter import TokenBucketLimiter
+
+# Attributes every LogRecord has; anything else on a record came from extra= or a filter
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time (UTC), level, logger, message, extra fields, exception."""
+
+    def format(self, record):
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class QueueingHandler(logging.handlers.QueueHandler):
+    """A QueueHandler on a bounded queue that drops (and counts) records when it is full."""
+
+    def __init__(self, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.enqueued = 0 # Counters are only touched in emit(), under the handler lock
+        self.dropped = 0
+
+    def prepare(self, record):
+        """A copy with the message merged and the traceback rendered, safe to format later."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None # Tracebacks keep frames (and their locals) alive
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self):
+        return {'enqueued': self.enqueued, 'dropped': self.dropped, 'queued': self.queue.qsize(),
+                'max_queued': self.queue.maxsize}
+
+
+class SampleFilter(logging.Filter):
+    """
+    Passes at most burst records per (message template, sample_key) every interval_seconds;
+    records without a sample_key always pass. The keys remembered are bounded by max_keys
+    (see TokenBucketLimiter), so a key forgotten early may log again sooner.
+    """
+
+    def __init__(self, interval_seconds=60.0, burst=1, max_keys=10000):
+        super().__init__()
+        self.limiter = TokenBucketLimiter(burst / interval_seconds, burst, max_keys=max_keys)
+
+    def filter(self, record):
+        sample_key = getattr(record, 'sample_key', None)
+        if sample_key is None:
+            return True
+        return self.limiter.acquire((record.msg, sample_key)) == 0
+
+    def stats(self):
+        limiter = self.limiter.stats()
+        return {'sampled_passed': limiter['allowed'], 'sampled_suppressed': limiter['limited'], 'sample_keys': limiter['keys']}
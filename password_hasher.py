@@ -0,0 +1,163 @@
+# backend/password_hasher.py
+
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+SCRYPT_PREFIX = 'scrypt'
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full or a hash did not finish in time."""
+
+
+def _scrypt(password, salt, n, r, p, dklen):
+    # Runs in a worker process; maxmem leaves headroom over the 128 * n * r bytes scrypt needs
+    return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 1024 * 1024, dklen=dklen)
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def parse_scrypt_hash(stored_hash):
+    """Returns (n, r, p, salt, key) for a hash from PasswordHasher.hash, or None for any other format."""
+    parts = stored_hash.split('$')
+    if len(parts) != 6 or parts[0] != SCRYPT_PREFIX:
+        return None
+    try:
+        return int(parts[1]), int(parts[2]), int(parts[3]), _unb64(parts[4]), _unb64(parts[5])
+    except ValueError:
+        return None
+
+
+def is_legacy_sha256(stored_hash):
+    """True for the unsalted hex SHA-256 digests stored before scrypt was introduced."""
+    return len(stored_hash) == 64 and all(c in '0123456789abcdef' for c in stored_hash)
+
+
+class PasswordHasher:
+    """
+    scrypt password hashing on a small process pool, so a burst of logins costs CPU in the
+    workers instead of blocking request threads (and the GIL) for the whole KDF.
+
+    At most max_pending hashes may be queued or running; beyond that hash() and verify()
+    raise HasherBusy immediately rather than letting requests pile up behind the pool.
+    With workers=0 hashing runs inline in the calling thread (CLI tools, scratch databases).
+
+    Stored format: scrypt$n$r$p$<salt b64>$<key b64>. Cost parameters are kept per hash, so
+    changing them only affects new hashes; needs_rehash() reports hashes made with other
+    parameters (or legacy SHA-256) so login can upgrade them.
+    """
+
+    def __init__(self, workers=2, max_pending=32, timeout=10.0, n=2 ** 14, r=8, p=1, dklen=32, salt_bytes=16):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.n, self.r, self.p, self.dklen = n, r, p, dklen
+        self.salt_bytes = salt_bytes
+        self._pending = 0 # Hashes submitted to the pool and not finished yet
+        self._executor = None
+        self._lock = threading.Lock()
+        self._counters = {'hashed': 0, 'verified': 0, 'rejected_busy': 0, 'timeouts': 0, 'pool_restarts': 0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs request threads can copy held locks
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _run(self, password, salt, n, r, p, dklen):
+        if self.workers <= 0:
+            return _scrypt(password, salt, n, r, p, dklen)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters['rejected_busy'] += 1
+                raise HasherBusy(f"{self.max_pending} password hashes already pending")
+            self._pending += 1
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_scrypt, password, salt, n, r, p, dklen)
+        except BrokenProcessPool:
+            self._finished()
+            self._restart(executor)
+            raise HasherBusy("Password hashing pool is restarting")
+        except Exception:
+            self._finished()
+            raise
+        future.add_done_callback(self._finished) # The slot stays taken until the worker is done, even after a timeout
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._counters['timeouts'] += 1
+            raise HasherBusy(f"Password hash did not finish within {self.timeout}s")
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); the next call gets a fresh pool
+            self._restart(executor)
+            raise HasherBusy("Password hashing worker died; pool is restarting")
+
+    def _restart(self, broken_executor):
+        with self._lock:
+            if self._executor is not broken_executor:
+                return # Another thread already replaced it
+            self._executor = None
+            self._counters['pool_restarts'] += 1
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def hash(self, password):
+        salt = os.urandom(self.salt_bytes)
+        key = self._run(password, salt, self.n, self.r, self.p, self.dklen)
+        with self._lock:
+            self._counters['hashed'] += 1
+        return f"{SCRYPT_PREFIX}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(key)}"
+
+    def verify(self, stored_hash, password):
+        if is_legacy_sha256(stored_hash):
+            legacy = hashlib.sha256(password.encode('utf-8')).hexdigest()
+            return hmac.compare_digest(stored_hash, legacy)
+        parsed = parse_scrypt_hash(stored_hash)
+        if parsed is None:
+            return False
+        n, r, p, salt, key = parsed
+        candidate = self._run(password, salt, n, r, p, len(key))
+        with self._lock:
+            self._counters['verified'] += 1
+        return hmac.compare_digest(candidate, key)
+
+    def needs_rehash(self, stored_hash):
+        parsed = parse_scrypt_hash(stored_hash)
+        return parsed is None or parsed[:3] != (self.n, self.r, self.p) or len(parsed[4]) != self.dklen
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'scrypt': {'n': self.n, 'r': self.r, 'p': self.p},
+                **self._counters,
+            }
@@ -0,0 +1,108 @@
+# backend/rate_limiter.py
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by client (an IP address, an account), in a bounded LRU.
+
+    Each key may spend up to burst tokens at once, refilled at rate tokens per second.
+    A bucket that has been idle long enough to refill completely is indistinguishable from
+    a new one, so it is dropped after burst / rate seconds; when more than max_keys keys
+    are active, the least recently used bucket is evicted (and that key starts full again).
+    """
+
+    def __init__(self, rate, burst, max_keys=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.idle_seconds = burst / rate
+        self._buckets = OrderedDict() # key -> (tokens, monotonic time of the last update)
+        self._lock = threading.Lock()
+        self._counters = {'allowed': 0, 'limited': 0, 'expired': 0, 'evictions': 0}
+
+    def acquire(self, key, cost=1):
+        """Spends cost tokens for key. Returns 0 if allowed, else the seconds until it would be."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                retry_after = 0
+                self._counters['allowed'] += 1
+            else:
+                retry_after = (cost - tokens) / self.rate
+                self._counters['limited'] += 1
+            self._buckets[key] = (tokens, now)
+            self._prune(now)
+            return retry_after
+
+    def _prune(self, now):
+        while self._buckets:
+            key, (tokens, updated) = next(iter(self._buckets.items()))
+            if now - updated >= self.idle_seconds:
+                self._counters['expired'] += 1
+            elif len(self._buckets) > self.max_keys:
+                self._counters['evictions'] += 1
+            else:
+                break
+            del self._buckets[key]
+
+    def stats(self):
+        with self._lock:
+            return {'rate': self.rate, 'burst': self.burst, 'keys': len(self._buckets), 'max_keys': self.max_keys,
+                    **self._counters}
+
+
+def retry_after_header(seconds):
+    """Retry-After value (whole seconds, at least 1) for a wait of seconds."""
+    return str(max(1, math.ceil(seconds)))
+
+
+class AdmissionController:
+    """
+    A cap on requests in flight, shedding low-priority work first.
+
+    'critical' requests are always admitted. 'normal' ones are admitted while fewer than
+    max_concurrent requests are in flight, and 'low' ones only while fewer than
+    low_priority_share of max_concurrent are. So under overload, low-priority work is
+    turned away while normal work still has room. Counts admitted and shed requests per
+    priority.
+    """
+
+    PRIORITIES = ('critical', 'normal', 'low')
+
+    def __init__(self, max_concurrent=64, low_priority_share=0.5):
+        self.max_concurrent = max_concurrent
+        self.low_priority_share = low_priority_share
+        self._limits = {'critical': math.inf, 'normal': max_concurrent,
+                        'low': max(1, int(max_concurrent * low_priority_share))}
+        self._in_flight = 0
+        self._peak = 0
+        self._lock = threading.Lock()
+        self._counters = {f"{outcome}_{priority}": 0 for priority in self.PRIORITIES for outcome in ('admitted', 'shed')}
+
+    def try_enter(self, priority):
+        """True if the request may run; it must then call leave() when done."""
+        with self._lock:
+            if self._in_flight >= self._limits[priority]:
+                self._counters[f"shed_{priority}"] += 1
+                return False
+            self._in_flight += 1
+            self._peak = max(self._peak, self._in_flight)
+            self._counters[f"admitted_{priority}"] += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {'max_concurrent': self.max_concurrent, 'low_priority_limit': self._limits['low'],
+                    'in_flight': self._in_flight, 'peak_in_flight': self._peak, **self._counters}
@@ -0,0 +1,216 @@
+# backend/read_snapshot.py
+"""
+Read-only in-memory copies of the database for anonymous GET routes.
+
+SnapshotStore copies the database file into a shared-cache in-memory SQLite database
+with the backup API, in a background thread, and swaps the new copy in under a lock.
+Readers borrow a connection to whichever snapshot was current when they started and keep
+it until they release it, so a swap never blocks them and they never wait on a writer:
+nothing writes to a snapshot once it is built.
+
+Staleness: a snapshot holds the data committed when its backup started. A refresh starts
+refresh_seconds after the previous one started, or sooner once refresh_commits commits
+were noted (but never within min_interval_seconds of the previous refresh), so the data
+served is normally at most refresh_seconds plus one backup old. acquire() returns None
+once the current snapshot is older than max_age_seconds (e.g. because refreshes keep
+failing), so callers fall back to the database and max_age_seconds is a hard bound.
+Commits are only counted in this process; other processes' writes are picked up by the
+interval refresh.
+
+Each snapshot costs memory equal to the database size, twice that while a refresh
+overlaps readers of the previous copy, in every process that enables it.
+"""
+
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+from db_pool import ConnectionPool
+
+_names = itertools.count(1)
+
+
+class Snapshot:
+    """One immutable in-memory copy and its reader connections."""
+
+    def __init__(self, source, generation, max_readers, cached_statements):
+        self.generation = generation
+        self.uri = f"file:read-snapshot-{os.getpid()}-{next(_names)}?mode=memory&cache=shared"
+        # The in-memory database lives as long as at least one connection to it is open
+        self._anchor = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        started = time.monotonic()
+        try:
+            source_conn = sqlite3.connect(source)
+            try:
+                source_conn.backup(self._anchor) # All pages in one step: one read transaction on the source
+            finally:
+                source_conn.close()
+        except Exception:
+            self._anchor.close()
+            raise
+        self.taken_at = started # The data is as of the start of the backup
+        self.taken_at_wall = time.time() - (time.monotonic() - started)
+        self.build_seconds = time.monotonic() - started
+        page_count = self._anchor.execute("PRAGMA page_count").fetchone()[0]
+        self.size_bytes = page_count * self._anchor.execute("PRAGMA page_size").fetchone()[0]
+        self.pool = ConnectionPool(self.uri, max_size=max_readers, cached_statements=cached_statements,
+                                   pragmas=['query_only = ON'], uri=True)
+        self.readers = 0 # Borrowed via SnapshotStore.acquire() and not yet released
+        self.retired = False
+
+    def age(self):
+        return time.monotonic() - self.taken_at
+
+    def close(self):
+        self.pool.close_all()
+        self._anchor.close()
+
+
+class SnapshotStore:
+    """
+    The current Snapshot of one database file, refreshed by a daemon thread started with
+    start(). acquire() hands out the current snapshot (or None) and release() returns it;
+    a replaced snapshot is closed when its last reader releases it. on_refresh(snapshot) is
+    called after each new snapshot is swapped in.
+    """
+
+    def __init__(self, source, refresh_seconds=5.0, refresh_commits=100, min_interval_seconds=1.0,
+                 max_age_seconds=30.0, max_readers=8, cached_statements=512, on_error=None, on_refresh=None):
+        self.source = source
+        self.refresh_seconds = refresh_seconds
+        self.refresh_commits = refresh_commits
+        self.min_interval_seconds = min_interval_seconds
+        self.max_age_seconds = max_age_seconds
+        self.max_readers = max_readers
+        self.cached_statements = cached_statements
+        self.on_error = on_error
+        self.on_refresh = on_refresh
+        self._current = None
+        self._generation = 0
+        self._commits = 0 # Noted since the current snapshot's backup started
+        self._last_attempt = None # monotonic start of the last refresh, successful or not
+        self._thread = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._counters = {'refreshes': 0, 'refresh_failures': 0, 'acquired': 0, 'stale_rejections': 0,
+                          'commit_triggered': 0}
+
+    def start(self):
+        """Starts the refresh thread (the first snapshot is built right away); idempotent."""
+        with self._condition:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name='read-snapshot', daemon=True)
+                self._thread.start()
+
+    def note_commit(self):
+        """Counts a committed write; wakes the refresh thread once refresh_commits are reached."""
+        with self._condition:
+            self._commits += 1
+            if self._commits == self.refresh_commits:
+                self._condition.notify()
+
+    def _due_in(self):
+        """Seconds until the next refresh is due (<= 0: now). Called with the lock held."""
+        if self._last_attempt is None:
+            return 0
+        elapsed = time.monotonic() - self._last_attempt
+        if self.refresh_commits and self._commits >= self.refresh_commits:
+            return self.min_interval_seconds - elapsed
+        return self.refresh_seconds - elapsed
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and self._due_in() > 0:
+                    self._condition.wait(self._due_in())
+                if self._closed:
+                    return
+                if self._last_attempt is not None and self._commits >= self.refresh_commits > 0:
+                    self._counters['commit_triggered'] += 1
+            try:
+                self.refresh()
+            except Exception as e: # Retried when the next refresh is due; readers fall back after max_age_seconds
+                with self._condition:
+                    self._counters['refresh_failures'] += 1
+                if self.on_error is not None:
+                    self.on_error(e)
+
+    def refresh(self):
+        """Builds a new snapshot and swaps it in; the old one is closed once its readers are done."""
+        with self._condition:
+            self._last_attempt = time.monotonic()
+            commits_before = self._commits
+            self._generation += 1
+            generation = self._generation
+        snapshot = Snapshot(self.source, generation, self.max_readers, self.cached_statements)
+        with self._condition:
+            previous, self._current = self._current, snapshot
+            self._commits -= commits_before # Commits during the backup may not be in it
+            self._counters['refreshes'] += 1
+            if self._closed:
+                previous, self._current = snapshot, None
+            if previous is not None:
+                previous.retired = True
+                close_previous = previous.readers == 0
+        if previous is not None and close_previous:
+            previous.close()
+        if self.on_refresh is not None and self._current is snapshot:
+            self.on_refresh(snapshot)
+        return snapshot
+
+    def acquire(self):
+        """The current snapshot for one reader, or None if there is none younger than max_age_seconds."""
+        with self._condition:
+            snapshot = self._current
+            if snapshot is None:
+                return None
+            if snapshot.age() > self.max_age_seconds:
+                self._counters['stale_rejections'] += 1
+                return None
+            snapshot.readers += 1
+            self._counters['acquired'] += 1
+            return snapshot
+
+    def current_age(self):
+        """Seconds since the current snapshot's data was copied, or None before the first one."""
+        with self._condition:
+            return self._current.age() if self._current is not None else None
+
+    def release(self, snapshot):
+        with self._condition:
+            snapshot.readers -= 1
+            close = snapshot.retired and snapshot.readers == 0
+        if close:
+            snapshot.close()
+
+    def close(self):
+        """Stops refreshing and closes the current snapshot once its readers are done."""
+        with self._condition:
+            self._closed = True
+            current, self._current = self._current, None
+            self._condition.notify()
+            if current is not None:
+                current.retired = True
+                close_current = current.readers == 0
+        if current is not None and close_current:
+            current.close()
+
+    def stats(self):
+        with self._condition:
+            current = self._current
+            stats = {
+                'database': self.source,
+                'ready': current is not None,
+                'refresh_seconds': self.refresh_seconds,
+                'refresh_commits': self.refresh_commits,
+                'max_age_seconds': self.max_age_seconds,
+                'commits_since_snapshot': self._commits,
+                **self._counters,
+            }
+            if current is not None:
+                stats.update(generation=current.generation, age_seconds=round(current.age(), 3),
+                             taken_at=current.taken_at_wall, build_seconds=round(current.build_seconds, 3),
+                             size_bytes=current.size_bytes, readers=current.readers)
+            return stats
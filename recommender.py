@@ -0,0 +1,186 @@
+# backend/recommender.py
+"""
+Startup similarity for /api/recommendations: one unit vector per startup, and the top-k
+most similar startups of each, which app.py stores in startup_neighbors.
+
+A vector is TF-IDF over the description and industry, folded into TEXT_DIM buckets with
+signed feature hashing, followed by z-scored funding and risk features; cosine similarity
+is a dot product. The IDF weights and feature statistics come from the last full build
+(`flask rebuild-recommendations`) and are reused for incremental updates, so a new word is
+weighted as if it were rare until the next full build.
+
+Requires NumPy, which the lookup route itself does not need.
+"""
+
+import math
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+MODEL_VERSION = 1
+TEXT_DIM = 128 # Hashed TF-IDF buckets
+NUMERIC_FEATURES = 3 # log funding goal, share of the goal acquired, risk score
+DIM = TEXT_DIM + NUMERIC_FEATURES
+NUMERIC_WEIGHT = 0.5 # Norm of the numeric part relative to the (unit) text part, before normalizing
+NUMERIC_CLIP = 3.0 # z-scores are clipped so outliers don't swamp the text
+INDUSTRY_TF = 3 # The industry label counts as this many occurrences of one term
+NEIGHBORS = 20 # Neighbours stored per startup
+BLOCK = 128 # Columns per block in the blocked top-k
+CHUNK = 256 # Query rows per similarity matrix (CHUNK x catalog float32 scores)
+
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in into is it its of on or our that the their this to we with
+""".split())
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(description, industry):
+    terms = [term for term in _TOKEN_RE.findall((description or '').lower()) if len(term) > 1 and term not in STOPWORDS]
+    label = ' '.join(_TOKEN_RE.findall((industry or '').lower()))
+    if label:
+        terms.extend([f"industry:{label}"] * INDUSTRY_TF)
+    return terms
+
+
+def numeric_features(funding_goal, funding_acquired, risk_score):
+    """Raw numeric features as an (n, NUMERIC_FEATURES) array; missing values count as 0."""
+    goal = np.nan_to_num(np.asarray(funding_goal, dtype=np.float64)).clip(min=0)
+    acquired = np.nan_to_num(np.asarray(funding_acquired, dtype=np.float64)).clip(min=0)
+    risk = np.nan_to_num(np.asarray(risk_score, dtype=np.float64))
+    progress = np.divide(acquired, goal, out=np.zeros_like(goal), where=goal > 0).clip(0, 1)
+    return np.column_stack([np.log1p(goal), progress, risk])
+
+
+def fit_model(term_lists, numeric):
+    """IDF weights and numeric feature statistics over the whole catalog, as a JSON-serializable dict."""
+    documents = len(term_lists)
+    document_frequency = Counter(term for terms in term_lists for term in set(terms))
+    std = numeric.std(axis=0) if documents else np.ones(NUMERIC_FEATURES)
+    return {
+        'version': MODEL_VERSION,
+        'documents': documents,
+        'idf': {term: math.log((1 + documents) / (1 + count)) + 1 for term, count in document_frequency.items()},
+        'default_idf': math.log(1 + documents) + 1, # A term no document had at build time
+        'numeric_mean': (numeric.mean(axis=0) if documents else np.zeros(NUMERIC_FEATURES)).tolist(),
+        'numeric_std': np.where(std > 0, std, 1.0).tolist(),
+    }
+
+
+def _bucket(term):
+    """Hash bucket and sign of a term; stable across processes, unlike hash()."""
+    digest = zlib.crc32(term.encode('utf-8'))
+    return digest % TEXT_DIM, 1.0 if (digest // TEXT_DIM) & 1 else -1.0
+
+
+def vectorize(model, term_lists, numeric):
+    """Unit float32 vectors, one row per startup."""
+    idf, default_idf = model['idf'], model['default_idf']
+    rows, columns, values = [], [], []
+    buckets = {}
+    for row, terms in enumerate(term_lists):
+        for term, count in Counter(terms).items():
+            bucket = buckets.get(term)
+            if bucket is None:
+                bucket = buckets[term] = _bucket(term)
+            rows.append(row)
+            columns.append(bucket[0])
+            values.append(bucket[1] * (1 + math.log(count)) * idf.get(term, default_idf))
+    text = np.zeros((len(term_lists), TEXT_DIM))
+    np.add.at(text, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), values)
+    text /= np.maximum(np.linalg.norm(text, axis=1, keepdims=True), 1e-12)
+
+    z = ((numeric - np.asarray(model['numeric_mean'])) / np.asarray(model['numeric_std'])).clip(-NUMERIC_CLIP, NUMERIC_CLIP)
+    vectors = np.hstack([text, z * (NUMERIC_WEIGHT / math.sqrt(NUMERIC_FEATURES))])
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors.astype(np.float32)
+
+
+class SimilarityIndex:
+    """
+    Every startup's vector in one matrix, with the lowest stored neighbour score per startup
+    (kth) so incremental updates can tell whose top-k a changed startup enters. Rows are
+    padded to a multiple of BLOCK; padding rows are never returned.
+    """
+
+    def __init__(self, ids, vectors, revision):
+        self.revision = revision
+        self.size = len(ids)
+        self.ids = np.zeros(self._capacity(self.size), dtype=np.int64)
+        self.ids[:self.size] = ids
+        self.matrix = np.zeros((len(self.ids), DIM), dtype=np.float32)
+        self.matrix[:self.size] = vectors
+        self.kth = np.full(len(self.ids), -np.inf, dtype=np.float32)
+        self._positions = {int(startup_id): position for position, startup_id in enumerate(ids)}
+
+    @staticmethod
+    def _capacity(size):
+        return max(BLOCK, -(-size // BLOCK) * BLOCK)
+
+    def positions(self, ids):
+        return np.array([self._positions[int(startup_id)] for startup_id in ids], dtype=np.intp)
+
+    def upsert(self, ids, vectors):
+        """Replaces the vectors of known ids and appends new ones; returns their positions."""
+        new = [int(startup_id) for startup_id in ids if int(startup_id) not in self._positions]
+        if self.size + len(new) > len(self.ids):
+            capacity = self._capacity((self.size + len(new)) * 2)
+            self.ids = np.concatenate([self.ids, np.zeros(capacity - len(self.ids), dtype=np.int64)])
+            self.matrix = np.vstack([self.matrix, np.zeros((capacity - len(self.matrix), DIM), dtype=np.float32)])
+            self.kth = np.concatenate([self.kth, np.full(capacity - len(self.kth), -np.inf, dtype=np.float32)])
+        for startup_id in new:
+            self.ids[self.size] = startup_id
+            self._positions[startup_id] = self.size
+            self.size += 1
+        positions = self.positions(ids)
+        self.matrix[positions] = vectors
+        return positions
+
+    def similarities(self, positions):
+        """Cosine similarity of the given rows to every startup, shape (len(positions), size)."""
+        return self.matrix[positions] @ self.matrix[:self.size].T
+
+    def top_k(self, positions, k=NEIGHBORS):
+        """
+        (neighbor_ids, scores) of shape (len(positions), k'), best first, where k' is k or
+        one less than the catalog size. Each chunk's similarity matrix is reduced to per-block
+        maxima first: the k best columns always lie in the k blocks with the highest maxima,
+        so only those k * BLOCK candidates are ranked exactly.
+        """
+        k = min(k, self.size - 1)
+        if k <= 0:
+            return np.zeros((len(positions), 0), dtype=np.int64), np.zeros((len(positions), 0), dtype=np.float32)
+        blocks = len(self.ids) // BLOCK
+        all_ids, all_scores = [], []
+        for start in range(0, len(positions), CHUNK):
+            chunk = np.asarray(positions[start:start + CHUNK], dtype=np.intp)
+            scores = self.matrix[chunk] @ self.matrix.T
+            scores[:, self.size:] = -np.inf # Padding
+            scores[np.arange(len(chunk)), chunk] = -np.inf # A startup is not its own neighbour
+            if blocks > k:
+                block_max = scores.reshape(len(chunk), blocks, BLOCK).max(axis=2)
+                best_blocks = np.argpartition(block_max, -k, axis=1)[:, -k:]
+                candidates = (best_blocks[:, :, None] * BLOCK + np.arange(BLOCK)).reshape(len(chunk), -1)
+            else:
+                candidates = np.broadcast_to(np.arange(len(self.ids)), scores.shape)
+            candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+            best = np.argpartition(candidate_scores, -k, axis=1)[:, -k:]
+            columns = np.take_along_axis(candidates, best, axis=1)
+            top_scores = np.take_along_axis(scores, columns, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            columns = np.take_along_axis(columns, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            self.kth[chunk] = top_scores[:, -1] if k == NEIGHBORS else -np.inf # A short list takes anyone
+            all_ids.append(self.ids[columns])
+            all_scores.append(top_scores)
+        return np.vstack(all_ids), np.vstack(all_scores)
+
+
+def pack_vector(vector):
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def unpack_vectors(blobs):
+    """One (len(blobs), DIM) float32 matrix from stored vectors."""
+    return np.frombuffer(b''.join(blobs), dtype=np.float32).reshape(len(blobs), DIM)
@@ -0,0 +1,209 @@
+# backend/request_metrics.py
+
+import re
+import threading
+import time
+from collections import deque
+
+# Upper bounds in seconds; the last bucket is +Inf
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_REQUEST_MAX_STATEMENTS = 50 # SQL statements kept per request for the slow-request log
+
+# String and blob literals ('' escapes a quote), then numbers not part of an identifier
+_SQL_LITERAL = re.compile(r"[xX]?'(?:[^']|'')*'|\b0[xX][0-9a-fA-F]+\b|(?<![\w.])\d+(?:\.\d*)?(?:[eE][+-]?\d+)?\b|(?<![\w.])\.\d+\b")
+
+
+def statement_shape(statement):
+    """
+    The statement with its literals replaced by ? and whitespace collapsed. From Python 3.11
+    the trace callback sees statements with their bound values expanded, and those values
+    (emails, password hashes) must not reach logs or the slow-request endpoint.
+    """
+    return ' '.join(_SQL_LITERAL.sub('?', statement).split())
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'started')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.trace.close_sql()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        spans = self.trace.spans
+        spans[self.name] = spans.get(self.name, 0.0) + elapsed
+        return False
+
+
+class RequestTrace:
+    """
+    Timings collected for one request. on_sql() is the connection's trace callback.
+
+    SQLite only reports when a statement starts, so a statement's time runs from its
+    callback until the next statement, span or the end of the request. Fetching rows
+    counts as SQL time, as it should, but so does unrelated Python work done right after
+    a query outside any span: sql_seconds is an upper bound.
+    """
+
+    __slots__ = ('started', 'sql_count', 'sql_seconds', 'spans', 'statements', '_sql_started', 'status')
+
+    def __init__(self, keep_statements):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.spans = {}
+        self.statements = [] if keep_statements else None
+        self._sql_started = None
+        self.status = None
+
+    def on_sql(self, statement):
+        now = time.perf_counter()
+        if self._sql_started is not None:
+            self.sql_seconds += now - self._sql_started
+        self._sql_started = now
+        self.sql_count += 1
+        if self.statements is not None and len(self.statements) < SLOW_REQUEST_MAX_STATEMENTS:
+            self.statements.append(statement)
+
+    def close_sql(self):
+        if self._sql_started is not None:
+            self.sql_seconds += time.perf_counter() - self._sql_started
+            self._sql_started = None
+
+    def span(self, name):
+        """Context manager adding the time spent inside it to spans[name]."""
+        return _Span(self, name)
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value, buckets):
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+class RequestMetrics:
+    """
+    Per-route request metrics for one process, rendered in the Prometheus text format:
+    latency histograms, status counts, SQL statement counts and time, and time per named
+    span (decode, risk, jsonify, ...).
+
+    With slow_request_seconds set, requests slower than that are passed to on_slow_request
+    together with the shape of the SQL they ran (statement_shape(): no literal values), and
+    the last slow_log_size of them are kept in memory.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, slow_request_seconds=None, slow_log_size=50, on_slow_request=None):
+        self.buckets = tuple(buckets)
+        self.slow_request_seconds = slow_request_seconds
+        self.on_slow_request = on_slow_request
+        self._slow_log = deque(maxlen=slow_log_size)
+        self._latency = {} # (endpoint, method) -> _Histogram
+        self._statuses = {} # (endpoint, method, status) -> count
+        self._sql = {} # endpoint -> [statements, seconds]
+        self._spans = {} # (endpoint, span) -> [count, seconds]
+        self._lock = threading.Lock()
+
+    def start(self):
+        return RequestTrace(keep_statements=self.slow_request_seconds is not None)
+
+    def finish(self, trace, endpoint, method, status):
+        trace.close_sql()
+        elapsed = time.perf_counter() - trace.started
+        with self._lock:
+            histogram = self._latency.get((endpoint, method))
+            if histogram is None:
+                histogram = self._latency[(endpoint, method)] = _Histogram(len(self.buckets) + 1)
+            histogram.observe(elapsed, self.buckets)
+            key = (endpoint, method, status)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+            sql = self._sql.setdefault(endpoint, [0, 0.0])
+            sql[0] += trace.sql_count
+            sql[1] += trace.sql_seconds
+            for name, seconds in trace.spans.items():
+                span = self._spans.setdefault((endpoint, name), [0, 0.0])
+                span[0] += 1
+                span[1] += seconds
+        if self.slow_request_seconds is not None and elapsed >= self.slow_request_seconds:
+            record = {'endpoint': endpoint, 'method': method, 'status': status, 'seconds': round(elapsed, 6),
+                      'sql_count': trace.sql_count, 'sql_seconds': round(trace.sql_seconds, 6),
+                      'spans': {name: round(seconds, 6) for name, seconds in trace.spans.items()},
+                      'statements': [statement_shape(statement) for statement in trace.statements]}
+            with self._lock:
+                self._slow_log.append(record)
+            if self.on_slow_request is not None:
+                self.on_slow_request(record)
+        return elapsed
+
+    def slow_requests(self):
+        with self._lock:
+            return list(self._slow_log)
+
+    def render_prometheus(self, gauges=None):
+        """
+        The metrics as Prometheus text exposition. gauges maps a metric name to a list of
+        (labels dict, value) pairs for point-in-time values owned by other components.
+        """
+        with self._lock:
+            latency = {key: (list(h.counts), h.sum, h.count) for key, h in self._latency.items()}
+            statuses = dict(self._statuses)
+            sql = {key: tuple(value) for key, value in self._sql.items()}
+            spans = {key: tuple(value) for key, value in self._spans.items()}
+
+        lines = ['# HELP http_request_duration_seconds Request latency by route.',
+                 '# TYPE http_request_duration_seconds histogram']
+        for (endpoint, method), (counts, total, count) in sorted(latency.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"http_request_duration_seconds_bucket{{{_labels(endpoint=endpoint, method=method, le=le)}}} {cumulative}")
+            lines.append(f"http_request_duration_seconds_sum{{{_labels(endpoint=endpoint, method=method)}}} {total:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{_labels(endpoint=endpoint, method=method)}}} {count}")
+
+        lines += ['# HELP http_requests_total Requests by route and status.', '# TYPE http_requests_total counter']
+        for (endpoint, method, status), count in sorted(statuses.items()):
+            lines.append(f"http_requests_total{{{_labels(endpoint=endpoint, method=method, status=status)}}} {count}")
+
+        lines += ['# HELP sql_statements_total SQL statements executed by route.', '# TYPE sql_statements_total counter']
+        lines += [f"sql_statements_total{{{_labels(endpoint=endpoint)}}} {count}" for endpoint, (count, _) in sorted(sql.items())]
+        lines += ['# HELP sql_seconds_total Time in SQL by route (upper bound, see RequestTrace).', '# TYPE sql_seconds_total counter']
+        lines += [f"sql_seconds_total{{{_labels(endpoint=endpoint)}}} {seconds:.6f}" for endpoint, (_, seconds) in sorted(sql.items())]
+
+        lines += ['# HELP request_span_seconds_total Time in named request stages by route.', '# TYPE request_span_seconds_total counter']
+        lines += [f"request_span_seconds_total{{{_labels(endpoint=endpoint, span=name)}}} {seconds:.6f}"
+                  for (endpoint, name), (_, seconds) in sorted(spans.items())]
+        lines += ['# HELP request_span_total Requests that entered a named stage, by route.', '# TYPE request_span_total counter']
+        lines += [f"request_span_total{{{_labels(endpoint=endpoint, span=name)}}} {count}"
+                  for (endpoint, name), (count, _) in sorted(spans.items())]
+
+        for name, samples in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines += [f"{name}{{{_labels(**labels)}}} {value}" if labels else f"{name} {value}" for labels, value in samples]
+        return '\n'.join(lines) + '\n'
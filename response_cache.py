@@ -0,0 +1,114 @@
+# backend/response_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a TTL for serialized response bodies.
+
+    Every entry carries tags (e.g. 'startups:list', 'startup:42'). Writers call
+    invalidate(tags) after committing, which drops the tagged entries and records when
+    each tag was last invalidated, on a counter bumped by every invalidation. A reader
+    takes snapshot(tags) before it queries the database and passes it to set(); if any of
+    those tags was invalidated in between, the freshly built body may already be stale and
+    is not stored.
+
+    Only the last max_tracked_tags invalidated tags are remembered. A tag forgotten earlier
+    counts as invalidated when the oldest of them was dropped, so a reader that snapshotted
+    before that discards its body even if its own tags didn't change: a spare miss, never
+    a stale entry.
+    """
+
+    def __init__(self, max_entries=1024, ttl=30.0, max_tracked_tags=4096):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_tracked_tags = max_tracked_tags
+        self._entries = OrderedDict() # key -> (expires_at, tags, value)
+        self._tag_index = {} # tag -> set of keys
+        self._invalidation_count = 0
+        self._invalidated_at = OrderedDict() # tag -> _invalidation_count after its last invalidation, oldest first
+        self._forgotten_at = 0 # Latest _invalidated_at value dropped; tags not in _invalidated_at count as invalidated then
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0,
+                          'invalidations': 0, 'invalidated_entries': 0, 'stale_discards': 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            expires_at, tags, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._counters['expired'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+
+    def snapshot(self, tags):
+        with self._lock:
+            return self._invalidation_count
+
+    def set(self, key, value, tags, snapshot):
+        with self._lock:
+            if any(self._invalidated_at.get(tag, self._forgotten_at) > snapshot for tag in tags):
+                self._counters['stale_discards'] += 1
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, tuple(tags), value)
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+            return True
+
+    def invalidate(self, tags):
+        with self._lock:
+            self._counters['invalidations'] += 1
+            self._invalidation_count += 1
+            for tag in tags:
+                self._invalidated_at[tag] = self._invalidation_count
+                self._invalidated_at.move_to_end(tag)
+                for key in list(self._tag_index.get(tag, ())):
+                    self._remove(key)
+                    self._counters['invalidated_entries'] += 1
+            while len(self._invalidated_at) > self.max_tracked_tags:
+                _, self._forgotten_at = self._invalidated_at.popitem(last=False)
+
+    def clear(self):
+        """Drops every entry; bodies being built from before the call are not stored."""
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+            self._invalidation_count += 1
+            self._invalidated_at.clear()
+            self._forgotten_at = self._invalidation_count
+
+    def _remove(self, key):
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'tracked_tags': len(self._invalidated_at),
+                'hit_ratio': round(self._counters['hits'] / lookups, 4) if lookups else None,
+                **self._counters,
+            }
@@ -0,0 +1,68 @@
+# backend/response_encoding.py
+"""
+JSON encoding and Content-Encoding negotiation for API responses.
+
+FastJSONProvider serializes with orjson when it is installed (optional; the standard
+library encoder is used otherwise). The app compresses large bodies with gzip or deflate,
+whichever the client prefers in Accept-Encoding. EncodedBody keeps
+the compressed variants of a cached body next to it, so each is built once per cache entry.
+"""
+
+import zlib
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError: # Optional speedup
+    orjson = None
+
+ENCODINGS = ('gzip', 'deflate') # Preference order when the client ranks them equally
+_WBITS = {'gzip': 31, 'deflate': 15} # zlib wbits: gzip header and trailer vs. zlib (HTTP "deflate")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider with orjson for encoding. Decoding and non-compact output use the defaults."""
+
+    def dumps_bytes(self, obj):
+        """Compact UTF-8 JSON for obj."""
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError: # A type orjson doesn't serialize natively (e.g. Decimal): use the default encoder
+                pass
+        return self.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def negotiate_encoding(accept_encodings):
+    """The Content-Encoding to use for a request's parsed Accept-Encoding, or None for identity."""
+    return accept_encodings.best_match(ENCODINGS)
+
+
+def compress(body, encoding, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    return compressor.compress(body) + compressor.flush()
+
+
+class EncodedBody:
+    """A serialized response body, its ETag, and its compressed variants built on first request."""
+
+    __slots__ = ('body', 'etag', '_variants')
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+        self._variants = {}
+
+    def encoded(self, encoding, level):
+        """The body compressed with encoding. Two racing requests may both compress; either result is kept."""
+        variant = self._variants.get(encoding)
+        if variant is None:
+            variant = self._variants[encoding] = compress(self.body, encoding, level)
+        return variant
@@ -0,0 +1,99 @@
+# backend/risk_engine.py
+"""
+Vectorized twin of calculate_risk and calculate_valuation in app.py, for scoring the whole
+catalog at once (see `flask rescore-all`). The rules and reason strings must stay identical
+to the per-startup functions; `flask rescore-all --verify` and `flask check-risk-engine`
+compare the two implementations.
+
+Requires NumPy, which the web routes themselves do not need.
+"""
+
+import json
+import numpy as np
+
+# Reason strings per factor outcome, in the order calculate_risk appends them
+GAP_REASONS = [None, "Moderate funding gap remaining.", "Significant funding gap remaining."]
+AGE_REASONS = [None, "Relatively early stage (1-3 years operating).", "Very early stage (less than 1 year operating)."]
+FINANCIAL_REASONS = [None, # Profitable last year, or nothing usable to judge
+                     "Last reported year shows no profit or a loss.",
+                     "Last reported year shows very low revenue.",
+                     "No detailed financial history provided."]
+GOAL_REASONS = [None, "Seeking significant funding amount (>$1M)."]
+
+CATEGORY_HIGH, CATEGORY_AVERAGE, CATEGORY_LOW = "High Risk", "Average Risk", "Low Risk"
+
+
+def _reason_table():
+    """JSON-encoded reasons lists for every combination of factor outcomes, indexed by _combination_index."""
+    table = np.empty(len(GAP_REASONS) * len(AGE_REASONS) * len(FINANCIAL_REASONS) * len(GOAL_REASONS), dtype=object)
+    for gap, gap_reason in enumerate(GAP_REASONS):
+        for age, age_reason in enumerate(AGE_REASONS):
+            for fin, fin_reason in enumerate(FINANCIAL_REASONS):
+                for big, goal_reason in enumerate(GOAL_REASONS):
+                    reasons = [r for r in (gap_reason, age_reason, fin_reason, goal_reason) if r]
+                    table[_combination_index(gap, age, fin, big)] = json.dumps(reasons)
+    return table
+
+
+def _combination_index(gap, age, fin, big):
+    return ((gap * len(AGE_REASONS) + age) * len(FINANCIAL_REASONS) + fin) * len(GOAL_REASONS) + big
+
+
+REASON_TABLE = _reason_table()
+
+
+def score_batch(goal, acquired, years, has_financials, last_revenue, last_profit):
+    """
+    Scores many startups at once.
+
+    All arguments are equal-length 1-D arrays. goal, acquired and years must already have
+    missing values replaced by 0 (as calculate_risk does); last_revenue and last_profit use
+    NaN for "not reported". Returns (scores, categories, reasons_json) where reasons_json
+    holds json.dumps of the reasons list calculate_risk would return.
+    """
+    goal = np.asarray(goal, dtype=np.float64)
+    acquired = np.asarray(acquired, dtype=np.float64)
+    years = np.asarray(years, dtype=np.float64)
+    has_financials = np.asarray(has_financials, dtype=bool)
+    last_revenue = np.asarray(last_revenue, dtype=np.float64)
+    last_profit = np.asarray(last_profit, dtype=np.float64)
+
+    # Factor 1: Funding Gap -> 0 none, 1 moderate, 2 significant
+    seeking = goal > 0
+    gap = np.where(seeking & (acquired < goal * 0.25), 2, np.where(seeking & (acquired < goal * 0.75), 1, 0))
+
+    # Factor 2: Operating History / Age -> 0, 1 (1-3 years), 2 (< 1 year)
+    age = np.where(years < 1, 2, np.where(years < 3, 1, 0))
+
+    # Factor 3: Financial Health -> 0 neutral/profitable, 1 loss, 2 low revenue, 3 no history
+    has_profit = ~np.isnan(last_profit)
+    has_revenue = ~np.isnan(last_revenue)
+    loss = has_profit & (last_profit <= 0)
+    low_revenue = ~loss & has_revenue & (last_revenue < 10000)
+    profitable = ~loss & ~low_revenue & has_profit & (last_profit > 0)
+    fin = np.where(~has_financials, 3, np.where(loss, 1, np.where(low_revenue, 2, 0)))
+    fin_points = np.where(fin > 0, 1.0, np.where(has_financials & profitable, -0.5, 0.0))
+
+    # Factor 4: Large Funding Goal
+    big = (goal > 1000000).astype(np.int64)
+
+    scores = np.maximum(0.0, gap + age + fin_points + big)
+    scores = np.round(scores, 1)
+    categories = np.where(scores >= 4, CATEGORY_HIGH, np.where(scores >= 2, CATEGORY_AVERAGE, CATEGORY_LOW)).astype(object)
+    reasons_json = REASON_TABLE[_combination_index(gap, age, fin, big)]
+    return scores, categories, reasons_json
+
+
+def valuation_batch(goal, equity):
+    """
+    Pre-money valuation for many startups, matching calculate_valuation: an int, or None
+    where it cannot be calculated. goal and equity must have missing values replaced by 0.
+    """
+    goal = np.asarray(goal, dtype=np.float64)
+    equity = np.asarray(equity, dtype=np.float64)
+    valid = (equity > 0) & (equity <= 100) & (goal > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pre_money = goal / (equity / 100.0) - goal
+    # np.rint rounds half to even, like round() in calculate_valuation
+    rounded = np.maximum(0.0, np.rint(np.where(valid, pre_money, 0.0)))
+    return [int(value) if ok else None for value, ok in zip(rounded.tolist(), valid.tolist())]
@@ -3,6 +3,11 @@ const API_BASE_URL = 'http://127.0.0.1:5000/api'; // Your Flask backend URL
 
 // --- Utility Functions ---
 // ... (apiCall, formatCurrency, formatEquity, getQueryParam - keep these as they are) ...
+
+// GET responses by endpoint, with their ETag. Every GET still revalidates, so a 304 means the copy is current.
+const etagCache = new Map();
+const ETAG_CACHE_MAX_ENTRIES = 200;
+
 async function apiCall(endpoint, method = 'GET', body = null, requiresAuth = false) {
     const options = {
         method,
@@ -16,9 +21,19 @@ async function apiCall(endpoint, method = 'GET', body = null, requiresAuth = fal
         options.body = JSON.stringify(body);
     }
 
+    const cachedEntry = method === 'GET' ? etagCache.get(endpoint) : undefined;
+    if (cachedEntry) {
+        options.headers['If-None-Match'] = cachedEntry.etag;
+        options.cache = 'no-store'; // We revalidate ourselves; keep the browser cache out of the way
+    }
+
     try {
         const response = await fetch(`${API_BASE_URL}${endpoint}`, options);
 
+        if (response.status === 304 && cachedEntry) {
+            return { ok: true, status: 200, data: structuredClone(cachedEntry.data) };
+        }
+
         // Handle unauthorized or forbidden access specifically for auth-required routes
         if (requiresAuth && (response.status === 401 || response.status === 403)) {
             console.warn(`Auth required or forbidden for ${endpoint}. Status: ${response.status}`);
@@ -48,6 +63,15 @@ async function apiCall(endpoint, method = 'GET', body = null, requiresAuth = fal
             return { ok: false, status: response.status, error: data?.error || `Request failed with status ${response.status}` };
         }
 
+        const etag = response.headers.get('ETag');
+        if (method === 'GET' && etag) {
+            etagCache.delete(endpoint); // Re-insert so the Map stays in least-recently-used order
+            etagCache.set(endpoint, { etag, data: structuredClone(data) });
+            if (etagCache.size > ETAG_CACHE_MAX_ENTRIES) {
+                etagCache.delete(etagCache.keys().next().value);
+            }
+        }
+
         return { ok: true, status: response.status, data };
 
     } catch (error) {
@@ -324,7 +348,10 @@ function initRegisterPage() {
 
 
 // --- Index Page Logic ---
-// ... (initIndexPage - keep as is) ...
+// Cards only render these columns, so ask the API for nothing else
+const CARD_FIELDS = ['id', 'company_name', 'description', 'industry', 'funding_goal', 'funding_acquired', 'logo_url', 'risk_category'];
+const STARTUPS_PAGE_SIZE = 24;
+
 function initIndexPage() {
     const startupListContainer = document.getElementById('startup-list');
     const loadingIndicator = document.getElementById('loading-indicator');
@@ -333,65 +360,132 @@ function initIndexPage() {
         console.error("Missing required elements for index page (startup list or loading indicator).");
         return;
     }
-    async function loadStartups(filter = 'all') {
+
+    // Paging state: next_cursor from the last page, and a token so a filter change discards in-flight pages
+    let currentFilter = 'all';
+    let nextCursor = null;
+    let isLoadingPage = false;
+    let loadToken = 0;
+
+    // Sentinel below the list; when it scrolls into view the next page is fetched
+    const scrollSentinel = document.createElement('div');
+    scrollSentinel.id = 'startup-list-sentinel';
+    startupListContainer.insertAdjacentElement('afterend', scrollSentinel);
+
+    function renderStartupCard(startup) {
+        const card = document.createElement('li');
+        card.classList.add('startup-card');
+        const fundingGoal = startup.funding_goal || 0;
+        const fundingAcquired = startup.funding_acquired || 0;
+        const progress = (fundingGoal > 0) ? Math.min((fundingAcquired / fundingGoal) * 100, 100) : 0;
+        let riskClass = 'unknown';
+        if (startup.risk_category) {
+            riskClass = startup.risk_category.toLowerCase().replace(/\s+/g, '-');
+        }
+         const logoUrl = startup.logo_url && startup.logo_url.startsWith('http')
+            ? startup.logo_url
+            : `https://via.placeholder.com/55/E1E8ED/888888?text=${startup.company_name?.[0]?.toUpperCase() || '?'}`;
+        card.innerHTML = `
+            <div class="card-header">
+                <img src="${logoUrl}" alt="${startup.company_name || 'Startup'} Logo" class="logo" onerror="this.onerror=null;this.src='https://via.placeholder.com/55/E1E8ED/888888?text=?';">
+                <div class="card-header-info">
+                    <h3>${startup.company_name || 'Unnamed Startup'}</h3>
+                    ${startup.industry ? `<span class="industry">${startup.industry}</span>` : ''}
+                </div>
+            </div>
+            <p class="card-description">${startup.description || 'No description available.'}</p>
+            <div class="funding-info">
+                <span>Funding Goal: <strong>${formatCurrency(fundingGoal)}</strong></span>
+                <span>Funding Acquired: <strong>${formatCurrency(fundingAcquired)}</strong></span>
+                 ${fundingGoal > 0 ? `
+                 <div class="progress-bar-container" title="${progress.toFixed(1)}% Funded">
+                     <div class="progress-bar" style="width: ${progress.toFixed(1)}%;"></div>
+                 </div>
+                 ` : ''}
+            </div>
+            <div class="risk-indicator">
+                <span class="risk-badge risk-${riskClass}">
+                    ${startup.risk_category || 'Risk N/A'}
+                </span>
+            </div>
+            <a href="startup-detail.html?id=${startup.id}" class="details-button button-style">View Details</a>
+        `;
+        startupListContainer.appendChild(card);
+    }
+
+    async function loadNextPage() {
+        if (isLoadingPage) return;
+        const token = loadToken;
+        const isFirstPage = nextCursor === null;
+        const params = new URLSearchParams({ limit: STARTUPS_PAGE_SIZE, fields: CARD_FIELDS.join(',') });
+        if (currentFilter !== 'all') params.set('risk', currentFilter);
+        if (!isFirstPage) params.set('cursor', nextCursor);
+
+        isLoadingPage = true;
         loadingIndicator.style.display = 'block';
-        startupListContainer.innerHTML = '';
-        const result = await apiCall('/startups');
+        const result = await apiCall(`/startups?${params.toString()}`);
+        // A filter change while this page was in flight started a newer load, which now owns
+        // isLoadingPage and the list: a stale response must not clear the flag or append cards
+        if (token !== loadToken) return;
+        isLoadingPage = false;
         loadingIndicator.style.display = 'none';
+
         if (result && result.ok) {
-            let startups = result.data;
-            if (filter !== 'all') {
-                 const filterCategory = filter.split('-').map(word => word.charAt(0).toUpperCase() + word.slice(1)).join(' ');
-                 startups = startups.filter(s => s.risk_category === filterCategory);
-            }
-            if (!startups || startups.length === 0) {
+            const startups = result.data.startups || [];
+            nextCursor = result.data.next_cursor || null;
+            if (isFirstPage && startups.length === 0) {
                  startupListContainer.innerHTML = '<li class="text-center" style="grid-column: 1 / -1;">No startups found matching the criteria.</li>';
                  return;
             }
-            startups.forEach(startup => {
-                const card = document.createElement('li');
-                card.classList.add('startup-card');
-                const fundingGoal = startup.funding_goal || 0;
-                const fundingAcquired = startup.funding_acquired || 0;
-                const progress = (fundingGoal > 0) ? Math.min((fundingAcquired / fundingGoal) * 100, 100) : 0;
-                let riskClass = 'unknown';
-                if (startup.risk_category) {
-                    riskClass = startup.risk_category.toLowerCase().replace(/\s+/g, '-');
-                }
-                 const logoUrl = startup.logo_url && startup.logo_url.startsWith('http')
-                    ? startup.logo_url
-                    : `https://via.placeholder.com/55/E1E8ED/888888?text=${startup.company_name?.[0]?.toUpperCase() || '?'}`;
-                card.innerHTML = `
-                    <div class="card-header">
-                        <img src="${logoUrl}" alt="${startup.company_name || 'Startup'} Logo" class="logo" onerror="this.onerror=null;this.src='https://via.placeholder.com/55/E1E8ED/888888?text=?';">
-                        <div class="card-header-info">
-                            <h3>${startup.company_name || 'Unnamed Startup'}</h3>
-                            ${startup.industry ? `<span class="industry">${startup.industry}</span>` : ''}
-                        </div>
-                    </div>
-                    <p class="card-description">${startup.description || 'No description available.'}</p>
-                    <div class="funding-info">
-                        <span>Funding Goal: <strong>${formatCurrency(fundingGoal)}</strong></span>
-                        <span>Funding Acquired: <strong>${formatCurrency(fundingAcquired)}</strong></span>
-                         ${fundingGoal > 0 ? `
-                         <div class="progress-bar-container" title="${progress.toFixed(1)}% Funded">
-                             <div class="progress-bar" style="width: ${progress.toFixed(1)}%;"></div>
-                         </div>
-                         ` : ''}
-                    </div>
-                    <div class="risk-indicator">
-                        <span class="risk-badge risk-${riskClass}">
-                            ${startup.risk_category || 'Risk N/A'}
-                        </span>
-                    </div>
-                    <a href="startup-detail.html?id=${startup.id}" class="details-button button-style">View Details</a>
-                `;
-                startupListContainer.appendChild(card);
-            });
+            startups.forEach(renderStartupCard);
+            if (nextCursor) {
+                // Keep filling if the page did not push the sentinel out of view
+                scrollObserver.unobserve(scrollSentinel);
+                scrollObserver.observe(scrollSentinel);
+            }
         } else {
-            startupListContainer.innerHTML = `<li class="message error-message" style="grid-column: 1 / -1;">Failed to load startups: ${result?.error || 'Server error'}</li>`;
+            nextCursor = null;
+            startupListContainer.insertAdjacentHTML('beforeend', `<li class="message error-message" style="grid-column: 1 / -1;">Failed to load startups: ${result?.error || 'Server error'}</li>`);
+        }
+    }
+
+    const scrollObserver = new IntersectionObserver((entries) => {
+        if (entries.some(entry => entry.isIntersecting) && nextCursor && !isLoadingPage) {
+            loadNextPage();
         }
+    }, { rootMargin: '400px' });
+    scrollObserver.observe(scrollSentinel);
+
+    async function loadFacetCounts() {
+        // Counts come from the server-side aggregate, not from walking every page of the listing
+        if (!filterContainer) return;
+        const result = await apiCall('/startups/facets');
+        if (!result || !result.ok) return;
+        const countsByFilter = { 'all': result.data.total?.startups || 0 };
+        (result.data.risk_category || []).forEach(facet => {
+            countsByFilter[facet.value.toLowerCase().replace(/\s+/g, '-')] = facet.startups;
+        });
+        filterContainer.querySelectorAll('.filter-button').forEach(button => {
+            let countBadge = button.querySelector('.filter-count');
+            if (!countBadge) {
+                countBadge = document.createElement('span');
+                countBadge.classList.add('filter-count');
+                button.appendChild(countBadge);
+            }
+            countBadge.textContent = `(${countsByFilter[button.dataset.filter || 'all'] || 0})`;
+        });
+    }
+
+    function loadStartups(filter = 'all') {
+        // Risk filtering happens on the server against the stored risk_category
+        currentFilter = filter;
+        nextCursor = null;
+        loadToken++; // Disowns any page still in flight
+        isLoadingPage = false;
+        startupListContainer.innerHTML = '';
+        loadNextPage();
     }
+
      if (filterContainer) {
         const filterButtons = filterContainer.querySelectorAll('.filter-button');
         filterButtons.forEach(button => {
@@ -407,6 +501,7 @@ function initIndexPage() {
               allButton.classList.add('active');
           }
      }
+    loadFacetCounts();
     loadStartups();
 }
 
@@ -559,9 +654,8 @@ function initMyStartupPage() {
     const addYearButton = document.getElementById('add-financial-year-edit');
     const yearsOperatingInput = document.getElementById('edit-years_operating'); // Get the target input
 
-    // **** REMOVED analytics element references ****
-    // const analyticsContainer = document.getElementById('startup-analytics');
-    // const interestedInvestorsList = document.getElementById('interested-investors-list');
+    const interestedInvestorsList = document.getElementById('interested-investors-list');
+    const interestCountDisplay = document.getElementById('interest-count-display');
 
     // Simplified check for essential elements
     if (!profileForm || !financialsForm || !financialHistoryContainer || !addYearButton || !yearsOperatingInput || !profileMessageArea || !financialsMessageArea) {
@@ -643,8 +737,6 @@ function initMyStartupPage() {
     async function loadMyStartupData() {
         profileMessageArea.innerHTML = '';
         financialsMessageArea.innerHTML = '';
-        // **** REMOVED analytics list clearing ****
-        // interestedInvestorsList.innerHTML = '<li>Loading...</li>';
         financialHistoryContainer.innerHTML = '';
         financialYearEditCounter = 0;
 
@@ -695,10 +787,6 @@ function initMyStartupPage() {
             // **** Call update function even on error (will set years to 1) ****
             updateYearsOperatingBasedOnFinancialRecords();
         }
-
-        // **** REMOVED analytics API call and population ****
-        // const analyticsResult = await apiCall('/my-startup/analytics', 'GET', null, true);
-        // ... (removed result handling for analytics) ...
     }
 
     // --- Handle Profile Form Update (Keep as is, Years Operating is readOnly but value will be submitted) ---
@@ -780,8 +868,72 @@ function initMyStartupPage() {
           setTimeout(() => { financialsMessageArea.innerHTML = ''; }, 4000);
      });
 
+    // --- Interested Investors (loaded once, then kept live over Server-Sent Events) ---
+    function renderInterestCount(count) {
+        if (interestCountDisplay) {
+            interestCountDisplay.textContent = `${count} investor${count === 1 ? '' : 's'} interested`;
+        }
+    }
+
+    function investorListItem(investor) {
+        const item = document.createElement('li');
+        item.dataset.email = investor.email || '';
+        const name = document.createElement('strong');
+        name.textContent = investor.name || 'Unknown investor';
+        item.appendChild(name);
+        if (investor.email) {
+            const email = document.createElement('a');
+            email.href = `mailto:${investor.email}`;
+            email.textContent = investor.email;
+            item.appendChild(email);
+        }
+        return item;
+    }
+
+    function showNoInvestorsIfEmpty() {
+        if (!interestedInvestorsList.querySelector('li[data-email]')) {
+            interestedInvestorsList.innerHTML = '<li class="no-investors">No investors have expressed interest yet.</li>';
+        }
+    }
+
+    function subscribeToInterestEvents(lastEventId) {
+        if (!window.EventSource) return; // The list stays as loaded
+        // Reconnects send the Last-Event-ID header, which takes precedence over the query parameter
+        const events = new EventSource(`${API_BASE_URL}/my-startup/events?last_event_id=${lastEventId}`, { withCredentials: true });
+        events.addEventListener('interest', (e) => {
+            const event = JSON.parse(e.data);
+            const existing = [...interestedInvestorsList.querySelectorAll('li[data-email]')]
+                .find(item => item.dataset.email === (event.investor.email || ''));
+            if (event.action === 'added' && !existing) {
+                interestedInvestorsList.querySelector('.no-investors')?.remove();
+                interestedInvestorsList.prepend(investorListItem(event.investor));
+            } else if (event.action === 'removed' && existing) {
+                existing.remove();
+                showNoInvestorsIfEmpty();
+            }
+            renderInterestCount(event.interest_count);
+        });
+        window.addEventListener('beforeunload', () => events.close());
+    }
+
+    async function loadInterestedInvestors() {
+        if (!interestedInvestorsList) return;
+        const result = await apiCall('/my-startup/analytics', 'GET', null, true);
+        if (result === null) return;
+        if (!result.ok) {
+            interestedInvestorsList.innerHTML = `<li class="message error-message">Could not load interested investors: ${result.error || 'Error loading analytics.'}</li>`;
+            return;
+        }
+        interestedInvestorsList.innerHTML = '';
+        result.data.interested_investors.forEach(investor => interestedInvestorsList.appendChild(investorListItem(investor)));
+        showNoInvestorsIfEmpty();
+        renderInterestCount(result.data.interest_count);
+        subscribeToInterestEvents(result.data.last_event_id);
+    }
+
     // Load data when page initializes
     loadMyStartupData();
+    loadInterestedInvestors();
 }
 
 
@@ -0,0 +1,22 @@
+# backend/wsgi.py
+"""
+Production entry point: one app per server process, all sharing SECRET_KEY and the database.
+
+    export FLASK_SECRET_KEY=$(python -c 'import secrets; print(secrets.token_hex(32))')
+    export FLASK_DATABASE=/srv/capitalbay/database.db
+    flask --app app.py migrate
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Any setting in app.py can be overridden the same way (FLASK_DB_POOL_SIZE=16, ...; see
+create_app). FLASK_SECRET_KEY must be identical for every process, or a session issued by
+one worker is rejected by the others; `flask --app app.py check-workers` verifies this.
+gunicorn.conf.py starts one worker per core and runs init_worker() in each. Behind a
+reverse proxy, set FLASK_PROXY_FIX_X_FOR=1 (the number of proxies) so rate limits see client
+addresses; limits and the concurrency cap are per process.
+Logs go to stderr as one JSON object per line, written by a background thread in each
+process; FLASK_LOG_FORMAT=text restores plain lines.
+"""
+
+from app import create_app
+
+app = create_app()